@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+from .websocket_auth import ROUTING_FIELDS, authenticate_scope
+
+
+def _scope(token):
+    return {'type': 'websocket', 'path': '/ws/kitchen/orders/', 'query_string': f'token={token}'.encode()}
+
+
+class WebsocketAuthTests(TestCase):
+    """Handshakes cache only the routing claims, per token."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('ws@test.local', 'pw123456', role='kitchen')
+        cls.token = AccessToken.for_user(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_caches_routing_claims_by_jti(self):
+        user, claims = await authenticate_scope(_scope(self.token))
+
+        self.assertEqual((user.pk, user.role, user.is_authenticated), (self.user.pk, 'kitchen', True))
+        self.assertEqual(claims['jti'], self.token['jti'])
+        cached = await cache.aget(f"ws_auth:claims:{self.token['jti']}")
+        self.assertEqual(cached, {'id': self.user.pk, 'role': 'kitchen', 'is_active': True})
+        self.assertEqual(user.get_deferred_fields() & set(ROUTING_FIELDS), set())
+        self.assertIn('password', user.get_deferred_fields())
+
+    async def test_reconnect_reads_the_cache(self):
+        await authenticate_scope(_scope(self.token))
+        await User.objects.filter(pk=self.user.pk).aupdate(role='cashier')
+
+        user, _ = await authenticate_scope(_scope(self.token))
+        self.assertEqual(user.role, 'kitchen')
+
+        # A new token (new jti) is not served the other token's claims
+        user, _ = await authenticate_scope(_scope(AccessToken.for_user(self.user)))
+        self.assertEqual(user.role, 'cashier')
+
+    async def test_inactive_user_refused(self):
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+
+        user, claims = await authenticate_scope(_scope(self.token))
+
+        self.assertFalse(user.is_authenticated)
+        self.assertEqual(claims, {})
@@ -0,0 +1,88 @@
+"""
+JWT authentication for WebSocket connections.
+
+Browsers cannot set an Authorization header on a WebSocket handshake, so the
+SimpleJWT access token is passed in the query string:
+
+    ws://host/ws/kitchen/orders/?token=<access token>
+
+(An `Authorization: Bearer <token>` header is also accepted for non-browser
+clients.) The token is verified once, at connect; the consumer then reads
+`scope['user']` and the decoded claims from `scope['jwt_claims']` for the
+lifetime of the socket. The routing claims (id, role, is_active) are
+cached briefly per token (its jti) so a reconnect storm (e.g. every tablet
+after a deploy) does not hit the database per socket; scope['user'] is a
+User with only those fields loaded, the others deferred.
+Connections without a valid token get AnonymousUser and empty claims;
+consumers decide whether to accept them.
+"""
+import logging
+from urllib.parse import parse_qs
+
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_TIMEOUT = 60
+# Cached per token; in model field order, as User.from_db() expects
+ROUTING_FIELDS = ('id', 'role', 'is_active')
+
+
+def _token_from_scope(scope):
+    query = parse_qs(scope.get('query_string', b'').decode())
+    token = query.get('token', [None])[0]
+    if token:
+        return token
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            kind, _, credentials = value.decode().partition(' ')
+            if kind in api_settings.AUTH_HEADER_TYPES and credentials:
+                return credentials
+    return None
+
+
+async def _get_user(user_id, jti=None):
+    key = f'ws_auth:claims:{jti}' if jti else None
+    claims = await cache.aget(key) if key else None
+    if claims is None:
+        claims = await User.objects.filter(pk=user_id).values(*ROUTING_FIELDS).afirst()
+        if claims is None:
+            return None
+        if key:
+            await cache.aset(key, claims, USER_CACHE_TIMEOUT)
+    if not claims['is_active']:
+        return None
+    return User.from_db('default', ROUTING_FIELDS, [claims[field] for field in ROUTING_FIELDS])
+
+
+async def authenticate_scope(scope):
+    """Return (user, claims) for the handshake in `scope`."""
+    raw_token = _token_from_scope(scope)
+    if not raw_token:
+        return AnonymousUser(), {}
+    try:
+        token = AccessToken(raw_token)
+    except TokenError as e:
+        logger.info(f"WebSocket token rejected for {scope.get('path')}: {e}")
+        return AnonymousUser(), {}
+
+    user = await _get_user(token[api_settings.USER_ID_CLAIM], token.get(api_settings.JTI_CLAIM))
+    if user is None:
+        return AnonymousUser(), {}
+    return user, dict(token.payload)
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Populate scope['user'] and scope['jwt_claims'] from a SimpleJWT access token."""
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope)
+        scope['user'], scope['jwt_claims'] = await authenticate_scope(scope)
+        return await super().__call__(scope, receive, send)
@@ -4,3 +4,6 @@ class CafeSettingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.cafe_settings'
     verbose_name = 'Cafe Settings'
+
+    def ready(self):
+        from . import signals
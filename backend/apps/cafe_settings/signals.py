@@ -0,0 +1,14 @@
+"""
+Signal handlers that keep the public settings cache in sync.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import CafeSettings
+from .views import invalidate_public_settings
+
+
+@receiver(post_save, sender=CafeSettings)
+@receiver(post_delete, sender=CafeSettings)
+def cafe_settings_changed(sender, **kwargs):
+    invalidate_public_settings()
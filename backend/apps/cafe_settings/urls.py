@@ -4,6 +4,7 @@ from . import views
 app_name = 'cafe_settings'
 
 urlpatterns = [
+    path('public/', views.public_settings, name='public_settings'),
     path('mobile-order/', views.MobileOrderSettingsView.as_view(), name='mobile_order_settings'),
     path('upload-image/', views.ImageUploadView.as_view(), name='upload_image'),
 ]
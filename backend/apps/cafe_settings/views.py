@@ -1,10 +1,26 @@
 from rest_framework import views, status, permissions, parsers
 from rest_framework.response import Response
-from apps.core.responses import APIResponse
+from django.views.decorators.http import require_GET
+from apps.core.cache import namespace
+from apps.core.responses import APIResponse, AsyncAPIResponse
 from .models import CafeSettings, CafeImage
 from .serializers import CafeSettingsSerializer, CafeImageSerializer
 from apps.accounts.permissions import IsAdmin
 
+settings_cache = namespace('cafe_settings', timeout=60 * 60)  # Invalidated on save
+PUBLIC_SETTINGS_FIELDS = [
+    'name', 'self_ordering_enabled', 'order_type', 'background_color', 'payment_at_counter',
+]
+
+
+def invalidate_public_settings():
+    settings_cache.invalidate()
+
+
+async def _load_public_settings():
+    settings_obj, _ = await CafeSettings.objects.aget_or_create(id=1)
+    return {field: getattr(settings_obj, field) for field in PUBLIC_SETTINGS_FIELDS}
+
 class MobileOrderSettingsView(views.APIView):
     """
     GET/PUT /api/settings/mobile-order
@@ -51,3 +67,13 @@ class ImageUploadView(views.APIView):
             data=serializer.data,
             message="Image uploaded successfully"
         )
+
+
+@require_GET
+async def public_settings(request):
+    """
+    GET /api/settings/public/
+    Privacy: AllowAny. The customer-facing subset of the cafe settings
+    (branding and ordering mode) for QR clients, cached until saved.
+    """
+    return AsyncAPIResponse.success(data=await settings_cache.aget_or_set('public', _load_public_settings))
@@ -0,0 +1,101 @@
+"""
+Channel-layer broadcasting for sync views.
+
+Groups:
+    kitchen_orders   every order event (kitchen staff and admins)
+    floor_<id>       events for orders on that floor (cashiers serving it)
+    order_<uuid hex> status deltas for one order (the customer who placed it)
+
+Customer groups live on their own channel layer ('customers' in
+CHANNEL_LAYERS) with smaller queues and shorter expiry; consumers joining
+them set channel_layer_alias to match.
+"""
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from . import metrics
+from .profiling import record_channel_send
+
+KITCHEN_GROUP = 'kitchen_orders'
+CUSTOMER_LAYER = 'customers'
+
+
+def floor_group(floor_id):
+    return f'floor_{floor_id}'
+
+
+def order_group(order_uuid):
+    return f'order_{order_uuid.hex}'
+
+
+def group_kind(group):
+    """Low-cardinality label for a group name: kitchen_orders, floor or order."""
+    return group.split('_', 1)[0] if group.startswith(('floor_', 'order_')) else group
+
+
+def layer_alias(group):
+    """Channel layer serving `group` (customers falls back to default if not configured)."""
+    if group.startswith('order_') and CUSTOMER_LAYER in getattr(settings, 'CHANNEL_LAYERS', {}):
+        return CUSTOMER_LAYER
+    return 'default'
+
+
+def broadcast(group, message, event_type='order.update'):
+    """
+    Send `message` to every consumer in `group`.
+
+    Consumers receive {'type': event_type, 'message': message}, so the
+    default event reaches KitchenConsumer.order_update.
+    """
+    channel_layer = get_channel_layer(layer_alias(group))
+    start = time.perf_counter()
+    async_to_sync(channel_layer.group_send)(
+        group,
+        {
+            'type': event_type,
+            'message': message,
+        }
+    )
+    duration = time.perf_counter() - start
+    metrics.BROADCAST_LATENCY.observe(duration, group=group_kind(group))
+    record_channel_send(duration)
+
+
+def customer_delta(order, lines=None):
+    """
+    The status change a customer sees: order status plus changed lines.
+
+    `lines` is {line_id: status} for individual lines, or one status that
+    every line of the order moved to. No staff or customer details.
+    """
+    delta = {
+        'order': str(order.uuid),
+        'status': order.status,
+        'updated_at': order.updated_at.isoformat() if order.updated_at else None,
+    }
+    if isinstance(lines, dict):
+        delta['lines'] = {str(line_id): status for line_id, status in lines.items()}
+    elif lines:
+        delta['all_lines'] = lines
+    return delta
+
+
+def broadcast_order(order, message, event_type='order.update', lines=None):
+    """
+    Send an order event to the kitchen, the order's floor and its customer.
+
+    Staff groups get `message`; the order's own group gets customer_delta()
+    as an 'order.status' event. The floor comes from the cached table
+    directory, so no query is made.
+    """
+    from apps.tables.resolver import table_floor_id
+
+    broadcast(KITCHEN_GROUP, message, event_type)
+    floor_id = table_floor_id(order.table_id)
+    if floor_id is not None:
+        broadcast(floor_group(floor_id), message, event_type)
+    if order.uuid is not None:
+        broadcast(order_group(order.uuid), customer_delta(order, lines), 'order.status')
@@ -0,0 +1,304 @@
+"""
+Two-tier cache: a bounded in-process LRU (L1) over the shared Django cache (L2).
+
+Values are grouped in namespaces ('menu', 'tables', ...). Each namespace has
+a version number stored in L2, and every key embeds it, so invalidating a
+namespace is a single increment: old entries in L1 and L2 become
+unreachable and age out. Processes re-read the version at most every
+VERSION_CHECK_INTERVAL seconds, which bounds how long another worker can
+serve an invalidated L1 entry.
+
+Misses are single-flight: concurrent callers for the same key wait for one
+build (threads in this process via a per-key event, other processes via an
+L2 lock), so an expensive build runs once per miss, not once per request.
+
+    menu_cache = namespace('menu', timeout=3600)
+
+    bundle = await menu_cache.aget_or_set('bundle', build_bundle)   # async build
+    png = qr_cache.get_or_set(url, lambda: render_png(url))         # sync build
+    menu_cache.invalidate()
+
+L1 values are shared between threads: treat them as read-only.
+
+Settings:
+    TWO_TIER_CACHE = {
+        'L1_MAX_ENTRIES': 1024,       # 0 disables L1
+        'L1_TIMEOUT': 30,             # seconds; capped by the namespace timeout
+        'VERSION_CHECK_INTERVAL': 1.0,
+        'LOCK_TIMEOUT': 30,           # L2 build lock lifetime
+        'LOCK_WAIT': 2.0,             # how long other processes wait for a build
+    }
+L2 is CACHES['default'] (Redis when REDIS_CACHE_URL is set, otherwise
+local memory, which keeps everything testable without Redis).
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import metrics
+
+_MISSING = object()
+
+_namespaces = {}
+_namespaces_lock = threading.Lock()
+
+
+def get_cache_settings():
+    config = getattr(settings, 'TWO_TIER_CACHE', {}) or {}
+    return {
+        'L1_MAX_ENTRIES': config.get('L1_MAX_ENTRIES', 1024),
+        'L1_TIMEOUT': config.get('L1_TIMEOUT', 30),
+        'VERSION_CHECK_INTERVAL': config.get('VERSION_CHECK_INTERVAL', 1.0),
+        'LOCK_TIMEOUT': config.get('LOCK_TIMEOUT', 30),
+        'LOCK_WAIT': config.get('LOCK_WAIT', 2.0),
+    }
+
+
+class LocalLRU:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        if self.max_entries <= 0 or timeout <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_local = LocalLRU(get_cache_settings()['L1_MAX_ENTRIES'])
+
+
+class _Flight:
+    """One in-progress build that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = _MISSING
+
+
+class CacheNamespace:
+    """A versioned group of keys; see module docstring."""
+
+    def __init__(self, name, timeout=300):
+        self.name = name
+        self.timeout = timeout
+        self.version_key = f'cache_version:{name}'
+        self.version = None
+        self.version_checked = 0.0
+        self.flights = {}
+        self.flights_lock = threading.Lock()
+        self.async_flights = {}
+
+    # ---- Versions --------------------------------------------------------
+
+    def _current_version(self):
+        now = time.monotonic()
+        if self.version is None or now - self.version_checked >= get_cache_settings()['VERSION_CHECK_INTERVAL']:
+            version = shared_cache.get(self.version_key)
+            if version is None:
+                shared_cache.add(self.version_key, 1, None)
+                version = shared_cache.get(self.version_key, 1)
+            self.version, self.version_checked = version, now
+        return self.version
+
+    async def _acurrent_version(self):
+        now = time.monotonic()
+        if self.version is None or now - self.version_checked >= get_cache_settings()['VERSION_CHECK_INTERVAL']:
+            version = await shared_cache.aget(self.version_key)
+            if version is None:
+                await shared_cache.aadd(self.version_key, 1, None)
+                version = await shared_cache.aget(self.version_key, 1)
+            self.version, self.version_checked = version, now
+        return self.version
+
+    def current_version(self):
+        """
+        The namespace version, which changes on every invalidate(). For
+        per-process state derived from cached values (e.g. a search index).
+        """
+        return self._current_version()
+
+    async def acurrent_version(self):
+        return await self._acurrent_version()
+
+    def invalidate(self):
+        """Make every key in the namespace stale, in all processes."""
+        try:
+            version = shared_cache.incr(self.version_key)
+        except ValueError:
+            version = (self.version or 1) + 1
+            shared_cache.set(self.version_key, version, None)
+        self.version, self.version_checked = version, time.monotonic()
+
+    # ---- Lookups ---------------------------------------------------------
+
+    def _full_key(self, version, key):
+        if len(key) > 100 or any(ch.isspace() for ch in key):
+            # URLs and free text are fine as keys; keep them backend-safe
+            key = hashlib.sha1(key.encode()).hexdigest()
+        return f'{self.name}:{version}:{key}'
+
+    def _local_timeout(self, timeout):
+        return min(get_cache_settings()['L1_TIMEOUT'], timeout)
+
+    def get_or_set(self, key, build, timeout=None):
+        """Return the cached value for `key`, calling build() once on a miss."""
+        timeout = self.timeout if timeout is None else timeout
+        full_key = self._full_key(self._current_version(), key)
+
+        value = _local.get(full_key)
+        if value is not _MISSING:
+            metrics.CACHE_REQUESTS.inc(namespace=self.name, result='l1_hit')
+            return value
+
+        with self.flights_lock:
+            flight = self.flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[full_key] = _Flight()
+        if not leader:
+            flight.done.wait(get_cache_settings()['LOCK_TIMEOUT'])
+            if flight.value is not _MISSING:
+                metrics.CACHE_REQUESTS.inc(namespace=self.name, result='coalesced')
+                return flight.value
+            # The leader failed or timed out; build for ourselves
+            return self._fetch(full_key, build, timeout)
+
+        try:
+            flight.value = self._fetch(full_key, build, timeout)
+            return flight.value
+        finally:
+            with self.flights_lock:
+                self.flights.pop(full_key, None)
+            flight.done.set()
+
+    def _fetch(self, full_key, build, timeout):
+        value = shared_cache.get(full_key, _MISSING)
+        if value is not _MISSING:
+            metrics.CACHE_REQUESTS.inc(namespace=self.name, result='l2_hit')
+            _local.set(full_key, value, self._local_timeout(timeout))
+            return value
+
+        config = get_cache_settings()
+        lock_key = f'cache_lock:{full_key}'
+        if not shared_cache.add(lock_key, 1, config['LOCK_TIMEOUT']):
+            # Another process is building it; wait briefly for its result
+            deadline = time.monotonic() + config['LOCK_WAIT']
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = shared_cache.get(full_key, _MISSING)
+                if value is not _MISSING:
+                    metrics.CACHE_REQUESTS.inc(namespace=self.name, result='coalesced')
+                    _local.set(full_key, value, self._local_timeout(timeout))
+                    return value
+            lock_key = None
+
+        metrics.CACHE_REQUESTS.inc(namespace=self.name, result='miss')
+        start = time.perf_counter()
+        try:
+            value = build()
+        finally:
+            if lock_key:
+                shared_cache.delete(lock_key)
+        metrics.CACHE_BUILD_SECONDS.observe(time.perf_counter() - start, namespace=self.name)
+        shared_cache.set(full_key, value, timeout)
+        _local.set(full_key, value, self._local_timeout(timeout))
+        return value
+
+    async def aget_or_set(self, key, build, timeout=None):
+        """
+        Async get_or_set(); `build` is an async callable.
+
+        L1 hits never leave the event loop. Coalescing is per event loop;
+        other processes are not locked out (they may build concurrently).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        full_key = self._full_key(await self._acurrent_version(), key)
+
+        value = _local.get(full_key)
+        if value is not _MISSING:
+            metrics.CACHE_REQUESTS.inc(namespace=self.name, result='l1_hit')
+            return value
+
+        flight = self.async_flights.get(full_key)
+        if flight is not None and flight.get_loop() is asyncio.get_running_loop():
+            metrics.CACHE_REQUESTS.inc(namespace=self.name, result='coalesced')
+            return await asyncio.shield(flight)
+
+        flight = self.async_flights[full_key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await shared_cache.aget(full_key, _MISSING)
+            if value is not _MISSING:
+                metrics.CACHE_REQUESTS.inc(namespace=self.name, result='l2_hit')
+            else:
+                metrics.CACHE_REQUESTS.inc(namespace=self.name, result='miss')
+                start = time.perf_counter()
+                value = await build()
+                metrics.CACHE_BUILD_SECONDS.observe(time.perf_counter() - start, namespace=self.name)
+                await shared_cache.aset(full_key, value, timeout)
+            _local.set(full_key, value, self._local_timeout(timeout))
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            flight.set_exception(e)
+            # Waiters see the exception; nobody else needs to retrieve it
+            flight.exception()
+            raise
+        finally:
+            if self.async_flights.get(full_key) is flight:
+                del self.async_flights[full_key]
+
+
+def namespace(name, timeout=300):
+    """Return the process-wide CacheNamespace called `name` (created on first use)."""
+    with _namespaces_lock:
+        ns = _namespaces.get(name)
+        if ns is None:
+            ns = _namespaces[name] = CacheNamespace(name, timeout)
+        return ns
+
+
+def clear_local():
+    """Drop all L1 entries and remembered versions (tests, settings changes)."""
+    _local.clear()
+    with _namespaces_lock:
+        for ns in _namespaces.values():
+            ns.version = None
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs):
+    """Pick up TWO_TIER_CACHE / CACHES overrides (e.g. override_settings in tests)."""
+    if setting in ('TWO_TIER_CACHE', 'CACHES'):
+        _local.max_entries = get_cache_settings()['L1_MAX_ENTRIES']
+        clear_local()
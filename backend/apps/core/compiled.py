@@ -0,0 +1,249 @@
+"""
+Read-only serializers compiled to values() projections.
+
+Rendering a long list through a ModelSerializer builds a model instance
+and walks every serializer field per row. For list endpoints the
+serializer is instead compiled once per request into
+
+    columns     the flat values() projection behind its fields, with
+                dotted sources (table.table_number, category.name) and
+                nested serializers on forward relations as joins
+    writers     (name, reader) pairs that turn a values() row into the
+                serializer's output dict, using each field's own
+                to_representation() so the output is unchanged
+
+Nested lists (order lines, product variants) are loaded for a whole page
+with one extra values() query each, grouped on the foreign key.
+
+Fields with no column behind them (properties, methods) cannot be read
+from a row. A serializer may list replacements in Meta.compiled_fields
+as {name: (column, function)}, the function mapping the column's value
+to the field's output; any other such field makes the serializer
+NotCompilable and the view falls back to regular serialization.
+
+Views opt in with CompiledReadMixin (used in place of
+SparseFieldsetMixin, whose ?fields=/?expand= shaping it keeps).
+"""
+import logging
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import FileField
+from rest_framework.fields import empty
+from rest_framework.relations import PKOnlyObject, PrimaryKeyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from .fieldsets import SparseFieldsetMixin, _forward_relation
+
+logger = logging.getLogger(__name__)
+
+_SKIP = object()
+
+
+class NotCompilable(Exception):
+    """A serializer field has no values() equivalent."""
+
+
+class CompiledSerializer:
+    """
+    values() projection and row writer for a (shaped) serializer instance.
+
+    Compiled per request: field instances carry the request context
+    (e.g. absolute file URLs), so they are not shared between requests.
+    """
+
+    def __init__(self, serializer, model=None):
+        serializer = serializer.child if isinstance(serializer, ListSerializer) else serializer
+        self.model = model or serializer.Meta.model
+        self.columns = {}        # values() path -> None (ordered set)
+        self.nested = []         # _NestedList, at any join depth
+        self.writers = self._compile(serializer, self.model, '')
+
+    # ---- Compilation ----------------------------------------------------
+
+    def _column(self, path):
+        self.columns[path] = None
+        return path
+
+    def _compile(self, serializer, model, prefix):
+        computed = getattr(getattr(serializer, 'Meta', None), 'compiled_fields', {})
+        pk_path = self._column(f'{prefix}{model._meta.pk.attname}')
+        writers = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in computed:
+                column, function = computed[name]
+                path = self._column(f'{prefix}{column}')
+                writers.append((name, lambda row, path=path, function=function: function(row[path])))
+            else:
+                writers.append((name, self._compile_field(field, model, prefix, pk_path)))
+        return writers
+
+    def _compile_field(self, field, model, prefix, pk_path):
+        attrs = [] if field.source == '*' else field.source_attrs
+        if not attrs:
+            if isinstance(field, BaseSerializer) and not isinstance(field, ListSerializer):
+                writers = self._compile(field, model, prefix)
+                return lambda row: self.write(row, writers)
+            raise NotCompilable(field.field_name)
+        if len(attrs) > 1 and isinstance(field, ListSerializer):
+            raise NotCompilable(field.field_name)
+
+        # Forward relations along a dotted source become joins; DRF skips
+        # the field (or gives None if allow_null) when one is null.
+        checks = []
+        for attr in attrs[:-1]:
+            relation = _forward_relation(model, attr)
+            if relation is None:
+                raise NotCompilable(field.field_name)
+            checks.append(self._column(f'{prefix}{attr}'))
+            prefix, model = f'{prefix}{attr}__', relation.related_model
+        read = self._compile_attribute(field, model, prefix, attrs[-1], pk_path)
+        if not checks:
+            return read
+
+        if field.default is not empty:
+            missing = field.get_default
+        elif field.allow_null:
+            missing = lambda: None
+        else:
+            missing = lambda: _SKIP
+
+        def read_through(row):
+            for path in checks:
+                if row[path] is None:
+                    return missing()
+            return read(row)
+        return read_through
+
+    def _compile_attribute(self, field, model, prefix, name, pk_path):
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise NotCompilable(field.field_name)
+
+        if isinstance(field, ListSerializer):
+            if not model_field.one_to_many:
+                raise NotCompilable(field.field_name)
+            nested = _NestedList(field.child, model_field, pk_path)
+            self.nested.append(nested)
+            return lambda row: nested.groups.get(row[pk_path], [])
+
+        relation = _forward_relation(model, name)
+        if isinstance(field, BaseSerializer):
+            if relation is None:
+                raise NotCompilable(field.field_name)
+            check = self._column(f'{prefix}{name}')
+            writers = self._compile(field, relation.related_model, f'{prefix}{name}__')
+            return lambda row: None if row[check] is None else self.write(row, writers)
+
+        path = self._column(f'{prefix}{name}')
+        if relation is not None:
+            if not isinstance(field, PrimaryKeyRelatedField):
+                raise NotCompilable(field.field_name)
+            if field.pk_field is None:
+                return lambda row: row[path]
+            convert = field.to_representation
+            return lambda row: None if row[path] is None else convert(PKOnlyObject(row[path]))
+
+        if not model_field.concrete or model_field.is_relation:
+            raise NotCompilable(field.field_name)
+
+        convert = field.to_representation
+        if isinstance(model_field, FileField):
+            # The column holds the name; the field renders a FieldFile
+            attr_class = model_field.attr_class
+            return lambda row: None if row[path] is None else convert(attr_class(None, model_field, row[path]))
+        return lambda row: None if row[path] is None else convert(row[path])
+
+    # ---- Rendering ------------------------------------------------------
+
+    def values(self, queryset, keep=()):
+        """`queryset` as values() rows carrying the projection (and `keep`)."""
+        columns = list(self.columns)
+        columns += [name for name in keep if name not in self.columns]
+        return queryset.select_related(None).prefetch_related(None).values(*columns)
+
+    def render(self, rows):
+        """Output dicts for rows from values()."""
+        rows = list(rows)
+        for nested in self.nested:
+            nested.load(rows)
+        return [self.write(row, self.writers) for row in rows]
+
+    @staticmethod
+    def write(row, writers):
+        data = {}
+        for name, read in writers:
+            value = read(row)
+            if value is not _SKIP:
+                data[name] = value
+        return data
+
+
+class _NestedList:
+    """A reverse foreign key rendered as a list, loaded per page."""
+
+    def __init__(self, serializer, relation, pk_path):
+        self.compiled = CompiledSerializer(serializer, relation.related_model)
+        self.foreign_key = relation.field.attname
+        self.pk_path = pk_path
+        self.groups = {}
+
+    def load(self, rows):
+        ids = {row[self.pk_path] for row in rows} - {None}
+        self.groups = {}
+        if not ids:
+            return
+        queryset = self.compiled.model._default_manager.filter(**{f'{self.foreign_key}__in': ids})
+        children = list(self.compiled.values(queryset, keep=[self.foreign_key]))
+        for child, data in zip(children, self.compiled.render(children)):
+            self.groups.setdefault(child[self.foreign_key], []).append(data)
+
+
+class CompiledRows:
+    """Stands in for `get_serializer(rows, many=True)`: `.data` renders the rows."""
+
+    def __init__(self, compiled, rows):
+        self.compiled = compiled
+        self.rows = rows
+
+    @property
+    def data(self):
+        return self.compiled.render(self.rows)
+
+
+class CompiledReadMixin(SparseFieldsetMixin):
+    """
+    Serve `compiled_actions` (list) from values() rows (see module docstring).
+
+    get_queryset() returns values() rows for those actions, so list()
+    code filtering, counting and paginating it is unchanged; get_serializer()
+    for many rows returns a CompiledRows with the usual `.data`.
+    """
+    compiled_actions = ('list',)
+
+    def get_compiled_serializer(self):
+        if not hasattr(self, '_compiled'):
+            self._compiled = None
+            try:
+                self._compiled = CompiledSerializer(super().get_serializer())
+            except NotCompilable as exc:
+                logger.debug(f"{type(self).__name__}: field '{exc}' is not compilable, serializing instances")
+        return self._compiled
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.compiled_actions:
+            return queryset
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            return queryset
+        return compiled.values(queryset, keep=self._ordering_fields(queryset) | set(self.sparse_keep))
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.compiled_actions and args and kwargs.get('many'):
+            compiled = self.get_compiled_serializer()
+            if compiled is not None:
+                return CompiledRows(compiled, args[0])
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,140 @@
+"""
+Conditional GET (ETag / Last-Modified) for list and detail endpoints.
+
+POS screens poll the same lists and mostly get identical data back. Each
+conditional request first runs one aggregate over the rows it will show,
+
+    SELECT MAX(updated_at), MAX(<related>.updated_at), COUNT(DISTINCT id) ...
+
+and hashes it into a weak ETag. A matching If-None-Match is answered 304
+straight after the permission checks, before the page is loaded or
+serialized; otherwise the 200 carries the ETag for the next poll.
+
+For lists whose paginator offers page_queryset() (KeysetPagination) the
+rows are the requested page's: their ids are read with the page's own
+indexed range query and the aggregate is bounded to them, so the cost
+does not grow with history. Other lists are small (floors) and are
+aggregated whole.
+
+Views list the timestamps that move when their output changes in
+`conditional_timestamps`, including those of related rows they render,
+and in `conditional_counts` the related rows whose removal shows (the
+view's own row count is always included). Detail responses also carry
+Last-Modified; list responses do not, as a deleted row would not move
+MAX(updated_at). Requests with ?expand= (expanded objects are outside the
+fingerprint) or ?count= (the total is) are served unconditionally, as are
+lookups that are not valid for the field (the view answers 404).
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+class NotModified(Exception):
+    """Raised from initial() to answer a conditional request with 304."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """ETag/Last-Modified for a viewset's `conditional_actions` (see module docstring)."""
+    conditional_actions = ('list', 'retrieve')
+    conditional_timestamps = ('updated_at',)
+    conditional_counts = ()
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset.order_by()
+
+    def get_page(self, queryset):
+        """
+        (ids on the requested list page, whether a next page exists), or
+        None to fingerprint the whole queryset.
+        """
+        if self.action == 'retrieve' or not hasattr(self.paginator, 'page_queryset'):
+            return None
+        ids = list(self.paginator.page_queryset(queryset, self.request, self).values_list('pk', flat=True))
+        # The paginator's look-ahead row only tells whether there is a next page
+        page_size = self.paginator.page_size
+        return ids[:page_size], len(ids) > page_size
+
+    def get_validators(self):
+        """(etag, last_modified) for the current request, or None to skip."""
+        aggregates = {f'max_{index}': Max(path) for index, path in enumerate(self.conditional_timestamps)}
+        aggregates['count'] = Count('pk', distinct=True)
+        for index, path in enumerate(self.conditional_counts):
+            aggregates[f'count_{index}'] = Count(path, distinct=True)
+        try:
+            queryset = self.get_conditional_queryset()
+            page = self.get_page(queryset)
+            rows = queryset if page is None else queryset.filter(pk__in=page[0])
+            fingerprint = rows.aggregate(**aggregates)
+        except (TypeError, ValueError, ValidationError):
+            # e.g. /api/orders/abc/: the view's own lookup answers 404
+            return None
+
+        if self.action == 'retrieve' and not fingerprint['count']:
+            # Let the view answer 404
+            return None
+
+        timestamps = [value for key, value in fingerprint.items() if key.startswith('max_') and value is not None]
+        last_modified = max(timestamps) if timestamps else None
+        # Also keyed on the page, filters (e.g. a cashier's floor), URL (?fields=) and user
+        raw = repr((
+            sorted(fingerprint.items()), page, str(queryset.query),
+            self.request.get_full_path(), self.request.user.pk,
+        ))
+        etag = f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+        if self.action != 'retrieve':
+            last_modified = None
+        return etag, last_modified
+
+    def _is_conditional(self, request):
+        count_param = getattr(self.paginator, 'count_query_param', None)
+        return (
+            request.method in ('GET', 'HEAD')
+            and self.action in self.conditional_actions
+            and not request.query_params.get('expand')
+            and not (count_param and request.query_params.get(count_param))
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._validators = self.get_validators() if self._is_conditional(request) else None
+        if self._validators is not None:
+            etag, last_modified = self._validators
+            response = get_conditional_response(
+                request, etag=etag,
+                last_modified=int(last_modified.timestamp()) if last_modified else None,
+            )
+            if response is not None:
+                raise NotModified(self._set_validators(response))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, '_validators', None) is not None and response.status_code == 200:
+            self._set_validators(response)
+        return response
+
+    def _set_validators(self, response):
+        etag, last_modified = self._validators
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+        # Revalidate every time; responses are per user
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,255 @@
+"""
+Sparse fieldsets (?fields=) and expansion (?expand=) for read endpoints.
+
+    GET /api/orders/?fields=id,order_number,status,total_amount
+    GET /api/orders/?fields=id,status,lines.product_name,lines.quantity
+    GET /api/tables/floors/?fields=id,name                  (no tables)
+    GET /api/orders/42/?expand=table
+    GET /api/menu/products/?fields=id,name,category.name&expand=category
+
+`fields` lists the fields to return. A dotted name selects inside a nested
+or expanded serializer (`lines.status`) and implies its parent; unknown
+names are ignored. Without `fields` every field is returned, as before.
+`expand` replaces a related id with the related object, for the relations
+a serializer lists in Meta.expandable_fields (dotted for nested ones,
+e.g. `lines.product`).
+
+The shaped serializer also shapes the queryset: forward relations the
+selected fields traverse are joined (select_related), nested lists are
+prefetched with their own trimmed querysets (so unrequested lines or
+tables are never fetched) and, when `fields` is given, only the columns
+behind the selected fields are loaded (only()). Fields backed by a
+property or method keep every column of their model.
+
+Views opt in with SparseFieldsetMixin; it applies to `sparse_actions`
+(list and retrieve) only, so writes always see complete instances.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.module_loading import import_string
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+
+def parse_tree(value):
+    """'id,lines.status,lines.id' -> {'id': {}, 'lines': {'status': {}, 'id': {}}}"""
+    tree = {}
+    for path in (value or '').split(','):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for part in path.split('.'):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _unwrap(serializer):
+    return serializer.child if isinstance(serializer, ListSerializer) else serializer
+
+
+# ---- Serializer shaping -------------------------------------------------
+
+def expand_serializer(serializer, expand):
+    """Swap related ids for nested serializers along the paths in `expand`."""
+    serializer = _unwrap(serializer)
+    expandable = getattr(getattr(serializer, 'Meta', None), 'expandable_fields', {})
+    for name, subtree in expand.items():
+        field = serializer.fields.get(name)
+        if field is None:
+            continue
+        if name in expandable and not isinstance(_unwrap(field), BaseSerializer):
+            options = {'read_only': True}
+            if field.source != name:
+                options['source'] = field.source
+            serializer.fields[name] = field = import_string(expandable[name])(**options)
+        if subtree and isinstance(_unwrap(field), BaseSerializer):
+            expand_serializer(field, subtree)
+
+
+def prune_serializer(serializer, fields):
+    """Drop every field not named in `fields` (recursively for dotted names)."""
+    serializer = _unwrap(serializer)
+    for name in list(serializer.fields):
+        if name not in fields:
+            serializer.fields.pop(name)
+    for name, subtree in fields.items():
+        field = serializer.fields.get(name)
+        if subtree and field is not None and isinstance(_unwrap(field), BaseSerializer):
+            prune_serializer(field, subtree)
+
+
+# ---- Queryset shaping ---------------------------------------------------
+
+class _Plan:
+    def __init__(self, only=True):
+        self.only = only
+        self.columns = {}        # join prefix -> field names, or None for "all"
+        self.models = {}         # join prefix -> model
+        self.select = set()
+        self.prefetch = []
+
+    def level(self, prefix, model):
+        self.models[prefix] = model
+        self.columns.setdefault(prefix, set())
+
+    def load(self, prefix, name):
+        if self.columns[prefix] is not None:
+            self.columns[prefix].add(name)
+
+    def load_all(self, prefix):
+        self.columns[prefix] = None
+
+    def only_fields(self):
+        names = []
+        for prefix, columns in self.columns.items():
+            if columns is None:
+                columns = [field.name for field in self.models[prefix]._meta.concrete_fields]
+            names += [f'{prefix}{name}' for name in columns]
+        return names
+
+
+def _forward_relation(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if field.concrete and (field.many_to_one or field.one_to_one):
+        return field
+    return None
+
+
+def _plan_serializer(serializer, model, plan, prefix=''):
+    plan.level(prefix, model)
+    for field in _unwrap(serializer).fields.values():
+        if field.write_only:
+            continue
+        _plan_field(field, model, plan, prefix)
+
+
+def _plan_field(field, model, plan, prefix):
+    attrs = [] if field.source == '*' else field.source_attrs
+    if not attrs:
+        if isinstance(field, BaseSerializer):
+            _plan_serializer(field, model, plan, prefix)
+        else:
+            plan.load_all(prefix)
+        return
+
+    # Walk forward relations (source='table.floor.name'), joining each
+    for attr in attrs[:-1]:
+        relation = _forward_relation(model, attr)
+        if relation is None:
+            plan.load_all(prefix)
+            return
+        plan.load(prefix, attr)
+        plan.select.add(f'{prefix}{attr}')
+        prefix, model = f'{prefix}{attr}__', relation.related_model
+        plan.level(prefix, model)
+
+    name = attrs[-1]
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # Property or method: it may read any column
+        plan.load_all(prefix)
+        return
+
+    nested = _unwrap(field)
+    if isinstance(field, (ListSerializer, ManyRelatedField)):
+        if isinstance(nested, BaseSerializer):
+            related = model_field.related_model
+            inner = _Plan(plan.only)
+            _plan_serializer(nested, related, inner)
+            if model_field.one_to_many:
+                # Prefetching matches rows on the foreign key back to us
+                inner.load('', model_field.field.name)
+            plan.prefetch.append(Prefetch(f'{prefix}{name}', queryset=apply_plan(related._default_manager.all(), inner)))
+        else:
+            plan.prefetch.append(f'{prefix}{name}')
+    elif isinstance(nested, BaseSerializer):
+        if _forward_relation(model, name) is None:
+            return
+        plan.load(prefix, name)
+        plan.select.add(f'{prefix}{name}')
+        _plan_serializer(nested, model_field.related_model, plan, f'{prefix}{name}__')
+    elif model_field.concrete:
+        plan.load(prefix, name)
+    else:
+        plan.load_all(prefix)
+
+
+def apply_plan(queryset, plan):
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if plan.select:
+        queryset = queryset.select_related(*sorted(plan.select))
+    if plan.prefetch:
+        queryset = queryset.prefetch_related(*plan.prefetch)
+    if plan.only and any(columns is not None for columns in plan.columns.values()):
+        queryset = queryset.only(*plan.only_fields())
+    return queryset
+
+
+def shape_queryset(queryset, serializer, only=True, keep=()):
+    """
+    Joins, prefetches and (with `only`) columns for rendering `serializer`.
+
+    `keep` names root fields to load regardless (e.g. the ordering field
+    keyset pagination reads from the last row).
+    """
+    plan = _Plan(only)
+    _plan_serializer(serializer, queryset.model, plan)
+    for name in keep:
+        try:
+            if queryset.model._meta.get_field(name).concrete:
+                plan.load('', name)
+        except FieldDoesNotExist:
+            pass
+    return apply_plan(queryset, plan)
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields= / ?expand= for a ModelViewSet (see module docstring).
+    Mix in before the viewset class; `sparse_keep` names fields the view
+    itself reads from the instances, loaded even when not requested.
+    """
+    sparse_actions = ('list', 'retrieve')
+    sparse_keep = ()
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def get_sparse_trees(self):
+        params = self.request.query_params
+        return parse_tree(params.get(self.fields_query_param)), parse_tree(params.get(self.expand_query_param))
+
+    def shape_serializer(self, serializer):
+        fields, expand = self.get_sparse_trees()
+        if expand:
+            expand_serializer(serializer, expand)
+        if fields:
+            prune_serializer(serializer, fields)
+        return serializer
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.action in self.sparse_actions:
+            self.shape_serializer(serializer)
+        return serializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.sparse_actions:
+            return queryset
+        fields, _ = self.get_sparse_trees()
+        return shape_queryset(queryset, self.get_serializer(), only=bool(fields), keep=self._ordering_fields(queryset) | set(self.sparse_keep))
+
+    def _ordering_fields(self, queryset):
+        names = list(queryset.query.order_by) + list(queryset.model._meta.ordering)
+        for attr in ('ordering', 'ordering_fields'):
+            value = getattr(self, attr, None) or []
+            names += [value] if isinstance(value, str) else list(value)
+        ordering = getattr(getattr(self, 'paginator', None), 'ordering', None)
+        if isinstance(ordering, str):
+            names.append(ordering)
+        return {name.lstrip('-') for name in names if isinstance(name, str)}
@@ -0,0 +1,46 @@
+"""
+Loaded field values for models whose saves are diffed in signal handlers.
+
+Models list the fields in `tracked_fields`; instances read from the
+database (Django's from_db() hook) keep those values, so a post_save
+handler can compare old and new without a query. Unlike a post_init
+receiver this costs nothing for instances built in code, and nothing for
+models that do not track anything.
+
+    class Order(LoadedStateMixin, models.Model):
+        tracked_fields = ('status', 'total_amount')
+
+    previous = instance.loaded_state     # tuple, or None if unknown
+    ...
+    instance.remember_state()            # after handling a save
+
+Deferred fields leave the state unknown (None) rather than being loaded:
+that would be a query per instance, and is not allowed in async code.
+"""
+
+
+class LoadedStateMixin:
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_state()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_state()
+
+    def remember_state(self):
+        """Note the current values of `tracked_fields` as the stored ones."""
+        values = self.__dict__
+        if all(field in values for field in self.tracked_fields):
+            self._loaded_state = tuple(values[field] for field in self.tracked_fields)
+        else:
+            self._loaded_state = None
+
+    @property
+    def loaded_state(self):
+        """Stored values of `tracked_fields`, or None for unsaved or partly loaded instances."""
+        return self.__dict__.get('_loaded_state')
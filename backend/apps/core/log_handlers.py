@@ -0,0 +1,174 @@
+"""
+Asynchronous, buffered logging handlers.
+
+Request threads only put records on an in-memory queue (AsyncHandler); a
+background QueueListener thread hands them to the real handler, so console
+and disk I/O never run on the request path. The file target buffers
+formatted records and writes them in batches with size-based rotation.
+
+Configured from settings.LOGGING, e.g.:
+
+    'file': {
+        '()': 'apps.core.log_handlers.AsyncHandler',
+        'target': 'apps.core.log_handlers.BatchingRotatingFileHandler',
+        'filename': LOGS_DIR / 'debug.log',
+        'maxBytes': 10 * 1024 * 1024,
+        'backupCount': 5,
+        'formatter': 'verbose',
+        'filters': ['sample_debug'],
+    }
+"""
+import copy
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from django.utils.module_loading import import_string
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that writes records in batches.
+
+    Formatted records are buffered and written with a single write() once
+    `batch_size` records are pending, `flush_interval` seconds have passed,
+    or an ERROR (or worse) record arrives. Rotation happens before a batch
+    that would push the file past maxBytes.
+    """
+
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0,
+                 encoding=None, delay=True, batch_size=100, flush_interval=1.0):
+        super().__init__(
+            filename, mode=mode, maxBytes=maxBytes, backupCount=backupCount,
+            encoding=encoding, delay=delay
+        )
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            self.buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+
+        if (len(self.buffer) >= self.batch_size
+                or record.levelno >= logging.ERROR
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            self.last_flush = time.monotonic()
+            if not self.buffer:
+                return
+            data = ''.join(self.buffer)
+            self.buffer.clear()
+
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() and self.stream.tell() + len(data) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            self.buffer.clear()
+            self.handleError(None)
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in `sample_every` records at or below `max_level`, per logger.
+
+    Higher-level records always pass. Attach it to an AsyncHandler so
+    dropped records never reach the queue.
+    """
+
+    def __init__(self, sample_every=10, max_level='DEBUG'):
+        super().__init__()
+        self.sample_every = max(1, int(sample_every))
+        self.max_level = logging.getLevelName(max_level) if isinstance(max_level, str) else max_level
+        self.counters = {}
+
+    def filter(self, record):
+        if self.sample_every == 1 or record.levelno > self.max_level:
+            return True
+        # Unlocked counter: a racing thread can shift the sample slightly,
+        # which is fine for sampling
+        seen = self.counters.get(record.name, 0)
+        self.counters[record.name] = seen + 1
+        return seen % self.sample_every == 0
+
+
+class _FlushingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers whenever the queue goes idle."""
+
+    def __init__(self, queue, *handlers, flush_interval=1.0):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.flush_interval if block else None)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+
+class AsyncHandler(QueueHandler):
+    """
+    Queue-backed handler that forwards records to `target` on a listener thread.
+
+    target: dotted path of the real handler class; remaining keyword
+    arguments are passed to it. The formatter set on this handler is applied
+    by the target on the listener thread. When the queue is full, records
+    are dropped and counted in `dropped` rather than blocking the request.
+    """
+
+    def __init__(self, target, queue_size=10000, flush_interval=1.0, **target_kwargs):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        handler_class = import_string(target) if isinstance(target, str) else target
+        self.target = handler_class(**target_kwargs)
+        self.dropped = 0
+        self.listener = _FlushingQueueListener(self.queue, self.target, flush_interval=flush_interval)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread, in the target handler
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Merge args now (they may be mutated after the call returns) but
+        # leave the formatting to the target
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        self.target.close()
+        super().close()
@@ -0,0 +1,409 @@
+"""
+In-process metrics in Prometheus text exposition format.
+
+A small registry of counters, gauges and histograms with labels, rendered by
+GET /metrics. Values are per process: scrape every worker (or run one
+Daphne process per target) rather than expecting them to be aggregated.
+
+Usage:
+    from apps.core import metrics
+    metrics.ORDERS_CREATED.inc(source='qr')
+    metrics.BROADCAST_LATENCY.observe(0.004, group='kitchen_orders')
+"""
+import hmac
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+_collectors = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.lock = threading.Lock()
+        self.values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def header(self):
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            items = list(self.values.items())
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}' for key, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self.lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self.values.items()]
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, [('le', _format_value(float(bound)))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.label_names, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+def register_collector(collect):
+    """Register a callable run at scrape time (e.g. to refresh a gauge)."""
+    _collectors.append(collect)
+
+
+def render():
+    """The whole registry in text exposition format."""
+    for collect in _collectors:
+        collect()
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+# =============================================================================
+# POS metrics
+# =============================================================================
+
+REQUEST_LATENCY = Histogram(
+    'pos_http_request_duration_seconds',
+    'HTTP request latency by view and action.',
+    labels=('view', 'action', 'method', 'status'),
+)
+DB_QUERIES = Counter(
+    'pos_db_queries_total',
+    'SQL queries executed while handling requests, by view.',
+    labels=('view',),
+)
+ORDERS_CREATED = Counter(
+    'pos_orders_created_total',
+    'Orders created, by source (pos, qr).',
+    labels=('source',),
+)
+ORDERS_SENT_TO_KITCHEN = Counter(
+    'pos_orders_sent_to_kitchen_total',
+    'Orders sent to the kitchen, by source (pos, payment).',
+    labels=('source',),
+)
+ORDERS_COMPLETED = Counter(
+    'pos_orders_completed_total',
+    'Orders marked completed, by source (kitchen, pos).',
+    labels=('source',),
+)
+PAYMENT_VERIFICATIONS = Counter(
+    'pos_payment_verifications_total',
+    'Razorpay payment verification outcomes.',
+    labels=('outcome',),
+)
+BROADCAST_LATENCY = Histogram(
+    'pos_channel_broadcast_duration_seconds',
+    'Channel-layer group_send latency, by group kind (kitchen_orders, floor, order).',
+    labels=('group',),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+CHANNEL_QUEUE_DEPTH = Gauge(
+    'pos_channel_layer_queue_depth',
+    'Messages waiting in channel-layer queues, by layer alias (Redis layers: all workers).',
+    labels=('layer',),
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    'pos_websocket_connections',
+    'Open WebSocket connections, by group.',
+    labels=('group',),
+)
+WEBSOCKET_RESYNCS = Counter(
+    'pos_websocket_resyncs_total',
+    'Send-buffer overflows answered with a resync, by consumer.',
+    labels=('consumer',),
+)
+WEBSOCKET_DROPPED_MESSAGES = Counter(
+    'pos_websocket_dropped_messages_total',
+    'Messages dropped from full per-socket send buffers, by consumer.',
+    labels=('consumer',),
+)
+WEBSOCKET_EVICTIONS = Counter(
+    'pos_websocket_evictions_total',
+    'Sockets closed for being slow or unresponsive, by consumer and reason.',
+    labels=('consumer', 'reason'),
+)
+WEBSOCKET_REJECTED = Counter(
+    'pos_websocket_rejected_total',
+    'WebSocket handshakes refused, by reason.',
+    labels=('reason',),
+)
+CACHE_REQUESTS = Counter(
+    'pos_cache_requests_total',
+    'Two-tier cache lookups, by namespace and result (l1_hit, l2_hit, coalesced, miss).',
+    labels=('namespace', 'result'),
+)
+CACHE_BUILD_SECONDS = Histogram(
+    'pos_cache_build_duration_seconds',
+    'Time spent rebuilding a cache value after a miss, by namespace.',
+    labels=('namespace',),
+)
+
+
+# (alias, host index) -> sync redis client, for scrapes of RedisChannelLayer
+_redis_clients = {}
+
+
+def _redis_client(alias, index, host):
+    client = _redis_clients.get((alias, index))
+    if client is None:
+        import redis
+
+        options = dict(host)
+        address = options.pop('address', None)
+        client = redis.Redis.from_url(address, **options) if address else redis.Redis(**options)
+        _redis_clients[alias, index] = client
+    return client
+
+
+def _redis_queue_depth(alias, channel_layer):
+    """
+    Messages waiting on a RedisChannelLayer, over all its shards.
+
+    Each process's consumer channels share one sorted set per process
+    (`<prefix>specific.<client prefix>!`), so the depth is the ZCARD of
+    the keys matching `<prefix>specific.*`. Group keys (`<prefix>:group:`)
+    are not queues and are not counted.
+    """
+    pattern = f'{channel_layer.prefix}specific.*'
+    depth = 0
+    for index, host in enumerate(channel_layer.hosts):
+        client = _redis_client(alias, index, host)
+        keys = list(client.scan_iter(match=pattern, count=1000))
+        if keys:
+            pipeline = client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.zcard(key)
+            depth += sum(pipeline.execute())
+    return depth
+
+
+def _queue_depth(alias, channel_layer):
+    queues = getattr(channel_layer, 'channels', None)
+    if isinstance(queues, dict):
+        # In-memory layer: this process's queues
+        return sum(queue.qsize() for queue in list(queues.values()))
+    if hasattr(channel_layer, 'prefix') and hasattr(channel_layer, 'hosts'):
+        return _redis_queue_depth(alias, channel_layer)
+    return None
+
+
+def _collect_channel_queue_depth():
+    from channels.layers import channel_layers
+
+    for alias in getattr(settings, 'CHANNEL_LAYERS', {}):
+        try:
+            depth = _queue_depth(alias, channel_layers[alias])
+        except Exception:
+            # An unreachable Redis must not fail the whole scrape
+            logger.warning('Could not read queue depth of channel layer %r', alias, exc_info=True)
+            continue
+        if depth is not None:
+            CHANNEL_QUEUE_DEPTH.set(depth, layer=alias)
+
+
+register_collector(_collect_channel_queue_depth)
+
+
+# =============================================================================
+# Middleware and endpoint
+# =============================================================================
+
+def _view_labels(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched', ''
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    view = view_class.__name__ if view_class else match.view_name
+    actions = getattr(match.func, 'actions', None)
+    action = actions.get(request.method.lower(), '') if actions else ''
+    return view, action
+
+
+# Queries of the current request. The counting wrapper sits on every
+# connection, and the context follows the request into the threads sync
+# views and sync_to_async ORM calls run on under ASGI.
+_request_queries = ContextVar('metrics_request_queries', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        # First, so block-scoped wrappers (execute_wrapper()) still pop their own
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+connection_created.connect(_install_query_counter, dispatch_uid='metrics_query_counter')
+
+
+class MetricsMiddleware:
+    """
+    Record request latency and query count for every request but /metrics.
+
+    Sync and async capable, so async views are not pushed onto a thread.
+    Queries are counted wherever the request's code runs them (see
+    _request_queries), sync views under ASGI and async views' ORM calls
+    included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        for connection in connections.all(initialized_only=True):
+            _install_query_counter(connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if request.path == '/metrics':
+            return self.get_response(request)
+
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, time.perf_counter() - start, queries[0])
+        return response
+
+    async def __acall__(self, request):
+        if request.path == '/metrics':
+            return await self.get_response(request)
+
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, time.perf_counter() - start, queries[0])
+        return response
+
+    def _observe(self, request, response, duration, queries):
+        view, action = _view_labels(request)
+        REQUEST_LATENCY.observe(
+            duration, view=view, action=action,
+            method=request.method, status=f'{response.status_code // 100}xx'
+        )
+        if queries:
+            DB_QUERIES.inc(queries, view=view)
+
+
+def metrics_view(request):
+    """
+    GET /metrics
+    Text exposition for Prometheus. When METRICS_TOKEN is set the scraper
+    must send `Authorization: Bearer <token>`; without a token the endpoint
+    is only open with DEBUG on.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
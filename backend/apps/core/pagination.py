@@ -0,0 +1,169 @@
+"""
+Keyset (cursor) pagination for large, append-mostly lists.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate on (ordering field, id) instead of OFFSET/COUNT.
+
+    Each page is a single indexed range query, so page 500 costs the same as
+    page one. The ordering field comes from the view's `ordering` attribute
+    (e.g. ordering = ['-created_at']) and can be switched with ?ordering= to
+    any of the view's `ordering_fields`. The field must be non-null.
+
+    Query params:
+        cursor      Opaque position returned as `next` / `previous`
+        page_size   Items per page (capped at max_page_size)
+        count       'exact' for COUNT(*), 'approx' for a count capped at
+                    approximate_count_limit. Omitted by default.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    approximate_count_limit = 1000
+    ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.count, self.count_is_approximate = self.get_count(queryset, request)
+
+        results = list(self.page_queryset(queryset, request, view))
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        reverse = bool(self.cursor and self.cursor['reverse'])
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = results
+        return results
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        The requested page as an unevaluated range query, with one extra
+        row to tell whether there is a next page (also used by conditional
+        GET to fingerprint just the page).
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering_field = self.get_ordering(request, view)
+
+        field = self.ordering_field.lstrip('-')
+        descending = self.ordering_field.startswith('-')
+        self.cursor = cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['reverse'])
+
+        # Walking backwards (previous page) flips the scan direction
+        scan_descending = descending != reverse
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(f'{prefix}{field}', f'{prefix}id')
+
+        if cursor:
+            lookup = 'lt' if scan_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{lookup}': cursor['value']}) |
+                Q(**{field: cursor['value'], f'id__{lookup}': cursor['id']})
+            )
+        return queryset[:self.page_size + 1]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request, view):
+        default = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(default, (list, tuple)):
+            default = default[0]
+
+        param = request.query_params.get(api_settings.ORDERING_PARAM)
+        if param:
+            requested = param.split(',')[0].strip()
+            if requested.lstrip('-') in (getattr(view, 'ordering_fields', None) or ()):
+                return requested
+        return default
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return queryset.count(), False
+        if mode == 'approx':
+            # COUNT over a LIMITed subquery: bounded cost however large the table
+            limit = self.approximate_count_limit
+            count = queryset.order_by()[:limit + 1].count()
+            return min(count, limit), count > limit
+        return None, False
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii'))
+            field, value, pk, reverse = json.loads(raw)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if field != self.ordering_field:
+            raise NotFound(self.invalid_cursor_message)
+        return {'value': value, 'id': pk, 'reverse': bool(reverse)}
+
+    def encode_cursor(self, item, reverse):
+        # Items are model instances, or values() rows (apps.core.compiled)
+        if isinstance(item, dict):
+            value, pk = item[self.ordering_field.lstrip('-')], item['id']
+        else:
+            value, pk = getattr(item, self.ordering_field.lstrip('-')), item.pk
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif not isinstance(value, (int, float, str)):
+            value = str(value)
+        raw = json.dumps([self.ordering_field, value, pk, int(reverse)])
+        encoded = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_page_metadata(self):
+        """Pagination keys to merge into an APIResponse payload."""
+        metadata = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.count is not None:
+            metadata['count'] = self.count
+            metadata['count_is_approximate'] = self.count_is_approximate
+        return metadata
+
+    def get_paginated_response(self, data):
+        return Response({'results': data, **self.get_page_metadata()})
+
@@ -0,0 +1,38 @@
+"""
+orjson-backed JSON request parsing (see renderers.py for the output side).
+"""
+import codecs
+import io
+import re
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser, get_encoding
+
+from .renderers import ORJSONRenderer
+
+# 20+ digits in a row may be an integer wider than 64 bits
+_WIDE_DIGITS = re.compile(rb'\d{20}')
+
+
+class ORJSONParser(JSONParser):
+    """
+    Drop-in JSONParser using orjson.
+
+    orjson only reads UTF-8 and always rejects NaN/Infinity (as
+    STRICT_JSON does); bodies in other charsets go to the stdlib parser.
+    So do bodies that may hold integers wider than 64 bits, which orjson
+    would read as floats.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if codecs.lookup(get_encoding(parser_context or {})).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if _WIDE_DIGITS.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
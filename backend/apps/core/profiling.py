@@ -0,0 +1,268 @@
+"""
+Per-request profiling: SQL, N+1 signatures, channel sends and view time.
+
+Enabled with settings.PROFILING['ENABLED']. For each request the middleware
+records the query count and time, repeated query templates (the N+1
+signature), channel-layer sends made through apps.core.broadcast and JSON
+rendering time (reported by apps.core.renderers). What is left of the
+request's time is the view's own Python: serializers, mostly. Results are
+returned as a Server-Timing header and aggregated per view for
+GET /api/debug/profile/.
+
+Query budgets are per view name (e.g. 'orders:order-list'). Exceeding one
+logs a warning, or raises QueryBudgetExceeded when PROFILING['STRICT'] is
+set, which fails any test client request that goes over budget. Tests can
+also wrap code in `query_budget('orders:order-list')` directly.
+
+Settings:
+    PROFILING = {
+        'ENABLED': True,
+        'STRICT': False,
+        'QUERY_BUDGETS': {'orders:order-list': 6},
+        'DUPLICATE_THRESHOLD': 3,
+    }
+"""
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+logger = logging.getLogger(__name__)
+
+_current_profile = ContextVar('request_profile', default=None)
+
+_report_lock = threading.Lock()
+_report = {}
+
+_WHITESPACE = re.compile(r'\s+')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a view or block runs more queries than its budget."""
+
+
+def get_profiling_settings():
+    config = getattr(settings, 'PROFILING', {}) or {}
+    return {
+        'ENABLED': config.get('ENABLED', False),
+        'STRICT': config.get('STRICT', False),
+        'QUERY_BUDGETS': config.get('QUERY_BUDGETS', {}),
+        'DUPLICATE_THRESHOLD': config.get('DUPLICATE_THRESHOLD', 3),
+    }
+
+
+def query_signature(sql):
+    """Normalise SQL to a template so repeated lookups collapse together."""
+    sql = _LITERAL.sub('%s', _WHITESPACE.sub(' ', sql).strip())
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class RequestProfile:
+    """Measurements collected for one request."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_time = 0.0
+        self.signatures = {}
+        self.channel_sends = 0
+        self.channel_time = 0.0
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.query_time += time.perf_counter() - start
+            signature = query_signature(sql)
+            self.signatures[signature] = self.signatures.get(signature, 0) + 1
+
+    def duplicates(self, threshold=2):
+        """Query templates run at least `threshold` times, most repeated first."""
+        repeated = [(sql, count) for sql, count in self.signatures.items() if count >= threshold]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+    def describe_duplicates(self, limit=3):
+        return '; '.join(f"{count}x {sql[:160]}" for sql, count in self.duplicates()[:limit]) or 'none'
+
+    def app_time(self, total):
+        """Request time outside SQL, channel sends and rendering (view code, serializers)."""
+        return max(total - self.query_time - self.channel_time - self.render_time, 0.0)
+
+    def server_timing(self, total):
+        duplicate_count = sum(count - 1 for _, count in self.duplicates())
+        return ', '.join([
+            f'db;dur={self.query_time * 1000:.1f};desc="{self.query_count} queries, {duplicate_count} duplicate"',
+            f'app;dur={self.app_time(total) * 1000:.1f};desc="view code and serializers"',
+            f'render;dur={self.render_time * 1000:.1f};desc="JSON rendering"',
+            f'chan;dur={self.channel_time * 1000:.1f};desc="{self.channel_sends} channel sends"',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+def record_channel_send(duration):
+    """Count a channel-layer send against the current request, if profiled."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.channel_sends += 1
+        profile.channel_time += duration
+
+
+def record_render(duration):
+    """Count response rendering against the current request, if profiled."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.render_time += duration
+
+
+def _record(view_name, profile, total):
+    with _report_lock:
+        entry = _report.setdefault(view_name, {
+            'requests': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'queries': 0,
+            'max_queries': 0,
+            'query_ms': 0.0,
+            'app_ms': 0.0,
+            'render_ms': 0.0,
+            'channel_sends': 0,
+            'budget_exceeded': 0,
+            'n_plus_one': {},
+        })
+        entry['requests'] += 1
+        entry['total_ms'] += total * 1000
+        entry['max_ms'] = max(entry['max_ms'], total * 1000)
+        entry['queries'] += profile.query_count
+        entry['max_queries'] = max(entry['max_queries'], profile.query_count)
+        entry['query_ms'] += profile.query_time * 1000
+        entry['app_ms'] += profile.app_time(total) * 1000
+        entry['render_ms'] += profile.render_time * 1000
+        entry['channel_sends'] += profile.channel_sends
+        threshold = get_profiling_settings()['DUPLICATE_THRESHOLD']
+        for signature, count in profile.duplicates(threshold):
+            entry['n_plus_one'][signature] = max(entry['n_plus_one'].get(signature, 0), count)
+        return entry
+
+
+def get_report():
+    """Per-view aggregate, with averages, sorted by total time."""
+    budgets = get_profiling_settings()['QUERY_BUDGETS']
+    with _report_lock:
+        rows = []
+        for view_name, entry in _report.items():
+            requests = entry['requests']
+            rows.append({
+                'view': view_name,
+                'requests': requests,
+                'avg_ms': round(entry['total_ms'] / requests, 2),
+                'max_ms': round(entry['max_ms'], 2),
+                'avg_queries': round(entry['queries'] / requests, 2),
+                'max_queries': entry['max_queries'],
+                'query_budget': budgets.get(view_name),
+                'budget_exceeded': entry['budget_exceeded'],
+                'avg_query_ms': round(entry['query_ms'] / requests, 2),
+                'avg_app_ms': round(entry['app_ms'] / requests, 2),
+                'avg_render_ms': round(entry['render_ms'] / requests, 2),
+                'channel_sends': entry['channel_sends'],
+                'n_plus_one': [
+                    {'sql': sql, 'max_repeats': count}
+                    for sql, count in sorted(entry['n_plus_one'].items(), key=lambda item: item[1], reverse=True)
+                ],
+                '_total_ms': entry['total_ms'],
+            })
+    rows.sort(key=lambda row: row['_total_ms'], reverse=True)
+    for row in rows:
+        del row['_total_ms']
+    return rows
+
+
+def reset_report():
+    with _report_lock:
+        _report.clear()
+
+
+class ProfilingMiddleware:
+    """
+    Profile each request; see module docstring.
+
+    Keep it first in MIDDLEWARE so the total covers the whole stack. It is
+    sync only, so while profiling is on async views are adapted onto a
+    thread (and their ORM queries are counted there).
+    """
+
+    def __init__(self, get_response):
+        if not get_profiling_settings()['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(profile):
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        total = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else request.path
+        entry = _record(view_name, profile, total)
+        response['Server-Timing'] = profile.server_timing(total)
+
+        config = get_profiling_settings()
+        budget = config['QUERY_BUDGETS'].get(view_name)
+        if budget is not None and profile.query_count > budget:
+            with _report_lock:
+                entry['budget_exceeded'] += 1
+            message = (
+                f"{view_name} ran {profile.query_count} queries (budget {budget}); "
+                f"most repeated: {profile.describe_duplicates()}"
+            )
+            if config['STRICT']:
+                raise QueryBudgetExceeded(message)
+            logger.warning(f"Query budget exceeded: {message}")
+
+        return response
+
+
+@contextmanager
+def query_budget(budget):
+    """
+    Fail with QueryBudgetExceeded if the block runs more than `budget` queries.
+
+    `budget` is a number or a view name from PROFILING['QUERY_BUDGETS'].
+
+        with query_budget('orders:order-list'):
+            client.get('/api/orders/')
+    """
+    if isinstance(budget, str):
+        view_name, budget = budget, get_profiling_settings()['QUERY_BUDGETS'][budget]
+    else:
+        view_name = 'block'
+
+    with CaptureQueriesContext(connection) as captured:
+        yield captured
+
+    if len(captured) > budget:
+        profile = RequestProfile()
+        for query in captured.captured_queries:
+            signature = query_signature(query['sql'])
+            profile.signatures[signature] = profile.signatures.get(signature, 0) + 1
+        raise QueryBudgetExceeded(
+            f"{view_name} ran {len(captured)} queries (budget {budget}); "
+            f"most repeated: {profile.describe_duplicates()}"
+        )
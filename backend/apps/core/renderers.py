@@ -0,0 +1,137 @@
+"""
+orjson-backed JSON encoding for API responses.
+
+Two output conventions are kept, byte-for-byte where it matters:
+
+    dumps()         DRF's JSONRenderer: Decimal -> number, datetimes in
+                    full ISO 8601 with 'Z' for UTC (ORJSONRenderer, i.e.
+                    every APIResponse from a DRF view)
+    dumps_django()  Django's DjangoJSONEncoder: Decimal -> string,
+                    datetimes to milliseconds (AsyncAPIResponse)
+
+orjson encodes dicts, lists, strings, numbers, UUIDs and (for dumps())
+datetimes natively; everything else goes through the original encoder's
+default(), so the long tail (lazy strings, timedeltas, querysets...) is
+unchanged. Integers wider than 64 bits never reach default() (orjson
+rejects them outright), so data holding one is encoded by the stdlib
+json module with the same default() instead.
+
+SerializedJSON marks bytes that are already JSON. As a top-level value of
+the encoded dict (the APIResponse envelope's `data`) it is spliced in as
+is, so a cached payload is never decoded and re-encoded per request:
+
+    return APIResponse.success(data=SerializedJSON(cached_bytes))
+"""
+import json
+import time
+
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .profiling import record_render
+
+_LINE_SEPARATORS = (b'\xe2\x80\xa8', b'\xe2\x80\xa9')  # U+2028, U+2029
+
+
+class SerializedJSON(bytes):
+    """Bytes holding a JSON document, embedded without re-encoding."""
+
+
+_drf_encoder = JSONEncoder()
+_django_encoder = DjangoJSONEncoder()
+
+
+def _drf_default(obj):
+    if isinstance(obj, SerializedJSON):
+        # Nested deeper than the envelope: decode so it can be embedded
+        return orjson.loads(memoryview(obj))
+    return _drf_encoder.default(obj)
+
+
+def _django_default(obj):
+    if isinstance(obj, SerializedJSON):
+        return orjson.loads(memoryview(obj))
+    return _django_encoder.default(obj)
+
+
+_DRF_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+_DJANGO_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _encode(data, default, options):
+    try:
+        encoded = _orjson_encode(data, default, options)
+    except TypeError:
+        # orjson refuses ints outside 64 bits without calling default();
+        # the stdlib encoder (slower, same output) takes them
+        encoded = json.dumps(
+            data, default=default, ensure_ascii=False, separators=(',', ':')
+        ).encode()
+
+    # Like DRF, escape the two characters that are valid JSON but not JavaScript
+    if _LINE_SEPARATORS[0] in encoded or _LINE_SEPARATORS[1] in encoded:
+        encoded = encoded.replace(_LINE_SEPARATORS[0], b'\\u2028').replace(_LINE_SEPARATORS[1], b'\\u2029')
+    return encoded
+
+
+def _orjson_encode(data, default, options):
+    if isinstance(data, dict) and any(isinstance(value, SerializedJSON) for value in data.values()):
+        # Encode the rest of the object, then splice the raw values in
+        head = orjson.dumps(
+            {key: value for key, value in data.items() if not isinstance(value, SerializedJSON)},
+            default=default, option=options
+        )
+        parts = [head[:-1]]
+        separator = b'' if head == b'{}' else b','
+        for key, value in data.items():
+            if isinstance(value, SerializedJSON):
+                parts += [separator, orjson.dumps(str(key)), b':', value]
+                separator = b','
+        parts.append(b'}')
+        return b''.join(parts)
+    return orjson.dumps(data, default=default, option=options)
+
+
+def dumps(data):
+    """Encode `data` as DRF's JSONRenderer would (compact, UTF-8)."""
+    return _encode(data, _drf_default, _DRF_OPTIONS)
+
+
+def dumps_django(data):
+    """Encode `data` as json.dumps(data, cls=DjangoJSONEncoder) would (compact, UTF-8)."""
+    return _encode(data, _django_default, _DJANGO_OPTIONS)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer using orjson.
+
+    Requests for indented output (`Accept: application/json; indent=4`)
+    and non-default UNICODE_JSON/COMPACT_JSON settings fall back to the
+    stdlib renderer. NaN and infinities encode as null instead of raising.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        start = time.perf_counter()
+        try:
+            return self._render(data, accepted_media_type, renderer_context)
+        finally:
+            # Request profiling (apps.core.profiling)
+            record_render(time.perf_counter() - start)
+
+    def _render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context):
+            if isinstance(data, dict):
+                data = {
+                    key: orjson.loads(memoryview(value)) if isinstance(value, SerializedJSON) else value
+                    for key, value in data.items()
+                }
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
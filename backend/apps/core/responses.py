@@ -1,9 +1,12 @@
 """
 Base response utilities for consistent API responses.
 """
+from django.http import HttpResponse
 from rest_framework.response import Response
 from rest_framework import status
 
+from .renderers import SerializedJSON, dumps_django
+
 
 class APIResponse:
     """
@@ -12,6 +15,9 @@ class APIResponse:
     Usage:
         return APIResponse.success(data={'user': user_data}, message='User created')
         return APIResponse.error(message='Invalid credentials', error_code='INVALID_CREDENTIALS')
+
+    `data` may be SerializedJSON (bytes that are already JSON, e.g. from a
+    cache); the renderer splices it into the envelope without re-encoding.
     """
     
     @staticmethod
@@ -90,3 +96,57 @@ class APIResponse:
             error_code='NOT_FOUND',
             status_code=status.HTTP_404_NOT_FOUND
         )
+
+
+class AsyncAPIResponse:
+    """
+    The APIResponse envelope for plain async Django views.
+
+    DRF's Response needs a DRF view to render it, so async views return a
+    JSON HttpResponse with the same shape instead, encoded with
+    dumps_django() (Decimals as strings, as DjangoJSONEncoder does).
+    `data` may be SerializedJSON, as for APIResponse.
+
+    Usage:
+        return AsyncAPIResponse.success(data=bundle)
+        return AsyncAPIResponse.success(data=SerializedJSON(cached_bytes))
+        return AsyncAPIResponse.not_found('Order not found')
+    """
+
+    @staticmethod
+    def _json(response_data, status_code):
+        return HttpResponse(dumps_django(response_data), status=status_code, content_type='application/json')
+
+    @staticmethod
+    def success(data=None, message='Success', status_code=status.HTTP_200_OK):
+        response_data = {
+            'success': True,
+            'message': message,
+        }
+        if data is not None:
+            response_data['data'] = data
+        return AsyncAPIResponse._json(response_data, status_code)
+
+    @staticmethod
+    def error(
+        message='An error occurred',
+        errors=None,
+        error_code='ERROR',
+        status_code=status.HTTP_400_BAD_REQUEST
+    ):
+        response_data = {
+            'success': False,
+            'message': message,
+            'error_code': error_code,
+        }
+        if errors:
+            response_data['errors'] = errors
+        return AsyncAPIResponse._json(response_data, status_code)
+
+    @staticmethod
+    def not_found(message='Resource not found'):
+        return AsyncAPIResponse.error(
+            message=message,
+            error_code='NOT_FOUND',
+            status_code=status.HTTP_404_NOT_FOUND
+        )
@@ -0,0 +1,206 @@
+"""
+In-memory ranked search for small catalogs (products, categories).
+
+A SearchIndex is built once from {doc_id: [(text, weight), ...]} and then
+answers type-ahead queries without touching the database:
+
+    index = SearchIndex({1: [('Caffe Latte', 3), ('Hot drinks', 1)], ...})
+    index.search('caf lat')        # [(1, 4.86), ...] best first
+
+Text is case- and accent-folded and split into words. Every query word
+must match some word of a document, in one of three ways, best first:
+
+    exact       'latte'  -> latte
+    prefix      'lat'    -> latte           (the word being typed; shorter
+                                             completions rank higher)
+    typo        'latet'  -> latte           (one edit from 4 letters, two
+                                             from 8; also against what has
+                                             been typed: 'capu' -> cappuccino)
+
+Typos are only considered for a query word with no exact or prefix match,
+as typo-tolerant search engines usually do. A document scores the sum
+over query words of its best match times the weight of the field the
+word is in; the first word of a field counts extra.
+
+Lookups are dict hits: word -> postings, prefix -> words, and a deletion
+index for typos (every indexed prefix and its one-letter deletions ->
+words), so candidates are only verified by edit distance, never scanned.
+Per-word scores ({doc_id: score}) are memoized, so the next keystroke and
+the other tills typing the same thing are answered from memory; only the
+`limit` best results are ranked (a heap selection, not a full sort).
+
+IndexedSearchFilter answers DRF's ?search= from a view's index.
+"""
+import heapq
+import re
+import unicodedata
+
+from django.db.models import Case, IntegerField, Value, When
+from rest_framework.filters import SearchFilter
+
+EXACT, FUZZY = 1.0, 0.5
+PREFIX_MIN, PREFIX_MAX = 0.6, 0.8     # by how much of the word is typed
+FIRST_WORD = 1.25                     # boost for a field's first word
+MIN_TYPO_LENGTH = 4
+TYPO_PREFIX_LENGTH = 8                # longest prefix in the typo index
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Casefold and strip accents: 'Café Crème' -> 'cafe creme'."""
+    text = (text or '').casefold()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def words(text):
+    return _WORD.findall(normalize(text))
+
+
+def max_edits(term):
+    if len(term) >= 8:
+        return 2
+    if len(term) >= MIN_TYPO_LENGTH:
+        return 1
+    return 0
+
+
+def _typo_keys(text):
+    return {text} | {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+def prefix_distance(term, word, limit):
+    """
+    Smallest optimal-string-alignment distance between `term` and the
+    word or any prefix of it (transpositions count once), or limit + 1
+    once it must exceed `limit`.
+    """
+    word = word[:len(term) + limit]
+    previous2, previous = None, list(range(len(word) + 1))
+    for i, ct in enumerate(term, 1):
+        current = [i] + [0] * len(word)
+        for j, cw in enumerate(word, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ct != cw))
+            if i > 1 and j > 1 and ct == word[j - 2] and term[i - 2] == cw:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous)
+
+
+class SearchIndex:
+    """Immutable word index over weighted document fields; see module docstring."""
+
+    def __init__(self, documents, cache_size=1024):
+        self.postings = {}       # word -> {doc_id: best weight}
+        self.prefixes = {}       # prefix -> words starting with it
+        self.typos = {}          # prefix or one-letter deletion of it -> words
+        self.doc_count = len(documents)
+        for doc_id, fields in documents.items():
+            for text, weight in fields:
+                for position, word in enumerate(words(text)):
+                    score = weight * FIRST_WORD if position == 0 else weight
+                    postings = self.postings.setdefault(word, {})
+                    if score > postings.get(doc_id, 0):
+                        postings[doc_id] = score
+
+        for word in self.postings:
+            for end in range(1, len(word) + 1):
+                self.prefixes.setdefault(word[:end], []).append(word)
+            for end in range(MIN_TYPO_LENGTH - 1, min(len(word), TYPO_PREFIX_LENGTH) + 1):
+                for key in _typo_keys(word[:end]):
+                    self.typos.setdefault(key, set()).add(word)
+
+        self.cache_size = cache_size
+        self._terms = {}         # term -> {doc_id: score}
+
+    def __len__(self):
+        return self.doc_count
+
+    def _matches(self, term):
+        """{word: match score} for the vocabulary words `term` can stand for."""
+        matches = {word: PREFIX_MIN + (PREFIX_MAX - PREFIX_MIN) * len(term) / len(word)
+                   for word in self.prefixes.get(term, ())}
+        if term in self.postings:
+            matches[term] = EXACT
+        if matches:
+            return matches
+
+        limit = max_edits(term)
+        if limit:
+            candidates = set()
+            for key in _typo_keys(term[:TYPO_PREFIX_LENGTH]):
+                candidates.update(self.typos.get(key, ()))
+            for word in candidates:
+                distance = prefix_distance(term, word, limit)
+                if distance <= limit:
+                    matches[word] = FUZZY / distance
+        return matches
+
+    def _term(self, term):
+        scores = self._terms.get(term)
+        if scores is None:
+            scores = {}
+            for word, match in self._matches(term).items():
+                for doc_id, weight in self.postings[word].items():
+                    score = match * weight
+                    if score > scores.get(doc_id, 0):
+                        scores[doc_id] = score
+            if len(self._terms) >= self.cache_size:
+                self._terms.clear()
+            self._terms[term] = scores
+        return scores
+
+    def search(self, query, limit=None, only=None):
+        """
+        Ranked [(doc_id, score)] for documents matching every word of
+        `query`, best first (ties by id); `only` restricts the doc ids.
+        """
+        terms = list(dict.fromkeys(words(query)))
+        if not terms:
+            return []
+
+        # Every word must match: start from the rarest
+        per_term = sorted((self._term(term) for term in terms), key=len)
+        scores = per_term[0]
+        if only is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in only}
+        for term_scores in per_term[1:]:
+            scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items() if doc_id in term_scores}
+            if not scores:
+                return []
+        key = lambda item: (-item[1], item[0])
+        return heapq.nsmallest(limit, scores.items(), key=key) if limit else sorted(scores.items(), key=key)
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    ?search= answered from `view.get_search_index()` instead of icontains
+    scans. Results are ranked (best first); an explicit ?ordering= still
+    takes precedence when the ordering filter runs after this one.
+
+    Only the best `max_results` matches are returned, so a paginator's
+    count never exceeds it: a search is for finding an item, not for
+    listing everything that contains a letter. Views change the cap with
+    `search_max_results` (None for no cap).
+    """
+    max_results = 100
+
+    def get_max_results(self, view):
+        return getattr(view, 'search_max_results', self.max_results)
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        results = view.get_search_index().search(query, limit=self.get_max_results(view))
+        ids = [doc_id for doc_id, score in results]
+        if not ids:
+            return queryset.none()
+        rank = Case(*[When(pk=doc_id, then=Value(position)) for position, doc_id in enumerate(ids)],
+                    output_field=IntegerField())
+        return queryset.filter(pk__in=ids).order_by(rank)
@@ -0,0 +1,502 @@
+import asyncio
+import datetime
+import io
+import json
+import threading
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import channel_layers
+from channels_redis.core import RedisChannelLayer
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import User
+from apps.menu.models import Category, Product, ProductVariant
+from apps.orders.dashboard import dashboard_cache
+from apps.orders.models import Order, OrderLine
+from apps.sessions.models import POSSession
+from apps.tables.models import Floor, Table
+
+from . import cache, metrics
+from .compiled import CompiledSerializer
+from .fieldsets import expand_serializer, parse_tree, prune_serializer
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer, SerializedJSON, dumps_django
+from .search import IndexedSearchFilter, SearchIndex
+from .profiling import query_budget
+
+
+async def asgi_get(path, query_string='', token=None):
+    """
+    GET `path` through Django's ASGI handler, as Daphne serves it; returns
+    (status, body parts as sent).
+    """
+    headers = [(b'host', b'testserver')]
+    if token:
+        headers.append((b'authorization', f'Bearer {token}'.encode()))
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': query_string.encode(), 'headers': headers,
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client stays connected until the handler is done
+        await asyncio.Event().wait()
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await ASGIHandler()(scope, receive, send)
+    return messages[0]['status'], [message['body'] for message in messages[1:] if message.get('body')]
+
+
+class CompiledParityMixin:
+    """
+    Compiled list rows (apps.core.compiled) match the serializer's own output.
+
+    Mixed into an app's TestCase (not a TestCase itself, so it only runs
+    there), which creates the rows in setUpTestData and sets:
+
+        serializer_class            the list endpoint's serializer
+        path                        its URL (for the request in the context)
+        sparse_fields               ?fields= for test_sparse_fields
+        expanded_fields, expand     ?fields= and ?expand= for test_expanded_relations
+    """
+    serializer_class = None
+    path = '/'
+    sparse_fields = ''
+    expanded_fields = ''
+    expand = ''
+
+    def assertParity(self, fields='', expand=''):
+        request = Request(APIRequestFactory().get(self.path))
+        serializer = self.serializer_class(context={'request': request})
+        expand_serializer(serializer, parse_tree(expand))
+        if fields:
+            prune_serializer(serializer, parse_tree(fields))
+        compiled = CompiledSerializer(serializer)
+        instances = self.serializer_class.Meta.model.objects.order_by('id')
+
+        rows = compiled.render(compiled.values(instances))
+
+        self.assertEqual(rows, [serializer.to_representation(instance) for instance in instances])
+
+    def test_full_representation(self):
+        self.assertParity()
+
+    def test_sparse_fields(self):
+        self.assertParity(fields=self.sparse_fields)
+
+    def test_expanded_relations(self):
+        self.assertParity(fields=self.expanded_fields, expand=self.expand)
+
+
+class QueryBudgetTests(TestCase):
+    """Every view in PROFILING['QUERY_BUDGETS'] stays within its budget on a busy page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@test.local', 'pw123456', role='admin')
+        cls.cashier = User.objects.create_user('cashier@test.local', 'pw123456', role='cashier')
+        cls.kitchen = User.objects.create_user('kitchen@test.local', 'pw123456', role='kitchen')
+        floor = Floor.objects.create(name='Ground', number=0)
+        tables = [Table.objects.create(floor=floor, table_number=f'T-{n}') for n in range(3)]
+        category = Category.objects.create(name='Drinks')
+        products = [
+            Product.objects.create(category=category, name=f'Drink {n}', price=Decimal('50'), tax_rate=Decimal('5.00'))
+            for n in range(3)
+        ]
+        variant = ProductVariant.objects.create(product=products[0], attribute='Size', value='Large')
+        session = POSSession.objects.create(cashier=cls.cashier, floor=floor)
+
+        statuses = [Order.Status.DRAFT, Order.Status.SENT_TO_KITCHEN, Order.Status.PREPARED, Order.Status.COMPLETED]
+        for n in range(12):
+            order = Order.objects.create(session=session, table=tables[n % 3], status=statuses[n % 4])
+            for product in products:
+                OrderLine.objects.create(
+                    order=order, product=product, variant=variant if product == products[0] else None
+                )
+        cls.kitchen_order = order  # completed: on the kitchen board
+
+    def setUp(self):
+        dashboard_cache.invalidate()
+
+    def test_views_stay_within_budget(self):
+        order_id = self.kitchen_order.id
+        requests = {
+            'orders:order-list': (self.cashier, '/api/orders/'),
+            'orders:order-detail': (self.cashier, f'/api/orders/{order_id}/'),
+            'kitchen:kitchen-orders-list': (self.kitchen, '/api/kitchen/orders/'),
+            'kitchen:kitchen-orders-detail': (self.kitchen, f'/api/kitchen/orders/{order_id}/'),
+            'orders:dashboard_stats': (self.admin, '/api/orders/dashboard/stats/'),
+            'menu:product-list': (self.admin, '/api/menu/products/'),
+            'menu:category-list': (self.admin, '/api/menu/categories/'),
+        }
+        self.assertEqual(set(requests), set(settings.PROFILING['QUERY_BUDGETS']))
+
+        for view_name, (user, url) in requests.items():
+            with self.subTest(view_name):
+                token = RefreshToken.for_user(user).access_token
+                with query_budget(view_name):
+                    response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+                self.assertEqual(response.status_code, 200)
+
+
+def _metric_value(line_prefix):
+    for line in metrics.render().splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+class MetricsQueryCountTests(TestCase):
+    """pos_db_queries_total counts sync views served over ASGI."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('metrics@test.local', 'pw123456', role='admin')
+        cls.token = str(RefreshToken.for_user(user).access_token)
+
+    async def test_sync_view_queries_counted_under_asgi(self):
+        sample = 'pos_db_queries_total{view="OrderViewSet"}'
+        before = _metric_value(sample)
+
+        response = await AsyncClient().get('/api/orders/', headers={'Authorization': f'Bearer {self.token}'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(_metric_value(sample), before)
+
+
+class MetricsEndpointTests(SimpleTestCase):
+    """GET /metrics is closed without a token unless DEBUG is on."""
+
+    @override_settings(DEBUG=False, METRICS_TOKEN='')
+    def test_no_token_denied_without_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    @override_settings(DEBUG=True, METRICS_TOKEN='')
+    def test_no_token_open_with_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(DEBUG=False, METRICS_TOKEN='s3cret')
+    def test_token_required(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+
+
+class ChannelQueueDepthTests(SimpleTestCase):
+    """pos_channel_layer_queue_depth is reported per layer alias."""
+
+    def test_in_memory_layer(self):
+        layer = channel_layers['customers']
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.send)(channel, {'type': 'ping'})
+        async_to_sync(layer.send)(channel, {'type': 'ping'})
+        try:
+            self.assertEqual(_metric_value('pos_channel_layer_queue_depth{layer="customers"}'), 2)
+            self.assertEqual(_metric_value('pos_channel_layer_queue_depth{layer="default"}'), 0)
+        finally:
+            async_to_sync(layer.flush)()
+
+    def test_redis_layer_counts_channel_keys_of_its_prefix(self):
+        layer = RedisChannelLayer(hosts=['redis://redis-a:6379/0', 'redis://redis-b:6379/0'], prefix='asgi_customers')
+        client = mock.Mock()
+        client.scan_iter.return_value = [b'asgi_customersspecific.abc!', b'asgi_customersspecific.def!']
+        client.pipeline.return_value.execute.return_value = [3, 4]
+
+        with mock.patch.object(metrics, '_redis_client', return_value=client) as get_client:
+            self.assertEqual(metrics._queue_depth('customers', layer), 14)
+
+        self.assertEqual(get_client.call_count, 2)
+        client.scan_iter.assert_called_with(match='asgi_customersspecific.*', count=1000)
+
+    def test_unreachable_layer_does_not_fail_scrape(self):
+        with mock.patch.object(metrics, '_queue_depth', side_effect=ConnectionError), \
+                self.assertLogs('apps.core.metrics', 'WARNING'):
+            self.assertIn('pos_channel_layer_queue_depth', metrics.render())
+
+
+class CacheNamespaceTests(SimpleTestCase):
+    """Single-flight misses, invalidation and failed builds of the two-tier cache."""
+
+    def setUp(self):
+        shared_cache.clear()
+        cache.clear_local()
+        self.ns = cache.CacheNamespace('test')
+
+    def _run_threads(self, targets):
+        threads = [threading.Thread(target=target) for target in targets]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _wait_for_flight(self):
+        deadline = time.monotonic() + 2
+        while not self.ns.flights and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertTrue(self.ns.flights)
+
+    def test_concurrent_misses_build_once(self):
+        release = threading.Event()
+        builds = []
+        results = []
+
+        def build():
+            builds.append(1)
+            release.wait(2)
+            return 'value'
+
+        def lookup():
+            results.append(self.ns.get_or_set('key', build))
+
+        threads = self._run_threads([lookup])
+        self._wait_for_flight()
+        threads += self._run_threads([lookup] * 4)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(results, ['value'] * 5)
+
+    def test_concurrent_async_misses_build_once(self):
+        builds = []
+
+        async def build():
+            builds.append(1)
+            await asyncio.sleep(0.01)
+            return 'value'
+
+        async def lookups():
+            return await asyncio.gather(*(self.ns.aget_or_set('key', build) for _ in range(5)))
+
+        self.assertEqual(async_to_sync(lookups)(), ['value'] * 5)
+        self.assertEqual(len(builds), 1)
+
+    @override_settings(TWO_TIER_CACHE={'VERSION_CHECK_INTERVAL': 0})
+    def test_invalidate_bumps_version_for_every_process(self):
+        other_worker = cache.CacheNamespace('test')
+        self.assertEqual(self.ns.get_or_set('key', lambda: 'old'), 'old')
+        self.assertEqual(other_worker.get_or_set('key', lambda: 'unused'), 'old')
+        version = self.ns.current_version()
+
+        other_worker.invalidate()
+
+        self.assertEqual(self.ns.current_version(), version + 1)
+        self.assertEqual(self.ns.get_or_set('key', lambda: 'new'), 'new')
+        self.assertEqual(other_worker.get_or_set('key', lambda: 'unused'), 'new')
+
+        async def rebuild():
+            raise AssertionError('rebuilt a cached value')
+
+        self.assertEqual(async_to_sync(self.ns.aget_or_set)('key', rebuild), 'new')
+
+    def test_failing_leader_waiters_rebuild(self):
+        release = threading.Event()
+        calls = []
+        results = []
+        errors = []
+
+        def build():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(2)
+                raise ValueError('leader failed')
+            return 'rebuilt'
+
+        def lookup():
+            try:
+                results.append(self.ns.get_or_set('key', build))
+            except ValueError as e:
+                errors.append(e)
+
+        threads = self._run_threads([lookup])
+        self._wait_for_flight()
+        threads += self._run_threads([lookup] * 3)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(results, ['rebuilt'] * 3)
+        self.assertEqual(self.ns.flights, {})
+
+    def test_failing_async_leader_waiters_see_exception(self):
+        calls = []
+
+        async def build():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError('leader failed')
+
+        async def lookups():
+            return await asyncio.gather(
+                *(self.ns.aget_or_set('key', build) for _ in range(4)), return_exceptions=True
+            )
+
+        results = async_to_sync(lookups)()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(self.ns.async_flights, {})
+
+        async def recovered():
+            return 'rebuilt'
+
+        self.assertEqual(async_to_sync(self.ns.aget_or_set)('key', recovered), 'rebuilt')
+
+
+def _sample_payload():
+    moment = datetime.datetime(2024, 5, 1, 12, 30, 45, 123456, tzinfo=datetime.timezone.utc)
+    return {
+        'total': Decimal('1234.50'),
+        'created_at': moment,
+        'naive': moment.replace(tzinfo=None),
+        'ist': moment.astimezone(datetime.timezone(datetime.timedelta(hours=5, minutes=30))),
+        'day': moment.date(),
+        'at': moment.time(),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Orders'),
+        'text': 'caf\u00e9 \u2028 line \u2029 para',
+        'counts': {1: 'one', 2: [True, None, 1.5]},
+        'big': [2 ** 64, -(2 ** 70), 2 ** 63 - 1],
+        'duration': datetime.timedelta(minutes=5),
+    }
+
+
+class RendererParityTests(SimpleTestCase):
+    """ORJSONRenderer and dumps_django() match the encoders they replace."""
+
+    def test_matches_drf_renderer(self):
+        payload = _sample_payload()
+        self.assertEqual(ORJSONRenderer().render(payload), JSONRenderer().render(payload))
+        without_big_ints = {key: value for key, value in payload.items() if key != 'big'}
+        self.assertEqual(ORJSONRenderer().render(without_big_ints), JSONRenderer().render(without_big_ints))
+
+    def test_wide_ints_in_serialized_envelope(self):
+        data = SerializedJSON(b'{"id":1}')
+        rendered = ORJSONRenderer().render({'success': True, 'data': data, 'count': 2 ** 65})
+        self.assertEqual(json.loads(rendered), {'success': True, 'data': {'id': 1}, 'count': 2 ** 65})
+
+    def test_matches_django_encoder(self):
+        payload = _sample_payload()
+        expected = json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':'))
+        expected = expected.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        self.assertEqual(dumps_django(payload), expected.encode())
+
+
+class ParserParityTests(SimpleTestCase):
+    """ORJSONParser reads what JSONParser reads, and fails where it fails."""
+
+    def _parse(self, parser, body, encoding='utf-8'):
+        context = {'encoding': encoding}
+        return parser.parse(io.BytesIO(body), 'application/json', context)
+
+    def test_same_result(self):
+        bodies = [
+            '{"name": "caf\u00e9", "price": 12.5, "qty": 3, "tags": [null, true]}'.encode(),
+            b'{"id": 18446744073709551616, "neg": -99999999999999999999, "max": 18446744073709551615}',
+            b'[1, 2.0, "123456789012345678901234"]',
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                # repr() also tells 1 from 1.0
+                self.assertEqual(repr(self._parse(ORJSONParser(), body)), repr(self._parse(JSONParser(), body)))
+
+    def test_other_charsets(self):
+        body = '{"name": "caf\u00e9"}'.encode('latin-1')
+        self.assertEqual(self._parse(ORJSONParser(), body, 'latin-1'), {'name': 'caf\u00e9'})
+
+    def test_errors(self):
+        for body in [b'{"a": NaN}', b'{"a": Infinity}', b'{"a": ', b'']:
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self._parse(JSONParser(), body)
+                with self.assertRaises(ParseError):
+                    self._parse(ORJSONParser(), body)
+
+
+class SearchIndexTests(SimpleTestCase):
+    """Prefix, typo and ranked matching of SearchIndex (apps.core.search)."""
+
+    def setUp(self):
+        self.index = SearchIndex({
+            1: [('Caffe Latte', 3), ('Hot drinks', 1.5)],
+            2: [('Latte Macchiato', 3), ('Hot drinks', 1.5)],
+            3: [('Cappuccino', 3), ('Hot drinks', 1.5), ('Espresso with a latte-style foam', 1)],
+            4: [('Lattice Pie', 3), ('Desserts', 1.5)],
+            5: [('Crème Brûlée', 3), ('Desserts', 1.5)],
+            6: [('Iced Latte', 3), ('Cold drinks', 1.5)],
+        })
+
+    def ids(self, query, **kwargs):
+        return [doc_id for doc_id, score in self.index.search(query, **kwargs)]
+
+    def test_prefix(self):
+        # Shorter completions rank higher ('Latte' before 'Lattice'); then
+        # a first word before a later one, the name before the description
+        self.assertEqual(self.ids('latt'), [2, 4, 1, 6, 3])
+        self.assertEqual(self.ids('capp'), [3])
+        self.assertEqual(self.ids('bru'), [5])
+
+    def test_typo(self):
+        self.assertEqual(self.ids('cappucino'), [3])
+        self.assertEqual(self.ids('expresso'), [3])
+        self.assertEqual(self.ids('desserst'), [4, 5])
+        self.assertEqual(self.ids('latet'), [2, 4, 1, 6, 3])
+        # Scored below what was typed correctly; no typos for short words
+        self.assertLess(self.index.search('latet')[0][1], self.index.search('latte')[0][1])
+        self.assertEqual(self.ids('ltt'), [])
+
+    def test_ranking(self):
+        # Name over category over description; a field's first word counts extra
+        self.assertEqual(self.ids('latte'), [2, 1, 6, 3])
+        self.assertEqual(self.ids('hot latte'), [2, 1, 3])
+        self.assertEqual(self.ids('drinks'), [1, 2, 3, 6])
+        self.assertEqual(self.ids('creme brulee'), [5])
+
+    def test_limit_and_only(self):
+        for query in ['latt', 'hot latte', 'drinks']:
+            with self.subTest(query):
+                ranked = self.index.search(query)
+                self.assertEqual(self.index.search(query, limit=2), ranked[:2])
+                self.assertEqual(self.index.search(query, only={1, 6}), [item for item in ranked if item[0] in {1, 6}])
+
+    def test_repeated_terms_answered_from_memo(self):
+        self.index.search('latte')
+        self.assertEqual(self.index._terms, {'latte': {2: 3.75, 1: 3.0, 6: 3.0, 3: 1.0}})
+        with mock.patch.object(self.index, '_matches', side_effect=AssertionError):
+            self.assertEqual(self.ids('latte'), [2, 1, 6, 3])
+
+    def test_filter_cap(self):
+        view = mock.Mock(get_search_index=lambda: self.index, spec=['get_search_index'])
+        self.assertEqual(IndexedSearchFilter().get_max_results(view), 100)
+        view = mock.Mock(get_search_index=lambda: self.index, search_max_results=None)
+        self.assertIsNone(IndexedSearchFilter().get_max_results(view))
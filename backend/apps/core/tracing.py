@@ -0,0 +1,104 @@
+"""
+Structured, leveled tracing for hot paths.
+
+A tracer is bound to a subsystem ('orders', 'qr', 'payments', ...) whose
+level comes from settings.TRACING. Methods below that level are bound to a
+no-op, so a disabled call costs one function call: the message is never
+formatted and %-style arguments are only rendered by the logging handler.
+
+Usage:
+    from apps.core.tracing import get_tracer
+    trace = get_tracer('orders')
+
+    trace.debug('Line added to %s', order.order_number, qty=line.quantity)
+
+    if trace.debug_enabled:
+        trace.debug('Lines: %s', [expensive(l) for l in lines])
+
+Keyword arguments become structured fields: they are appended to the
+message as key=value and attached to the log record as `trace_fields`.
+
+Settings:
+    TRACING = {
+        'DEFAULT_LEVEL': 'WARNING',
+        'LEVELS': {'orders': 'DEBUG', 'payments': 'INFO'},
+    }
+"""
+import logging
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+LOGGER_PREFIX = 'apps.trace'
+
+_tracers = {}
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+def _resolve_level(subsystem):
+    config = getattr(settings, 'TRACING', {}) or {}
+    level = config.get('LEVELS', {}).get(subsystem, config.get('DEFAULT_LEVEL', 'WARNING'))
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    return level if isinstance(level, int) else logging.WARNING
+
+
+class Tracer:
+    """Per-subsystem tracer; see module docstring."""
+
+    __slots__ = (
+        'subsystem', 'logger', 'level', 'debug_enabled',
+        'debug', 'info', 'warning', 'error',
+    )
+
+    def __init__(self, subsystem, level=None):
+        self.subsystem = subsystem
+        self.logger = logging.getLogger(f'{LOGGER_PREFIX}.{subsystem}')
+        self.set_level(_resolve_level(subsystem) if level is None else level)
+
+    def set_level(self, level):
+        """Rebind the level methods; disabled ones become no-ops."""
+        self.level = level
+        self.debug_enabled = level <= logging.DEBUG
+        self.debug = self._emitter(logging.DEBUG)
+        self.info = self._emitter(logging.INFO)
+        self.warning = self._emitter(logging.WARNING)
+        self.error = self._emitter(logging.ERROR)
+
+    def _emitter(self, level):
+        if level < self.level:
+            return _noop
+
+        logger = self.logger
+        subsystem = self.subsystem
+
+        def emit(msg, *args, **fields):
+            if fields:
+                msg = f"{msg} | " + ' '.join(f"{key}=%s" for key in fields)
+                args = args + tuple(fields.values())
+            logger.log(
+                level, msg, *args,
+                extra={'subsystem': subsystem, 'trace_fields': fields}
+            )
+
+        return emit
+
+
+def get_tracer(subsystem):
+    """Return the shared tracer for a subsystem."""
+    tracer = _tracers.get(subsystem)
+    if tracer is None:
+        tracer = _tracers[subsystem] = Tracer(subsystem)
+    return tracer
+
+
+@receiver(setting_changed)
+def _reload_levels(setting, **kwargs):
+    """Pick up TRACING overrides (e.g. override_settings in tests)."""
+    if setting == 'TRACING':
+        for subsystem, tracer in _tracers.items():
+            tracer.set_level(_resolve_level(subsystem))
@@ -0,0 +1,31 @@
+"""
+Debug endpoints.
+"""
+from rest_framework import views
+
+from apps.accounts.permissions import IsAdmin
+from .profiling import get_profiling_settings, get_report, reset_report
+from .responses import APIResponse
+
+
+class ProfileReportView(views.APIView):
+    """
+    GET /api/debug/profile/
+    Per-view aggregate of the profiling middleware (admin only).
+
+    DELETE /api/debug/profile/
+    Reset the aggregate.
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        if not get_profiling_settings()['ENABLED']:
+            return APIResponse.error(
+                message="Profiling is disabled. Set PROFILING_ENABLED=True.",
+                error_code="PROFILING_DISABLED"
+            )
+        return APIResponse.success(data={'views': get_report()})
+
+    def delete(self, request):
+        reset_report()
+        return APIResponse.success(message="Profile report reset")
@@ -0,0 +1,150 @@
+"""
+WebSocket consumer base with heartbeat, bounded send buffer and eviction.
+
+Events from the channel layer are not written to the socket directly: they
+go onto a per-socket queue drained by a sender task, so a slow or stuck
+client cannot make the consumer fall behind on its channel-layer queue
+(which would fill up and start dropping messages for the whole group).
+
+- Heartbeat: {"type": "ping"} is sent every HEARTBEAT_INTERVAL seconds.
+  Clients answer with {"type": "pong"} (any message counts); a socket that
+  sends nothing for HEARTBEAT_TIMEOUT seconds is evicted.
+- Backpressure: at most SEND_BUFFER messages wait per socket. On overflow
+  the pending messages are dropped and replaced by one {"type": "resync"},
+  telling the client to reload its state over HTTP. More than MAX_RESYNCS
+  resyncs within a minute evicts the socket.
+
+Limits come from settings.WEBSOCKETS. Evictions close with code 4408 and
+are counted in pos_websocket_evictions_total.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from . import metrics
+
+CLOSE_EVICTED = 4408
+
+RESYNC_WINDOW = 60.0
+
+
+def get_websocket_settings():
+    config = getattr(settings, 'WEBSOCKETS', {}) or {}
+    return {
+        'HEARTBEAT_INTERVAL': config.get('HEARTBEAT_INTERVAL', 25),
+        'HEARTBEAT_TIMEOUT': config.get('HEARTBEAT_TIMEOUT', 75),
+        'SEND_BUFFER': config.get('SEND_BUFFER', 100),
+        'MAX_RESYNCS': config.get('MAX_RESYNCS', 3),
+        'KPI_RESEED_INTERVAL': config.get('KPI_RESEED_INTERVAL', 300),
+    }
+
+
+class ManagedWebsocketConsumer(AsyncWebsocketConsumer):
+    """
+    Subclasses call start_managed() after accept(), queue outgoing messages
+    with push() and end the socket with finish() so queued messages are
+    sent first. Client messages other than ping/pong reach
+    receive_message(). The background tasks stop on disconnect.
+    """
+
+    consumer_label = 'websocket'
+
+    async def start_managed(self):
+        config = get_websocket_settings()
+        self.heartbeat_interval = config['HEARTBEAT_INTERVAL']
+        self.heartbeat_timeout = config['HEARTBEAT_TIMEOUT']
+        self.max_resyncs = config['MAX_RESYNCS']
+        self.outbox = asyncio.Queue(maxsize=max(1, config['SEND_BUFFER']))
+        self.resyncs = deque()
+        self.last_seen = time.monotonic()
+        self.closing = False
+        self.tasks = [
+            asyncio.ensure_future(self._drain()),
+            asyncio.ensure_future(self._heartbeat()),
+        ]
+
+    async def websocket_disconnect(self, message):
+        for task in getattr(self, 'tasks', []):
+            task.cancel()
+        self.tasks = []
+        await super().websocket_disconnect(message)
+
+    def finish(self, code=1000):
+        """Close the socket once the messages already queued are sent."""
+        if self.closing:
+            return
+        self.closing = True
+        try:
+            self.outbox.put_nowait(code)
+        except asyncio.QueueFull:
+            self._evict('slow_consumer')
+
+    async def receive(self, text_data=None, bytes_data=None):
+        self.last_seen = time.monotonic()
+        if text_data:
+            try:
+                message = json.loads(text_data)
+            except ValueError:
+                return
+            if not isinstance(message, dict):
+                return
+            if message.get('type') == 'ping':
+                self.push({'type': 'pong'})
+            elif message.get('type') != 'pong':
+                await self.receive_message(message)
+
+    async def receive_message(self, message):
+        """Handle a JSON object sent by the client (ignored by default)."""
+
+    def push(self, payload):
+        """Queue `payload` (a JSON-serialisable dict) for this socket."""
+        if self.closing or not hasattr(self, 'outbox'):
+            return
+        try:
+            self.outbox.put_nowait(payload)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        dropped = self.outbox.qsize()
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+        metrics.WEBSOCKET_DROPPED_MESSAGES.inc(dropped + 1, consumer=self.consumer_label)
+        metrics.WEBSOCKET_RESYNCS.inc(consumer=self.consumer_label)
+
+        now = time.monotonic()
+        self.resyncs.append(now)
+        while self.resyncs and now - self.resyncs[0] > RESYNC_WINDOW:
+            self.resyncs.popleft()
+        if len(self.resyncs) > self.max_resyncs:
+            self._evict('slow_consumer')
+            return
+        self.outbox.put_nowait({'type': 'resync', 'reason': 'buffer_overflow'})
+
+    def _evict(self, reason):
+        self.closing = True
+        metrics.WEBSOCKET_EVICTIONS.inc(consumer=self.consumer_label, reason=reason)
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+        self.outbox.put_nowait(CLOSE_EVICTED)
+
+    async def _drain(self):
+        while True:
+            payload = await self.outbox.get()
+            if isinstance(payload, int):
+                # A close code queued by finish() or _evict()
+                await self.close(code=payload)
+                return
+            await self.send(text_data=json.dumps(payload))
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if time.monotonic() - self.last_seen > self.heartbeat_timeout:
+                self._evict('heartbeat_timeout')
+                return
+            self.push({'type': 'ping'})
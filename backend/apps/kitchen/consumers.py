@@ -1,24 +1,68 @@
-import json
-from channels.generic.websocket import AsyncWebsocketConsumer
+from apps.core import metrics
+from apps.core.broadcast import KITCHEN_GROUP, floor_group, group_kind
+from apps.core.websocket import ManagedWebsocketConsumer
+
+# Close codes sent to clients that are refused
+CLOSE_UNAUTHENTICATED = 4401
+CLOSE_FORBIDDEN = 4403
+
+
+async def subscription_groups(user):
+    """
+    Groups a staff member's socket joins.
+
+    Kitchen staff and admins get the kitchen firehose; cashiers only the
+    floors their open sessions serve.
+    """
+    if user.is_admin or user.is_kitchen_staff:
+        return [KITCHEN_GROUP]
+    if user.is_cashier:
+        from apps.sessions.models import POSSession
+
+        floors = POSSession.objects.filter(
+            cashier_id=user.pk, status=POSSession.Status.OPEN, floor__isnull=False
+        ).values_list('floor_id', flat=True)
+        return [floor_group(floor_id) async for floor_id in floors.order_by().distinct()]
+    return []
+
+
+class KitchenConsumer(ManagedWebsocketConsumer):
+    """
+    Order events for staff screens (authenticated with apps.accounts.websocket_auth).
+
+    Refused connections are closed during the handshake, before joining
+    any group, so they never take broadcast capacity. Heartbeat and send
+    buffer limits come from ManagedWebsocketConsumer.
+    """
+    consumer_label = 'kitchen'
 
-class KitchenConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        # Join the global kitchen group
-        self.room_group_name = 'kitchen_orders'
+        self.groups_joined = []
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            metrics.WEBSOCKET_REJECTED.inc(reason='unauthenticated')
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+
+        groups = await subscription_groups(user)
+        if not groups:
+            metrics.WEBSOCKET_REJECTED.inc(reason='no_subscription')
+            await self.close(code=CLOSE_FORBIDDEN)
+            return
 
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
+        for group in groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        self.groups_joined = groups
 
         await self.accept()
+        await self.start_managed()
+        for group in groups:
+            metrics.WEBSOCKET_CONNECTIONS.inc(group=group_kind(group))
 
     async def disconnect(self, close_code):
-        # Leave the group
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        for group in self.groups_joined:
+            metrics.WEBSOCKET_CONNECTIONS.dec(group=group_kind(group))
+            await self.channel_layer.group_discard(group, self.channel_name)
 
     # Receive message from room group
     async def order_update(self, event):
@@ -27,8 +71,15 @@ class KitchenConsumer(AsyncWebsocketConsumer):
         """
         message = event['message']
 
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({
+        # Queue for the WebSocket
+        self.push({
             'type': 'order_update',
             'message': message
-        }))
+        })
+
+    async def order_complete(self, event):
+        """
+        Handler for 'order.complete' (kitchen complete_order). Sent to the
+        client as an order_update carrying action 'complete'.
+        """
+        await self.order_update(event)
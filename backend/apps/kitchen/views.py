@@ -1,7 +1,10 @@
+from django.db.models import Prefetch
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from apps.core.responses import APIResponse
+from apps.core.broadcast import broadcast_order
+from apps.core import metrics
 from apps.orders.models import Order, OrderLine
 from apps.orders.serializers import OrderSerializer, OrderLineSerializer
 from apps.accounts.permissions import IsKitchenStaff, IsAdmin
@@ -17,7 +20,10 @@ class KitchenOrderViewSet(viewsets.ReadOnlyModelViewSet):
             Order.Status.PREPARED,
             Order.Status.COMPLETED,
         ]
-    ).prefetch_related('lines')
+    ).select_related('table').prefetch_related(
+        # One query for every line on the page, with what the serializer reads
+        Prefetch('lines', queryset=OrderLine.objects.select_related('product', 'variant'))
+    )
     serializer_class = OrderSerializer
     permission_classes = [IsKitchenStaff | IsAdmin]
 
@@ -86,26 +92,18 @@ class KitchenOrderViewSet(viewsets.ReadOnlyModelViewSet):
             if mapped_line_status:
                 updated_count = order.lines.all().update(status=mapped_line_status)
 
+            if new_status == Order.Status.COMPLETED and order.status != Order.Status.COMPLETED:
+                metrics.ORDERS_COMPLETED.inc(source='kitchen')
             order.status = new_status
             order.save(update_fields=['status', 'updated_at'])
             order.refresh_from_db()
 
-            from asgiref.sync import async_to_sync
-            from channels.layers import get_channel_layer
-
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                "kitchen_orders",
-                {
-                    "type": "order.update",
-                    "message": {
-                        "action": "order_status_update",
-                        "order_id": order.id,
-                        "status": new_status,
-                        "order": OrderSerializer(order).data
-                    }
-                }
-            )
+            broadcast_order(order, {
+                "action": "order_status_update",
+                "order_id": order.id,
+                "status": new_status,
+                "order": OrderSerializer(order).data
+            }, lines=mapped_line_status)
 
             response_data = {
                 "update_type": "order_status",
@@ -136,23 +134,13 @@ class KitchenOrderViewSet(viewsets.ReadOnlyModelViewSet):
             all_ready = all(l.status in ['ready', 'served'] for l in all_lines)
             
             # Broadcast single line update
-            from asgiref.sync import async_to_sync
-            from channels.layers import get_channel_layer
-            
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                "kitchen_orders",
-                {
-                    "type": "order.update",
-                    "message": {
-                        "action": "single_line_update",
-                        "order_id": order.id,
-                        "line_id": line.id,
-                        "status": new_status,
-                        "order": OrderSerializer(order).data 
-                    }
-                }
-            )
+            broadcast_order(order, {
+                "action": "single_line_update",
+                "order_id": order.id,
+                "line_id": line.id,
+                "status": new_status,
+                "order": OrderSerializer(order).data
+            }, lines={line.id: new_status})
             
             response_data = {
                 "update_type": "single_line",
@@ -184,29 +172,21 @@ class KitchenOrderViewSet(viewsets.ReadOnlyModelViewSet):
             # BULK UPDATE - ALL LINES
             all_lines = order.lines.all()
             updated_count = all_lines.update(status=new_status)
+            # Lines have no timestamp; the order's marks the change (conditional GET)
+            order.save(update_fields=['updated_at'])
             
             # Refresh order
             order.refresh_from_db()
             all_lines = order.lines.all()
             
             # Broadcast bulk update
-            from asgiref.sync import async_to_sync
-            from channels.layers import get_channel_layer
-            
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                "kitchen_orders",
-                {
-                    "type": "order.update",
-                    "message": {
-                        "action": "bulk_update",
-                        "order_id": order.id,
-                        "status": new_status,
-                        "updated_count": updated_count,
-                        "order": OrderSerializer(order).data 
-                    }
-                }
-            )
+            broadcast_order(order, {
+                "action": "bulk_update",
+                "order_id": order.id,
+                "status": new_status,
+                "updated_count": updated_count,
+                "order": OrderSerializer(order).data
+            }, lines=new_status)
             
             response_data = {
                 "update_type": "all_lines",
@@ -274,28 +254,19 @@ class KitchenOrderViewSet(viewsets.ReadOnlyModelViewSet):
         # Update all lines at once
         all_lines = order.lines.all()
         updated_count = all_lines.update(status=new_status)
+        order.save(update_fields=['updated_at'])
         
         # Refresh order to get updated data
         order.refresh_from_db()
         all_lines = order.lines.all()  # Re-fetch updated lines
         
         # Broadcast update
-        from asgiref.sync import async_to_sync
-        from channels.layers import get_channel_layer
-        
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            "kitchen_orders",
-            {
-                "type": "order.update",
-                "message": {
-                    "action": "bulk_update",
-                    "order_id": order.id,
-                    "status": new_status,
-                    "order": OrderSerializer(order).data 
-                }
-            }
-        )
+        broadcast_order(order, {
+            "action": "bulk_update",
+            "order_id": order.id,
+            "status": new_status,
+            "order": OrderSerializer(order).data
+        }, lines=new_status)
         
         response_data = {
             "order": {
@@ -348,25 +319,17 @@ class KitchenOrderViewSet(viewsets.ReadOnlyModelViewSet):
         order.lines.all().update(status='served')
         
         # Mark order as completed
+        if order.status != Order.Status.COMPLETED:
+            metrics.ORDERS_COMPLETED.inc(source='kitchen')
         order.status = Order.Status.COMPLETED
         order.save()
         
         # Broadcast completion
-        from asgiref.sync import async_to_sync
-        from channels.layers import get_channel_layer
-        
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            "kitchen_orders",
-            {
-                "type": "order.complete",
-                "message": {
-                    "action": "complete",
-                    "order_id": order.id,
-                    "order": OrderSerializer(order).data 
-                }
-            }
-        )
+        broadcast_order(order, {
+            "action": "complete",
+            "order_id": order.id,
+            "order": OrderSerializer(order).data
+        }, event_type='order.complete', lines='served')
         
         response_data = {
             "order": OrderSerializer(order).data,
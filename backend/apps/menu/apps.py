@@ -4,3 +4,6 @@ class MenuConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.menu'
     verbose_name = 'Menu Management'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,117 @@
+"""
+Cached public menu bundle for customer (QR) clients.
+
+Active categories, their active products and variants are serialised once
+into plain dicts and stored in the 'menu' cache namespace, so a phone
+loading the menu is usually served from process memory. Menu edits
+invalidate the namespace (see signals.py) and the next request rebuilds it
+with three queries, using the async ORM. The public menu endpoint serves
+the bundle's JSON encoding, cached alongside it, as is.
+
+Writes that touch many catalog rows run inside menu_changes(), which
+collapses their invalidations into one, made when the transaction commits.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from apps.core.cache import namespace
+from apps.core.renderers import SerializedJSON, dumps_django
+
+from .models import Category, Product, ProductVariant
+
+BUNDLE_KEY = 'public_bundle'
+BUNDLE_JSON_KEY = 'public_bundle_json'
+PRODUCTS_BY_ID_KEY = 'public_products_by_id'
+BUNDLE_CACHE_TIMEOUT = 60 * 60  # Safety net; invalidation is event driven
+
+menu_cache = namespace('menu', timeout=BUNDLE_CACHE_TIMEOUT)
+
+
+def _image_url(name):
+    return Product.image.field.storage.url(name) if name else None
+
+
+async def _build_bundle():
+    categories = {
+        row['id']: {**row, 'products': []}
+        async for row in Category.objects.filter(is_active=True)
+        .order_by('sequence', 'name').values('id', 'name', 'color', 'sequence')
+    }
+
+    variants = {}
+    async for row in ProductVariant.objects.filter(
+        is_active=True, product__is_active=True, product__category__is_active=True
+    ).order_by('attribute', 'value').values('id', 'product_id', 'attribute', 'value', 'unit', 'extra_price'):
+        variants.setdefault(row.pop('product_id'), []).append(row)
+
+    async for row in Product.objects.filter(
+        is_active=True, category__is_active=True
+    ).order_by('name').values(
+        'id', 'category_id', 'name', 'description', 'price', 'tax_rate', 'uom', 'image', 'has_variants'
+    ):
+        category = categories.get(row['category_id'])
+        if category is None:
+            continue
+        row['category'] = row.pop('category_id')
+        row['image_url'] = _image_url(row.pop('image'))
+        row['variants'] = variants.get(row['id'], [])
+        category['products'].append(row)
+
+    return {'categories': list(categories.values())}
+
+
+async def aget_menu_bundle():
+    """Return the cached bundle, rebuilding it on a miss."""
+    return await menu_cache.aget_or_set(BUNDLE_KEY, _build_bundle)
+
+
+async def _index_products():
+    bundle = await aget_menu_bundle()
+    return {
+        product['id']: {**product, 'category_name': category['name'], 'category_color': category['color']}
+        for category in bundle['categories']
+        for product in category['products']
+    }
+
+
+async def aget_public_products_by_id():
+    """Bundle products (with category name and color) by id, for search results."""
+    return await menu_cache.aget_or_set(PRODUCTS_BY_ID_KEY, _index_products)
+
+
+async def _encode_bundle():
+    return dumps_django(await aget_menu_bundle())
+
+
+async def aget_menu_bundle_json():
+    """The cached bundle as JSON (encoded once per menu change)."""
+    return SerializedJSON(await menu_cache.aget_or_set(BUNDLE_JSON_KEY, _encode_bundle))
+
+
+_batch = threading.local()
+
+
+def invalidate_menu_bundle():
+    """Drop the cached bundle; the next request rebuilds it."""
+    if getattr(_batch, 'depth', 0):
+        _batch.pending = True
+        return
+    menu_cache.invalidate()
+
+
+@contextmanager
+def menu_changes():
+    """Defer invalidations in the block to a single one on commit (see module docstring)."""
+    outermost = not getattr(_batch, 'depth', 0)
+    if outermost:
+        _batch.depth, _batch.pending = 0, False
+    _batch.depth += 1
+    try:
+        yield
+    finally:
+        _batch.depth -= 1
+        # Also on errors: rolled-back writes drop the callback with them
+        if outermost and _batch.pending:
+            transaction.on_commit(invalidate_menu_bundle)
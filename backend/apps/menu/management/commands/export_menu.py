@@ -0,0 +1,28 @@
+"""
+Export the menu in the format import_menu reads.
+
+    python manage.py export_menu > menu.csv
+    python manage.py export_menu --format ndjson --output menu.ndjson
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+
+from apps.menu.transfer import FORMATS, STREAM_WRITERS, export_queryset
+
+
+class Command(BaseCommand):
+    help = 'Stream every product with its category and variants as CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(FORMATS), default='csv', help='Default csv')
+        parser.add_argument('--output', help='File to write (default stdout)')
+
+    def handle(self, *args, **options):
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in STREAM_WRITERS[options['format']](export_queryset()):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
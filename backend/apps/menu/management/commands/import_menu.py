@@ -0,0 +1,59 @@
+"""
+Import a menu file (CSV or NDJSON) as the /api/menu/import/ endpoint does.
+
+    python manage.py import_menu menu.csv
+    python manage.py import_menu menu.ndjson --dry-run
+    python manage.py import_menu export.txt --format csv --chunk-size 2000
+
+Products are matched on sku; see apps.menu.transfer for the file layout.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.menu.transfer import FORMATS, IMPORT_CHUNK_SIZE, ImportFormatError, guess_format, import_menu
+
+
+class Command(BaseCommand):
+    help = 'Bulk-import categories, products and variants from a CSV or NDJSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=list(FORMATS), help='Defaults to the file extension')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                            help=f'Products per transaction (default {IMPORT_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or guess_format(options['path'])
+        if import_format is None:
+            raise CommandError(f"Cannot tell the format of {options['path']}; pass --format.")
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+
+        started = time.monotonic()
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = import_menu(
+                    stream, import_format, dry_run=options['dry_run'], chunk_size=options['chunk_size']
+                )
+        except (OSError, ImportFormatError) as exc:
+            raise CommandError(str(exc))
+        seconds = time.monotonic() - started
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']} (sku {error['sku'] or '-'}): {error['errors']}")
+        if report['error_count'] > len(report['errors']):
+            self.stderr.write(f"... and {report['error_count'] - len(report['errors'])} more invalid rows")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Validated {report['rows']} rows in {seconds:.2f}s: {report['error_count']} invalid"
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['rows'] - report['error_count']} of {report['rows']} rows in {seconds:.2f}s: "
+            f"{report['products_created']} products created, {report['products_updated']} updated, "
+            f"{report['variants_created']} variants created, {report['variants_updated']} updated, "
+            f"{report['categories_created']} new categories"
+        ))
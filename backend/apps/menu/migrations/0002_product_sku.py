@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='sku',
+            field=models.CharField(blank=True, help_text='Stock keeping unit; the key menu imports match products on', max_length=64, null=True, unique=True),
+        ),
+    ]
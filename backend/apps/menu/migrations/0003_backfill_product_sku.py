@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def backfill_skus(apps, schema_editor):
+    """Give products created before SKUs existed one derived from their id."""
+    Product = apps.get_model('menu', 'Product')
+
+    taken = set(Product.objects.exclude(sku__isnull=True).values_list('sku', flat=True))
+    products = []
+    for product in Product.objects.filter(sku__isnull=True).only('id').order_by('id'):
+        sku = f'SKU-{product.id}'
+        while sku in taken:
+            sku += '-1'
+        taken.add(sku)
+        product.sku = sku
+        products.append(product)
+    Product.objects.bulk_update(products, ['sku'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_product_sku'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_skus, migrations.RunPython.noop),
+    ]
@@ -39,6 +39,10 @@ class Product(models.Model):
     id = models.BigAutoField(primary_key=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     name = models.CharField(max_length=255)
+    sku = models.CharField(
+        max_length=64, unique=True, null=True, blank=True,
+        help_text="Stock keeping unit; the key menu imports match products on"
+    )
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=12, decimal_places=2)
     tax_rate = models.DecimalField(
@@ -0,0 +1,89 @@
+"""
+Product and category search indexes (see apps.core.search).
+
+The catalog rows are cached in the 'menu' namespace next to the public
+bundle, so menu edits (signals.py) invalidate both. Each process builds
+its indexes from the rows once per namespace version and keeps them until
+the next edit: searches never query the database.
+
+Products match on their name first, then category name and description
+(weights 3, 1.5 and 1); categories on their name.
+"""
+import threading
+
+from apps.core.search import SearchIndex
+
+from .bundle import menu_cache
+from .models import Category, Product
+
+CATALOG_KEY = 'search_catalog'
+
+NAME_WEIGHT = 3.0
+CATEGORY_WEIGHT = 1.5
+DESCRIPTION_WEIGHT = 1.0
+
+
+class Catalog:
+    """Search indexes for one version of the menu."""
+
+    def __init__(self, rows):
+        self.products = SearchIndex({
+            row['id']: [
+                (row['name'], NAME_WEIGHT),
+                (row['category__name'], CATEGORY_WEIGHT),
+                (row['description'], DESCRIPTION_WEIGHT),
+            ]
+            for row in rows['products']
+        })
+        # What customers may see (matches the public bundle)
+        self.public_products = {
+            row['id'] for row in rows['products'] if row['is_active'] and row['category__is_active']
+        }
+        self.categories = SearchIndex({row['id']: [(row['name'], NAME_WEIGHT)] for row in rows['categories']})
+
+
+def _load_rows():
+    return {
+        'products': list(Product.objects.values(
+            'id', 'name', 'description', 'is_active', 'category__name', 'category__is_active'
+        )),
+        'categories': list(Category.objects.values('id', 'name')),
+    }
+
+
+async def _aload_rows():
+    return {
+        'products': [row async for row in Product.objects.values(
+            'id', 'name', 'description', 'is_active', 'category__name', 'category__is_active'
+        )],
+        'categories': [row async for row in Category.objects.values('id', 'name')],
+    }
+
+
+_catalog = (None, None)  # (menu namespace version, Catalog)
+_catalog_lock = threading.Lock()
+
+
+def _swap(version, rows):
+    global _catalog
+    with _catalog_lock:
+        if _catalog[0] != version:
+            _catalog = (version, Catalog(rows))
+        return _catalog[1]
+
+
+def get_catalog():
+    """The current process's Catalog, rebuilt after menu changes."""
+    version, catalog = _catalog
+    if version == menu_cache.current_version():
+        return catalog
+    version = menu_cache.current_version()
+    return _swap(version, menu_cache.get_or_set(CATALOG_KEY, _load_rows))
+
+
+async def aget_catalog():
+    version, catalog = _catalog
+    if version == await menu_cache.acurrent_version():
+        return catalog
+    version = await menu_cache.acurrent_version()
+    return _swap(version, await menu_cache.aget_or_set(CATALOG_KEY, _aload_rows))
@@ -0,0 +1,19 @@
+"""
+Signal handlers that keep the public menu bundle cache in sync.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .bundle import invalidate_menu_bundle
+from .models import Category, Product, ProductVariant
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def menu_changed(sender, **kwargs):
+    """Any category, product or variant edit, including availability toggles."""
+    invalidate_menu_bundle()
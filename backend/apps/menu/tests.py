@@ -0,0 +1,189 @@
+import io
+import warnings
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import User
+from apps.core import streaming
+from apps.core.tests import CompiledParityMixin, asgi_get
+
+from . import transfer
+from .bundle import menu_cache
+from .models import Category, Product, ProductVariant
+from .serializers import ProductSerializer
+from .transfer import FORMATS, STREAM_WRITERS, export_queryset, import_menu
+
+
+class CompiledParityTests(CompiledParityMixin, TestCase):
+    """Compiled list rows (apps.core.compiled) match ProductSerializer(product).data."""
+    serializer_class = ProductSerializer
+    path = '/api/menu/products/'
+    sparse_fields = 'id,name,image_url,category_name,variants.value'
+    expanded_fields = 'id,category'
+    expand = 'category'
+
+    @classmethod
+    def setUpTestData(cls):
+        drinks = Category.objects.create(name='Drinks', color='#0af')
+        food = Category.objects.create(name='Food')
+        latte = Product.objects.create(
+            category=drinks, name='Latte', sku='DRK-1', price=Decimal('100'), tax_rate=Decimal('5.00'),
+            image='products/latte.png',
+        )
+        ProductVariant.objects.create(product=latte, attribute='Size', value='Large', extra_price=Decimal('10'))
+        ProductVariant.objects.create(product=latte, attribute='Milk', value='Oat', is_active=False)
+        Product.objects.create(category=food, name='Toast', price=Decimal('60'), tax_rate=Decimal('0.00'))
+
+
+class ProductListViewTests(TestCase):
+    """GET /api/menu/products/ with ?search= (apps.menu.search) and ?fields=, from compiled rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        drinks = Category.objects.create(name='Drinks')
+        cls.latte = Product.objects.create(category=drinks, name='Latte', price=Decimal('100'), tax_rate=Decimal('5.00'))
+        ProductVariant.objects.create(product=cls.latte, attribute='Size', value='Large', extra_price=Decimal('10'))
+        cls.tea = Product.objects.create(category=drinks, name='Masala Tea', price=Decimal('40'), tax_rate=Decimal('0.00'))
+
+    def setUp(self):
+        # The index is per process: do not serve another test's catalog
+        menu_cache.invalidate()
+
+    def test_search_with_sparse_fields(self):
+        response = self.client.get('/api/menu/products/?search=latte&fields=id,name,variants.value')
+
+        self.assertEqual(response.json()['results'], [
+            {'id': self.latte.id, 'name': 'Latte', 'variants': [{'value': 'Large'}]},
+        ])
+
+    def test_fields_without_search(self):
+        response = self.client.get('/api/menu/products/?fields=name&ordering=name')
+
+        self.assertEqual(response.json()['results'], [{'name': 'Latte'}, {'name': 'Masala Tea'}])
+
+
+class VariantSyncTests(TestCase):
+    """Nested variant edits (ProductSerializer._sync_variants) are one diff with a fixed query count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        drinks = Category.objects.create(name='Drinks')
+        cls.product = Product.objects.create(category=drinks, name='Tea', price=Decimal('40'), tax_rate=Decimal('0.00'))
+        cls.variants = [
+            ProductVariant.objects.create(product=cls.product, attribute='Flavour', value=f'F{i}') for i in range(12)
+        ]
+        other = Product.objects.create(category=drinks, name='Coffee', price=Decimal('60'), tax_rate=Decimal('0.00'))
+        cls.foreign = ProductVariant.objects.create(product=other, attribute='Size', value='Large')
+
+    def sync(self, variants, queries):
+        product = Product.objects.prefetch_related('variants').get(pk=self.product.pk)
+        serializer = ProductSerializer(product, data={'variants': variants}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertNumQueries(queries):
+            serializer.save()
+        return {variant.value: variant for variant in ProductVariant.objects.filter(product=self.product)}
+
+    def test_twenty_edits_in_fixed_queries(self):
+        variants = (
+            [{'id': variant.id, 'extra_price': '5.00'} for variant in self.variants[:8]]
+            + [{'id': variant.id, '_destroy': True} for variant in self.variants[8:10]]
+            + [{'attribute': 'Size', 'value': f'S{i}'} for i in range(10)]
+        )
+
+        # savepoint, product UPDATE, the delete (SELECT, order lines SET NULL,
+        # DELETE), one bulk UPDATE, one bulk INSERT, release
+        stored = self.sync(variants, queries=8)
+
+        self.assertEqual(len(stored), 20)
+        self.assertEqual({value for value, variant in stored.items() if variant.extra_price == 5}, {
+            f'F{i}' for i in range(8)
+        })
+        self.assertNotIn('F8', stored)
+        self.assertNotIn('F9', stored)
+
+    def test_query_count_does_not_grow_with_edits(self):
+        variants = (
+            [{'id': variant.id, 'value': f'{variant.value}!'} for variant in self.variants]
+            + [{'attribute': 'Size', 'value': f'S{i}'} for i in range(28)]
+        )
+
+        # No delete: savepoint, product UPDATE, bulk UPDATE, bulk INSERT, release
+        stored = self.sync(variants, queries=5)
+
+        self.assertEqual(len(stored), 40)
+
+    def test_ids_and_destroy(self):
+        kept, renamed, destroyed = self.variants[0], self.variants[1], self.variants[2]
+        stored = self.sync([
+            {'id': renamed.id, 'value': 'Mint'},
+            {'id': renamed.id, '_destroy': True},        # already matched: skipped
+            {'id': destroyed.id, '_destroy': True},
+            {'id': self.foreign.id, 'attribute': 'Size', 'value': 'Small'},  # not ours: created
+            {'id': 999999, '_destroy': True},             # unknown: ignored
+        ], queries=8)
+
+        self.assertEqual(stored['Mint'].id, renamed.id)
+        self.assertEqual(stored[kept.value].id, kept.id)
+        self.assertNotIn(destroyed.value, stored)
+        self.assertNotEqual(stored['Small'].id, self.foreign.id)
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.value, 'Large')
+        self.assertEqual(len(stored), 12)  # one destroyed, one created
+
+
+class MenuTransferTests(TestCase):
+    """An export imports back cleanly (apps.menu.transfer), with or without SKUs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        drinks = Category.objects.create(name='Drinks')
+        cls.latte = Product.objects.create(category=drinks, name='Latte', price=Decimal('100'), tax_rate=Decimal('5.00'))
+        ProductVariant.objects.create(product=cls.latte, attribute='Size', value='Large', extra_price=Decimal('10'))
+        Product.objects.create(category=drinks, name='Mocha', sku='DRK-2', price=Decimal('120'), tax_rate=Decimal('5.00'))
+
+    def test_export_round_trip(self):
+        for fmt in STREAM_WRITERS:
+            with self.subTest(fmt):
+                exported = ''.join(STREAM_WRITERS[fmt](export_queryset())).encode()
+
+                report = import_menu(io.BytesIO(exported.replace(b'100.00', b'105.00')), fmt)
+
+                self.assertEqual(report['error_count'], 0, report['errors'])
+                self.assertEqual((report['products_created'], report['products_updated']), (0, 2))
+                self.assertEqual((Product.objects.count(), ProductVariant.objects.count()), (2, 1))
+                self.assertEqual(Product.objects.get(pk=self.latte.pk).price, Decimal('105.00'))
+
+
+class MenuExportTests(TransactionTestCase):
+    """GET /api/menu/export/ streams under ASGI (apps.core.streaming)."""
+
+    def setUp(self):
+        admin = User.objects.create_user('admin@test.local', 'pw123456', role='admin')
+        self.token = str(RefreshToken.for_user(admin).access_token)
+        category = Category.objects.create(name='Drinks')
+        for i in range(6):
+            product = Product.objects.create(
+                category=category, name=f'Tea {i}', price=Decimal('40'), tax_rate=Decimal('0.00')
+            )
+            ProductVariant.objects.create(product=product, attribute='Size', value='Large')
+
+    def test_export_streams_through_the_asgi_handler(self):
+        for fmt in FORMATS:
+            with self.subTest(fmt):
+                with mock.patch.object(transfer, 'EXPORT_CHUNK_SIZE', 2), \
+                        mock.patch.object(streaming, 'STREAM_BATCH_ROWS', 2), \
+                        warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter('always')
+                    status, parts = async_to_sync(asgi_get)('/api/menu/export/', f'fmt={fmt}', self.token)
+
+                self.assertEqual(status, 200)
+                # Sent batch by batch, not collected with sync_to_async(list)
+                self.assertGreater(len(parts), 2)
+                self.assertFalse([w for w in caught if 'synchronous iterators' in str(w.message)])
+
+                response = self.client.get(f'/api/menu/export/?fmt={fmt}', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+                self.assertEqual(b''.join(parts), b''.join(response.streaming_content))
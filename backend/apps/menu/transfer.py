@@ -0,0 +1,426 @@
+"""
+Bulk menu import and export (CSV / NDJSON), for onboarding an outlet.
+
+Both formats carry the same records, so an export can be edited and
+imported back:
+
+    csv       one row per variant with the product columns repeated (a
+              product without variants takes one row, variant columns
+              empty), like the order export
+    ndjson    one product per line with a `variants` list; a single JSON
+              array of products is accepted on import too
+
+Import streams the file and works IMPORT_CHUNK_SIZE products at a time,
+each chunk validated (ProductImportSerializer) and written in its own
+transaction:
+
+    categories  resolved by name from a map loaded once; unknown names
+                are created
+    products    upserted on `sku` with one bulk_create(update_conflicts=True);
+                records without a SKU are matched on (category, name)
+                against the products that have none (created through the
+                API without one), then bulk_update / bulk_create
+    variants    matched on (attribute, value) against the chunk's stored
+                variants (one query), then bulk_update / bulk_create;
+                variants missing from the file are kept, as with nested
+                product edits
+
+Invalid records are skipped and reported with their row (CSV line or
+NDJSON line) and the rest is imported. The whole import invalidates the
+menu cache once (menu_changes()).
+
+Export reads products with a chunked iterator, variants prefetched per
+chunk, so memory stays flat (served with
+apps.core.streaming.streaming_export()).
+"""
+import csv
+import io
+import json
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from apps.core.streaming import stream_csv_rows
+
+from .bundle import invalidate_menu_bundle, menu_changes
+from .models import Category, Product, ProductVariant
+from .serializers import ProductImportSerializer
+
+IMPORT_CHUNK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+PRODUCT_COLUMNS = ['sku', 'category', 'name', 'description', 'price', 'tax_rate', 'uom', 'is_active']
+VARIANT_COLUMNS = ['attribute', 'value', 'unit', 'extra_price', 'is_active']
+CSV_COLUMNS = PRODUCT_COLUMNS + [f'variant_{name}' for name in VARIANT_COLUMNS]
+REQUIRED_CSV_COLUMNS = {'sku', 'category', 'name', 'price'}
+
+PRODUCT_FIELDS = ['name', 'description', 'price', 'tax_rate', 'uom', 'is_active']
+PRODUCT_UPDATE_FIELDS = ['category', *PRODUCT_FIELDS, 'updated_at']
+VARIANT_UPDATE_FIELDS = ['attribute', 'value', 'unit', 'extra_price', 'is_active']
+
+
+class ImportFormatError(ValueError):
+    """Raised for a file that cannot be read as the given format at all."""
+
+
+def guess_format(filename):
+    """'menu.csv' -> 'csv', 'menu.json' / '.jsonl' / '.ndjson' -> 'ndjson', else None."""
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension == 'csv':
+        return 'csv'
+    if extension in ('json', 'jsonl', 'ndjson'):
+        return 'ndjson'
+    return None
+
+
+# ---- Reading ----------------------------------------------------------------
+
+def _cells(row, names, prefix=''):
+    # Empty cells are left out so the serializer defaults apply
+    cells = {}
+    for name in names:
+        value = (row.get(f'{prefix}{name}') or '').strip()
+        if value:
+            cells[name] = value
+    return cells
+
+
+def product_key(record):
+    """A product's identity in a file: its sku, or (category, name) without one."""
+    sku = record.get('sku')
+    if sku:
+        return sku
+    return ((record.get('category') or '').casefold(), (record.get('name') or '').casefold())
+
+
+def read_csv(lines):
+    """Yield (line number, record); consecutive rows of one product are one record."""
+    reader = csv.DictReader(lines)
+    missing = REQUIRED_CSV_COLUMNS - set(reader.fieldnames or ())
+    if missing:
+        raise ImportFormatError(f"Missing CSV columns: {', '.join(sorted(missing))}.")
+
+    current = None
+    for row in reader:
+        product = _cells(row, PRODUCT_COLUMNS)
+        variant = _cells(row, VARIANT_COLUMNS, 'variant_')
+        if current is None or not product.get('name') or product_key(product) != product_key(current[1]):
+            if current is not None:
+                yield current
+            current = (reader.line_num, {**product, 'variants': []})
+        if variant:
+            current[1]['variants'].append(variant)
+    if current is not None:
+        yield current
+
+
+def read_ndjson(lines):
+    """Yield (line number, record), or a ValidationError for a line that is not JSON."""
+    lines = iter(lines)
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        if number == 1 and line.lstrip().startswith('['):
+            # A plain JSON array: not streamable, read it whole
+            try:
+                records = json.loads(line + ''.join(lines))
+            except ValueError as exc:
+                raise ImportFormatError(f'Invalid JSON: {exc}.')
+            yield from enumerate(records, 1)
+            return
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, ValidationError(f'Invalid JSON: {exc}.')
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+# ---- Importing --------------------------------------------------------------
+
+def _messages(detail):
+    # ErrorDetail -> str, for the report's readers beyond the JSON renderer
+    if isinstance(detail, dict):
+        return {key: _messages(value) for key, value in detail.items()}
+    if isinstance(detail, list):
+        return [_messages(value) for value in detail]
+    return str(detail)
+
+
+class MenuImporter:
+    """Validates and upserts product records in chunks (see module docstring)."""
+
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.validator = ProductImportSerializer()
+        self.categories = None   # casefolded name -> id
+        self.report = {
+            'rows': 0,
+            'products_created': 0,
+            'products_updated': 0,
+            'variants_created': 0,
+            'variants_updated': 0,
+            'categories_created': 0,
+            'error_count': 0,
+            'errors': [],
+        }
+
+    def run(self, records):
+        """Import (row, record) pairs; returns the report."""
+        with menu_changes():
+            chunk = []
+            for number, record in records:
+                self.report['rows'] += 1
+                data = self._validate(number, record)
+                if data is not None:
+                    chunk.append(data)
+                if len(chunk) >= self.chunk_size:
+                    self._write(chunk)
+                    chunk = []
+            if chunk:
+                self._write(chunk)
+        return self.report
+
+    def _validate(self, number, record):
+        try:
+            if isinstance(record, ValidationError):
+                raise record
+            return self.validator.run_validation(record)
+        except ValidationError as exc:
+            self.report['error_count'] += 1
+            if len(self.report['errors']) < MAX_REPORTED_ERRORS:
+                sku = record.get('sku') if isinstance(record, dict) else None
+                self.report['errors'].append({'row': number, 'sku': sku, 'errors': _messages(exc.detail)})
+            return None
+
+    def _write(self, chunk):
+        if self.dry_run:
+            return
+        # One record per product: the last one's fields, every one's variants
+        records = {}
+        for data in chunk:
+            key = product_key(data)
+            previous = records.get(key)
+            if previous is not None:
+                data['variants'] = previous['variants'] + data['variants']
+            records[key] = data
+
+        with transaction.atomic():
+            category_ids = self._resolve_categories({data['category'] for data in records.values()})
+            product_ids = self._upsert_by_sku(
+                {key: data for key, data in records.items() if data['sku']}, category_ids
+            )
+            product_ids.update(self._upsert_by_name(
+                {key: data for key, data in records.items() if not data['sku']}, category_ids
+            ))
+
+            self._sync_variants([
+                (product_ids[key], variant) for key, data in records.items() for variant in data['variants']
+            ])
+            # Bulk writes send no signals
+            invalidate_menu_bundle()
+
+    def _product(self, data, category_ids, **kwargs):
+        return Product(
+            category_id=category_ids[data['category'].casefold()],
+            **{field: data[field] for field in PRODUCT_FIELDS},
+            **kwargs,
+        )
+
+    def _upsert_by_sku(self, records, category_ids):
+        if not records:
+            return {}
+        existing = dict(Product.objects.filter(sku__in=records).values_list('sku', 'id'))
+        products = [self._product(data, category_ids, sku=sku) for sku, data in records.items()]
+        # MySQL upserts on any unique key and takes no conflict target
+        target = {'unique_fields': ['sku']} if connection.features.supports_update_conflicts_with_target else {}
+        Product.objects.bulk_create(
+            products, batch_size=self.chunk_size,
+            update_conflicts=True, update_fields=PRODUCT_UPDATE_FIELDS, **target,
+        )
+        product_ids = {product.sku: product.pk for product in products if product.pk is not None}
+        product_ids.update(existing)
+        missing = records.keys() - product_ids.keys()
+        if missing:
+            # Backends that do not return ids from an upsert
+            product_ids.update(Product.objects.filter(sku__in=missing).values_list('sku', 'id'))
+
+        self.report['products_created'] += len(records) - len(existing)
+        self.report['products_updated'] += len(existing)
+        return product_ids
+
+    def _upsert_by_name(self, records, category_ids):
+        if not records:
+            return {}
+        names = {data['name'] for data in records.values()}
+        existing = self._products_without_sku(names)
+        products, to_create, to_update = {}, [], []
+        now = timezone.now()
+        for key, data in records.items():
+            products[key] = product = self._product(data, category_ids, sku=None)
+            product.pk = existing.get((product.category_id, data['name'].casefold()))
+            if product.pk is None:
+                to_create.append(product)
+            else:
+                product.updated_at = now
+                to_update.append(product)
+
+        if to_update:
+            Product.objects.bulk_update(to_update, PRODUCT_UPDATE_FIELDS, batch_size=self.chunk_size)
+        if to_create:
+            Product.objects.bulk_create(to_create, batch_size=self.chunk_size)
+            if any(product.pk is None for product in to_create):
+                # Backends that do not return ids from bulk_create
+                existing = self._products_without_sku(names)
+                for product in to_create:
+                    product.pk = existing[(product.category_id, product.name.casefold())]
+
+        self.report['products_created'] += len(to_create)
+        self.report['products_updated'] += len(to_update)
+        return {key: product.pk for key, product in products.items()}
+
+    @staticmethod
+    def _products_without_sku(names):
+        # (category id, casefolded name) -> id, the oldest product on a tie
+        matches = {}
+        rows = Product.objects.filter(sku__isnull=True, name__in=names).order_by('id')
+        for pk, category_id, name in rows.values_list('id', 'category_id', 'name'):
+            matches.setdefault((category_id, name.casefold()), pk)
+        return matches
+
+    def _resolve_categories(self, names):
+        if self.categories is None:
+            self.categories = {name.casefold(): pk for pk, name in Category.objects.values_list('id', 'name')}
+        new = {}
+        for name in names:
+            if name.casefold() not in self.categories:
+                new.setdefault(name.casefold(), Category(name=name))
+        if new:
+            Category.objects.bulk_create(new.values())
+            if any(category.pk is None for category in new.values()):
+                created = Category.objects.filter(name__in=[category.name for category in new.values()])
+                for category in created:
+                    new[category.name.casefold()].pk = category.pk
+            self.categories.update((key, category.pk) for key, category in new.items())
+            self.report['categories_created'] += len(new)
+        return self.categories
+
+    def _sync_variants(self, variants):
+        if not variants:
+            return
+        product_ids = {product_id for product_id, data in variants}
+        current = {
+            (variant.product_id, variant.attribute.casefold(), variant.value.casefold()): variant
+            for variant in ProductVariant.objects.filter(product_id__in=product_ids)
+        }
+        to_create, to_update = [], {}
+        for product_id, data in variants:
+            key = (product_id, data['attribute'].casefold(), data['value'].casefold())
+            variant = current.get(key)
+            if variant is None:
+                current[key] = variant = ProductVariant(product_id=product_id, **data)
+                to_create.append(variant)
+            elif any(getattr(variant, field) != value for field, value in data.items()):
+                for field, value in data.items():
+                    setattr(variant, field, value)
+                if variant.pk is not None:
+                    to_update[variant.pk] = variant
+
+        if to_update:
+            ProductVariant.objects.bulk_update(to_update.values(), VARIANT_UPDATE_FIELDS, batch_size=self.chunk_size)
+        if to_create:
+            ProductVariant.objects.bulk_create(to_create, batch_size=self.chunk_size)
+        Product.objects.filter(id__in=product_ids, has_variants=False).update(has_variants=True)
+
+        self.report['variants_created'] += len(to_create)
+        self.report['variants_updated'] += len(to_update)
+
+
+def import_menu(stream, fmt, dry_run=False, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Import a binary file object in `fmt` ('csv' or 'ndjson'); returns the
+    report. Raises ImportFormatError for an unreadable file; chunks written
+    before the problem was found stay imported.
+    """
+    lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        return MenuImporter(chunk_size=chunk_size, dry_run=dry_run).run(READERS[fmt](lines))
+    except UnicodeDecodeError:
+        raise ImportFormatError('The file is not UTF-8 text.')
+    except csv.Error as exc:
+        raise ImportFormatError(f'Invalid CSV: {exc}.')
+    finally:
+        # Leave the underlying file open for its owner
+        lines.detach()
+
+
+# ---- Exporting --------------------------------------------------------------
+
+def export_queryset():
+    return Product.objects.select_related('category').prefetch_related('variants').order_by(
+        'category__sequence', 'category__name', 'name', 'id'
+    )
+
+
+def _product_fields(product):
+    return {
+        'sku': product.sku or '',
+        'category': product.category.name,
+        'name': product.name,
+        'description': product.description,
+        'price': str(product.price),
+        'tax_rate': str(product.tax_rate),
+        'uom': product.uom,
+        'is_active': product.is_active,
+    }
+
+
+def _variant_fields(variant):
+    return {
+        'attribute': variant.attribute,
+        'value': variant.value,
+        'unit': variant.unit,
+        'extra_price': str(variant.extra_price),
+        'is_active': variant.is_active,
+    }
+
+
+def stream_csv(queryset):
+    """Yield CSV text, one row per variant (products without variants get one row)."""
+    return stream_csv_rows(CSV_COLUMNS, _csv_rows(queryset))
+
+
+def _csv_rows(queryset):
+    for product in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        header = _product_fields(product)
+        variants = product.variants.all()
+        if not variants:
+            yield header
+        for variant in variants:
+            yield {**header, **{f'variant_{name}': value for name, value in _variant_fields(variant).items()}}
+
+
+def stream_ndjson(queryset):
+    """Yield one JSON document per product with its variants."""
+    for product in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        record = _product_fields(product)
+        record['variants'] = [_variant_fields(variant) for variant in product.variants.all()]
+        yield json.dumps(record) + '\n'
+
+
+STREAM_WRITERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
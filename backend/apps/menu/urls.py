@@ -9,5 +9,10 @@ router.register(r'categories', views.CategoryViewSet)
 router.register(r'products', views.ProductViewSet)
 
 urlpatterns = [
+    path('public/', views.public_menu, name='public_menu'),
+    path('public/products/', views.public_products, name='public_products'),
+    path('public/search/', views.public_search, name='public_search'),
+    path('import/', views.MenuImportView.as_view(), name='menu_import'),
+    path('export/', views.MenuExportView.as_view(), name='menu_export'),
     path('', include(router.urls)),
 ]
@@ -1,10 +1,16 @@
-from rest_framework import viewsets, filters, permissions
+from rest_framework import viewsets, filters, permissions, views
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Category, Product
 from .serializers import CategorySerializer, ProductSerializer
 from apps.accounts.permissions import IsAdmin, IsStaff, IsAdminOrCashier
 from apps.core.responses import APIResponse
+from apps.core.compiled import CompiledReadMixin
+from apps.core.search import IndexedSearchFilter
 from rest_framework.decorators import action
+from django.views.decorators.http import require_GET
+from .bundle import aget_menu_bundle, aget_menu_bundle_json, aget_public_products_by_id
+from .search import aget_catalog, get_catalog
+from apps.core.responses import AsyncAPIResponse
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,10 +21,13 @@ class CategoryViewSet(viewsets.ModelViewSet):
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['name']
+    filter_backends = [IndexedSearchFilter, filters.OrderingFilter]
+    search_fields = ['name']  # Indexed by apps.menu.search
     ordering_fields = ['sequence', 'name']
 
+    def get_search_index(self):
+        return get_catalog().categories
+
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
             return [permissions.AllowAny()]
@@ -64,17 +73,20 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return APIResponse.success(message=f'Category {name} deleted successfully')
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(CompiledReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for products.
     """
-    queryset = Product.objects.all().prefetch_related('variants')
+    queryset = Product.objects.select_related('category').prefetch_related('variants')
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'is_active', 'has_variants']
-    search_fields = ['name', 'description']
+    search_fields = ['name', 'description']  # Indexed by apps.menu.search
     ordering_fields = ['name', 'price', 'created_at']
 
+    def get_search_index(self):
+        return get_catalog().products
+
     def get_permissions(self):
         if self.action in ['list', 'retrieve', 'toggle_availability']:
             return [permissions.AllowAny()]
@@ -139,3 +151,127 @@ class ProductViewSet(viewsets.ModelViewSet):
             message=f"Product availability updated to {'Available' if product.is_active else 'Unavailable'}"
         )
 
+
+# =============================================================================
+# Bulk import / export (apps.menu.transfer)
+# =============================================================================
+
+class MenuImportView(views.APIView):
+    """
+    POST /api/menu/import/?fmt=csv|ndjson&dry_run=1
+    Upsert categories, products (matched on sku) and variants from an
+    uploaded `file`. Invalid rows are skipped and listed in the report;
+    dry_run only validates. fmt defaults to the file extension.
+    """
+    permission_classes = [IsAdmin]
+
+    def post(self, request):
+        from django.template.defaultfilters import pluralize
+        from .transfer import FORMATS, ImportFormatError, guess_format, import_menu
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return APIResponse.error(message="Upload the menu as 'file'.", error_code="FILE_REQUIRED")
+
+        import_format = request.query_params.get('fmt') or guess_format(upload.name)
+        if import_format not in FORMATS:
+            return APIResponse.error(
+                message=f"Invalid format. Choices: {list(FORMATS)}",
+                error_code="INVALID_FORMAT"
+            )
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            report = import_menu(upload.file, import_format, dry_run=dry_run)
+        except ImportFormatError as e:
+            return APIResponse.error(message=str(e), error_code="INVALID_FILE")
+
+        logger.info(
+            f"Menu import ({import_format}{', dry run' if dry_run else ''}) by user {request.user}: "
+            f"{report['rows']} rows, {report['error_count']} invalid"
+        )
+        message = 'Menu validated' if dry_run else 'Menu imported'
+        if report['error_count']:
+            message += f" with {report['error_count']} invalid row{pluralize(report['error_count'])} skipped"
+        return APIResponse.success(data=report, message=message)
+
+
+class MenuExportView(views.APIView):
+    """
+    GET /api/menu/export/?fmt=csv|ndjson
+    Stream every product with its category and variants, in the format
+    the import reads.
+    """
+    permission_classes = [IsAdminOrCashier]
+
+    def get(self, request):
+        from django.utils import timezone
+        from apps.core.streaming import streaming_export
+        from .transfer import FORMATS, STREAM_WRITERS, export_queryset
+
+        export_format = request.query_params.get('fmt', 'csv')
+        if export_format not in FORMATS:
+            return APIResponse.error(
+                message=f"Invalid format. Choices: {list(FORMATS)}",
+                error_code="INVALID_FORMAT"
+            )
+
+        logger.info(f"Menu export ({export_format}) started by user {request.user}")
+
+        return streaming_export(
+            request,
+            STREAM_WRITERS[export_format](export_queryset()),
+            content_type=FORMATS[export_format],
+            filename=f"menu-{timezone.localdate().isoformat()}.{export_format}",
+        )
+
+
+# =============================================================================
+# Public async endpoints (customer QR menu)
+# =============================================================================
+
+@require_GET
+async def public_menu(request):
+    """
+    GET /api/menu/public/
+    Privacy: AllowAny. Active categories with their products and variants
+    in one response, served from the cached, pre-encoded bundle.
+    """
+    return AsyncAPIResponse.success(data=await aget_menu_bundle_json())
+
+
+@require_GET
+async def public_products(request):
+    """
+    GET /api/menu/public/products/?category=<id>
+    Privacy: AllowAny. Flat list of active products, optionally for one
+    category, served from the cached bundle.
+    """
+    category_id = request.GET.get('category')
+    bundle = await aget_menu_bundle()
+    products = [
+        {**product, 'category_name': category['name'], 'category_color': category['color']}
+        for category in bundle['categories']
+        if not category_id or str(category['id']) == category_id
+        for product in category['products']
+    ]
+    return AsyncAPIResponse.success(data=products)
+
+
+@require_GET
+async def public_search(request):
+    """
+    GET /api/menu/public/search/?q=<text>&limit=<n>
+    Privacy: AllowAny. Active products ranked by match (prefix and typo
+    tolerant), in the shape of public_products, from the in-memory index.
+    """
+    query = request.GET.get('q', '')
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 100))
+    except ValueError:
+        limit = 20
+
+    catalog = await aget_catalog()
+    ranked = catalog.products.search(query, limit=limit, only=catalog.public_products)
+    products = await aget_public_products_by_id()
+    return AsyncAPIResponse.success(data=[products[product_id] for product_id, score in ranked if product_id in products])
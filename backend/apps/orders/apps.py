@@ -4,3 +4,6 @@ class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.orders'
     verbose_name = 'Order Management'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,293 @@
+"""
+In-process load generator for the POS API (used by `manage.py posbench`).
+
+Each worker thread drives the real URL routing, middleware, DRF views and
+database through the Django test client, picking operations from a
+weighted mix. Every operation records its latency and the number of SQL
+queries it ran; results are summarised as throughput and percentiles and
+can be saved as a JSON baseline to compare later runs against.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import User
+from apps.menu.models import Product
+from apps.tables.models import Table
+from .models import Order
+from .synthetic import SYNTHETIC_EMAIL_DOMAIN
+
+BENCH_RAZORPAY_SECRET = 'posbench-secret'
+
+DEFAULT_MIX = {
+    'cashier_order': 3,
+    'qr_order': 3,
+    'kitchen_flow': 2,
+    'payment_verify': 1,
+    'dashboard': 1,
+}
+
+
+class BenchmarkError(Exception):
+    """An operation got an unexpected response."""
+
+
+class _OfflineRazorpayClient:
+    """Stands in for razorpay.Client so no request leaves the machine."""
+
+    class payment:
+        @staticmethod
+        def fetch(payment_id):
+            raise ConnectionError('posbench: payment gateway is offline')
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+@contextmanager
+def bench_environment():
+    """
+    Settings for a self-contained run: in-memory channel layer, profiling
+    off, no throttling, logging muted and no payment gateway calls (QR
+    orders skip Razorpay; verification falls back to the order total).
+    """
+    overrides = override_settings(
+        DEBUG=False,
+        CHANNEL_LAYERS={
+            'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+            'customers': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+        },
+        PROFILING={**getattr(settings, 'PROFILING', {}), 'ENABLED': False},
+        RAZORPAY_KEY_ID='',
+        RAZORPAY_KEY_SECRET=BENCH_RAZORPAY_SECRET,
+    )
+    # Expected warnings (e.g. "gateway not configured") would otherwise be
+    # written for every operation and skew the numbers
+    logging.disable(logging.ERROR)
+    try:
+        with overrides, \
+                mock.patch.object(APIView, 'get_throttles', return_value=[]), \
+                mock.patch('apps.payments.views.razorpay.Client', _OfflineRazorpayClient):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def _auth_client(user):
+    client = Client()
+    client.defaults['HTTP_AUTHORIZATION'] = 'Bearer ' + str(RefreshToken.for_user(user).access_token)
+    return client
+
+
+class Worker:
+    """One simulated terminal: owns its clients, RNG and query counter."""
+
+    def __init__(self, index, context, seed):
+        self.rng = random.Random(seed + index)
+        self.context = context
+        self.cashier = _auth_client(context['cashiers'][index % len(context['cashiers'])])
+        self.kitchen = _auth_client(context['kitchen'])
+        self.admin = _auth_client(context['admin'])
+        self.anon = Client()
+        self.queries = 0
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def _check(self, response, expected=(200, 201)):
+        if response.status_code not in expected:
+            raise BenchmarkError(
+                f'{response.request["PATH_INFO"]} -> {response.status_code}: {response.content[:120]!r}'
+            )
+        return response.json() if response.get('Content-Type', '').startswith('application/json') else None
+
+    def _basket(self):
+        size = self.rng.choices([1, 2, 3, 4], weights=[40, 30, 20, 10])[0]
+        return self.rng.sample(self.context['product_ids'], size)
+
+    def run(self, operation):
+        """Run one operation; returns (seconds, queries)."""
+        self.queries = 0
+        start = time.perf_counter()
+        with connection.execute_wrapper(self._count_query):
+            getattr(self, f'op_{operation}')()
+        return time.perf_counter() - start, self.queries
+
+    # ---- Operations ------------------------------------------------------
+
+    def op_cashier_order(self):
+        """Cashier opens an order, rings up items and sends it to the kitchen."""
+        data = self._check(self.cashier.post('/api/orders/', data={
+            'table': self.rng.choice(self.context['table_ids']),
+            'order_type': 'dine_in',
+        }, content_type='application/json'))
+        order_id = data['data']['id']
+        for product_id in self._basket():
+            self._check(self.cashier.post(f'/api/orders/{order_id}/lines/', data={
+                'product': product_id,
+                'quantity': self.rng.choice([1, 1, 2]),
+                'unit_price': '0',
+                'tax_rate': '0',
+            }, content_type='application/json'))
+        self._check(self.cashier.post(f'/api/orders/{order_id}/send-to-kitchen/'))
+
+    def op_qr_order(self):
+        """Customer scans a table QR, checks it and places an order."""
+        token = self.rng.choice(self.context['table_tokens'])
+        self._check(self.anon.get(f'/api/orders/qr/info/?table_token={token}'))
+        self._check(self.anon.post('/api/orders/qr/', data=json.dumps({
+            'table_token': token,
+            'lines': [{'product': p, 'quantity': 1} for p in self._basket()],
+        }), content_type='application/json'))
+
+    def op_kitchen_flow(self):
+        """Kitchen loads the board and moves the oldest ticket along."""
+        self._check(self.kitchen.get('/api/kitchen/orders/'))
+        order = Order.objects.filter(
+            status__in=[Order.Status.SENT_TO_KITCHEN, Order.Status.PREPARED]
+        ).order_by('created_at').values('id', 'status').first()
+        if order is None:
+            return
+        if order['status'] == Order.Status.SENT_TO_KITCHEN:
+            self._check(self.kitchen.patch(
+                f"/api/kitchen/orders/{order['id']}/update-status/",
+                data={'status': Order.Status.PREPARED}, content_type='application/json'
+            ))
+        else:
+            self._check(self.kitchen.post(f"/api/kitchen/orders/{order['id']}/complete/"))
+
+    def op_payment_verify(self):
+        """Customer pays for a QR order online; the frontend verifies it."""
+        order = Order.objects.filter(
+            status=Order.Status.DRAFT, razorpay_order_id__isnull=True, lines__isnull=False
+        ).values('id').first()
+        if order is None:
+            return
+        razorpay_order_id = f"order_bench{order['id']}"
+        Order.objects.filter(pk=order['id']).update(razorpay_order_id=razorpay_order_id)
+        payment_id = f"pay_bench{order['id']}_{self.rng.getrandbits(32)}"
+        signature = hmac.new(
+            BENCH_RAZORPAY_SECRET.encode(),
+            f'{razorpay_order_id}|{payment_id}'.encode(),
+            hashlib.sha256
+        ).hexdigest()
+        self._check(self.anon.post('/api/payments/verify/', data={
+            'razorpay_order_id': razorpay_order_id,
+            'razorpay_payment_id': payment_id,
+            'razorpay_signature': signature,
+        }, content_type='application/json'))
+
+    def op_dashboard(self):
+        """Owner refreshes the dashboard."""
+        period = self.rng.choice(['daily', 'daily', 'weekly', 'monthly'])
+        self._check(self.admin.get(f'/api/orders/dashboard/stats/?period={period}'))
+
+
+def build_context():
+    """Ids and users the workers pick from, loaded from the seeded cafe."""
+    staff = User.objects.filter(email__endswith='@' + SYNTHETIC_EMAIL_DOMAIN).order_by('email')
+    return {
+        'admin': staff.filter(role=User.Role.ADMIN).first(),
+        'kitchen': staff.filter(role=User.Role.KITCHEN).first(),
+        'cashiers': list(staff.filter(role=User.Role.CASHIER, pos_sessions__status='open').distinct()),
+        'product_ids': list(Product.objects.filter(is_active=True).values_list('id', flat=True)),
+        'table_ids': list(Table.objects.filter(floor__session_route__isnull=False).values_list('id', flat=True)),
+        'table_tokens': list(Table.objects.filter(floor__session_route__isnull=False).values_list('token', flat=True)),
+    }
+
+
+def run_benchmark(context, concurrency=4, operations=200, mix=None, seed=1):
+    """
+    Run `operations` operations per worker across `concurrency` threads.
+
+    Returns {'wall_seconds', 'operations': {name: {'latencies', 'queries',
+    'errors'}}}.
+    """
+    mix = mix or DEFAULT_MIX
+    names, weights = list(mix), list(mix.values())
+    results = {name: {'latencies': [], 'queries': [], 'errors': []} for name in names}
+    lock = threading.Lock()
+
+    def work(index):
+        worker = Worker(index, context, seed)
+        try:
+            for _ in range(operations):
+                name = worker.rng.choices(names, weights=weights)[0]
+                try:
+                    elapsed, queries = worker.run(name)
+                except Exception as e:
+                    with lock:
+                        results[name]['errors'].append(str(e)[:200])
+                    continue
+                with lock:
+                    results[name]['latencies'].append(elapsed)
+                    results[name]['queries'].append(queries)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {'wall_seconds': time.perf_counter() - start, 'operations': results}
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(raw):
+    """Per-operation throughput, latency percentiles (ms) and queries."""
+    wall = raw['wall_seconds']
+    summary = {'wall_seconds': round(wall, 3), 'operations': {}}
+    total = 0
+    for name, data in raw['operations'].items():
+        latencies = sorted(data['latencies'])
+        count = len(latencies)
+        total += count
+        summary['operations'][name] = {
+            'count': count,
+            'errors': len(data['errors']),
+            'throughput': round(count / wall, 2) if wall else 0.0,
+            'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(_percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(_percentile(latencies, 0.99) * 1000, 2),
+            'mean_queries': round(statistics.fmean(data['queries']), 1) if data['queries'] else 0.0,
+            'max_queries': max(data['queries'], default=0),
+            'sample_errors': data['errors'][:3],
+        }
+    summary['throughput'] = round(total / wall, 2) if wall else 0.0
+    return summary
+
+
+def compare(current, baseline):
+    """Rows of (operation, metric, baseline, current, change %) for the report."""
+    rows = []
+    for name, stats in current['operations'].items():
+        base = baseline.get('operations', {}).get(name)
+        if not base:
+            continue
+        for metric in ('throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_queries'):
+            before, after = base.get(metric, 0), stats[metric]
+            change = ((after - before) / before * 100) if before else 0.0
+            rows.append((name, metric, before, after, round(change, 1)))
+    return rows
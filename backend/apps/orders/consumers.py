@@ -0,0 +1,175 @@
+import asyncio
+
+from django.core.exceptions import ValidationError
+
+from apps.core import metrics
+from apps.core.broadcast import CUSTOMER_LAYER, order_group
+from apps.core.websocket import ManagedWebsocketConsumer, get_websocket_settings
+from apps.kitchen.consumers import CLOSE_FORBIDDEN, CLOSE_UNAUTHENTICATED
+from . import kpi
+from .kpi import KPI_GROUP, KPIAggregate
+from .models import Order, OrderLine
+
+# Once an order reaches one of these there is nothing left to push
+FINAL_STATUSES = {Order.Status.COMPLETED, Order.Status.CANCELLED}
+
+CLOSE_NOT_FOUND = 4404
+
+
+class OrderTrackingConsumer(ManagedWebsocketConsumer):
+    """
+    ws/orders/<uuid>/ - live status for the customer who placed an order.
+
+    Anonymous: the order uuid is the capability, as for GET
+    /api/orders/track/<uuid>/. On connect the client gets a snapshot of the
+    order and its lines, then 'order_status' deltas from the kitchen and
+    payment views (see apps.core.broadcast.customer_delta). The socket is
+    closed once the order is completed or cancelled.
+
+    Runs on the 'customers' channel layer (small queues, short expiry).
+    """
+    channel_layer_alias = CUSTOMER_LAYER
+    consumer_label = 'order_tracking'
+
+    async def connect(self):
+        self.group_name = None
+        try:
+            order = await Order.objects.only('id', 'uuid', 'status', 'updated_at').aget(
+                uuid=self.scope['url_route']['kwargs']['order_uuid']
+            )
+        except (Order.DoesNotExist, ValidationError):
+            metrics.WEBSOCKET_REJECTED.inc(reason='order_not_found')
+            await self.close(code=CLOSE_NOT_FOUND)
+            return
+
+        self.group_name = order_group(order.uuid)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.start_managed()
+        metrics.WEBSOCKET_CONNECTIONS.inc(group='order')
+
+        lines = {
+            str(line_id): status
+            async for line_id, status in OrderLine.objects.filter(order_id=order.pk).values_list('id', 'status')
+        }
+        self.push({
+            'type': 'order_snapshot',
+            'message': {
+                'order': str(order.uuid),
+                'status': order.status,
+                'updated_at': order.updated_at.isoformat() if order.updated_at else None,
+                'lines': lines,
+            }
+        })
+        if order.status in FINAL_STATUSES:
+            self.finish()
+
+    async def disconnect(self, close_code):
+        if self.group_name:
+            metrics.WEBSOCKET_CONNECTIONS.dec(group='order')
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def order_status(self, event):
+        """
+        Handler for 'order.status' deltas.
+        """
+        message = event['message']
+        self.push({
+            'type': 'order_status',
+            'message': message
+        })
+        if message['status'] in FINAL_STATUSES:
+            self.finish()
+
+
+class DashboardKPIConsumer(ManagedWebsocketConsumer):
+    """
+    ws/dashboard/kpis/ - live headline figures for the owner dashboard (admins).
+
+    The socket joins the KPI group, reads the totals once and sends them as
+    'kpi_snapshot'; after that every order, line or payment change arrives
+    as a delta (see apps.orders.kpi), is applied to the socket's running
+    totals and forwarded as 'kpi_delta' with the recomputed summary. No
+    queries are made per event.
+
+    Deltas racing the initial read may be counted twice; the totals are
+    re-read every KPI_RESEED_INTERVAL seconds, and a client can send
+    {"type": "snapshot"} (e.g. after a 'resync') to get the current totals.
+    While open the socket keeps the KPI presence key alive, so writers
+    only send deltas when someone is listening; one extra reseed after
+    kpi.LISTENER_CHECK_INTERVAL covers writers that had not noticed yet.
+    """
+    consumer_label = 'dashboard_kpi'
+
+    async def connect(self):
+        self.joined = False
+        self.aggregate = None
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            metrics.WEBSOCKET_REJECTED.inc(reason='unauthenticated')
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+        if not user.is_admin:
+            metrics.WEBSOCKET_REJECTED.inc(reason='forbidden')
+            await self.close(code=CLOSE_FORBIDDEN)
+            return
+
+        # Join before reading so no delta falls between the two
+        await kpi.amark_listening()
+        await self.channel_layer.group_add(KPI_GROUP, self.channel_name)
+        self.joined = True
+        await self.accept()
+        await self.start_managed()
+        metrics.WEBSOCKET_CONNECTIONS.inc(group=KPI_GROUP)
+
+        await self.reseed()
+        self.tasks.append(asyncio.ensure_future(self._reseed_periodically()))
+        self.tasks.append(asyncio.ensure_future(self._keep_listening()))
+
+    async def disconnect(self, close_code):
+        if self.joined:
+            metrics.WEBSOCKET_CONNECTIONS.dec(group=KPI_GROUP)
+            await self.channel_layer.group_discard(KPI_GROUP, self.channel_name)
+
+    async def reseed(self):
+        self.aggregate = await KPIAggregate.aseed()
+        self.push_snapshot()
+
+    def push_snapshot(self):
+        self.push({
+            'type': 'kpi_snapshot',
+            'message': self.aggregate.as_dict()
+        })
+
+    async def _reseed_periodically(self):
+        interval = get_websocket_settings()['KPI_RESEED_INTERVAL']
+        while True:
+            await asyncio.sleep(interval)
+            await self.reseed()
+
+    async def _keep_listening(self):
+        await asyncio.sleep(kpi.LISTENER_CHECK_INTERVAL)
+        await self.reseed()
+        while True:
+            await asyncio.sleep(kpi.LISTENER_TTL / 3)
+            await kpi.amark_listening()
+
+    async def receive_message(self, message):
+        if message.get('type') == 'snapshot' and self.aggregate is not None:
+            self.push_snapshot()
+
+    async def kpi_delta(self, event):
+        """
+        Handler for 'kpi.delta' messages.
+        """
+        if self.aggregate is None:
+            return
+        delta = event['message']
+        self.aggregate.apply(delta)
+        self.push({
+            'type': 'kpi_delta',
+            'message': {
+                'delta': delta,
+                'summary': self.aggregate.summary(),
+            }
+        })
@@ -1,12 +1,14 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
 from django.db import models
 from django.db.models import Sum, Count, Avg, F
 from django.db.models.functions import TruncDate
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
 import logging
 
+from apps.core.cache import namespace
 from apps.core.responses import APIResponse
 from apps.accounts.permissions import IsAdmin
 from .models import Order, OrderLine
@@ -15,6 +17,48 @@ from apps.accounts.models import User
 
 logger = logging.getLogger(__name__)
 
+# Statuses that count towards sales figures (everything except cancelled).
+# Filtering with IN keeps the (status, created_at) index usable.
+SALES_STATUSES = [s for s in Order.Status.values if s != Order.Status.CANCELLED]
+
+TREND_PERIODS = ('hourly', 'daily', 'monthly', 'yearly')
+
+# Payloads are cached per period and rebuilt once per miss however many
+# admins are polling. Completions, cancellations and payments invalidate
+# them (see signals.py); the short timeout picks up everything else
+# (new drafts, line edits) without invalidating on every order save.
+dashboard_cache = namespace('dashboard', timeout=settings.DASHBOARD_CACHE_TIMEOUT)
+
+
+def invalidate_dashboard():
+    """Drop all cached dashboard payloads; the next poll rebuilds them."""
+    dashboard_cache.invalidate()
+
+
+def _trend_period(request):
+    """The requested trend period, falling back to daily for unknown values."""
+    period = request.query_params.get('period', 'daily')
+    return period if period in TREND_PERIODS else 'daily'
+
+
+def sales_orders_since(start):
+    """Non-cancelled orders inside a trend window (plan checked in apps.orders.query_plans)."""
+    return Order.objects.filter(
+        status__in=SALES_STATUSES,
+        created_at__gte=start
+    ).values('created_at', 'total_amount')
+
+
+def completed_orders():
+    return Order.objects.filter(status=Order.Status.COMPLETED)
+
+
+def _local_midnight(day):
+    """Aware datetime for the start of `day` in the current timezone."""
+    from datetime import datetime, time
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
 class DashboardStatsView(APIView):
     """
     GET /api/orders/dashboard/stats/
@@ -26,16 +70,13 @@ class DashboardStatsView(APIView):
         """Generate sales trend data based on period (hourly, daily, monthly, yearly)"""
         from datetime import datetime
         
-        # Get all non-cancelled orders
-        all_orders = Order.objects.exclude(status=Order.Status.CANCELLED).values('created_at', 'total_amount')
-        
         if period == 'hourly':
             # Last 24 hours (current hour + 23 previous hours)
             current_hour = timezone.localtime(timezone.now()).replace(minute=0, second=0, microsecond=0)
             start_time = current_hour - timedelta(hours=23)
             sales_data = {}
             
-            for order in all_orders:
+            for order in sales_orders_since(start_time):
                 order_time = timezone.localtime(order['created_at'])
                 if order_time >= start_time:
                     hour_key = order_time.strftime('%Y-%m-%d %H:00')
@@ -71,7 +112,7 @@ class DashboardStatsView(APIView):
                 year -= 1
             start_month = current_month.replace(year=year, month=month)
             
-            for order in all_orders:
+            for order in sales_orders_since(_local_midnight(start_month)):
                 order_date = timezone.localtime(order['created_at']).date()
                 if order_date >= start_month:
                     month_key = order_date.strftime('%Y-%m')
@@ -104,7 +145,7 @@ class DashboardStatsView(APIView):
             current_year = timezone.now().year
             start_year = current_year - 4
             
-            for order in all_orders:
+            for order in sales_orders_since(_local_midnight(date(start_year, 1, 1))):
                 order_year = timezone.localtime(order['created_at']).year
                 if order_year >= start_year:
                     if order_year not in sales_data:
@@ -128,7 +169,7 @@ class DashboardStatsView(APIView):
             seven_days_ago = timezone.now().date() - timedelta(days=6)
             daily_totals = {}
             
-            for order in all_orders:
+            for order in sales_orders_since(_local_midnight(seven_days_ago)):
                 order_date = timezone.localtime(order['created_at']).date()
                 if order_date >= seven_days_ago:
                     if order_date not in daily_totals:
@@ -148,42 +189,44 @@ class DashboardStatsView(APIView):
         
         return sales_trend
 
-    def get(self, request):
-        from apps.sessions.models import POSSession
-        
-        period = request.query_params.get('period', 'daily')
+    def _build_stats(self, period):
+        # Show ALL orders (including open sessions) for real-time stats
+        # 1. Overall Stats
+        total_sales = Order.objects.exclude(
+            status=Order.Status.CANCELLED
+        ).aggregate(total=Sum('total_amount'))['total'] or 0
         
-        try:
-            # Show ALL orders (including open sessions) for real-time stats
-            # 1. Overall Stats
-            total_sales = Order.objects.exclude(
-                status=Order.Status.CANCELLED
-            ).aggregate(total=Sum('total_amount'))['total'] or 0
-            
-            total_orders = Order.objects.exclude(status=Order.Status.CANCELLED).count()
-            completed_orders = Order.objects.filter(status=Order.Status.COMPLETED).count()
-            avg_order_value = total_sales / total_orders if total_orders > 0 else 0
+        total_orders = Order.objects.exclude(status=Order.Status.CANCELLED).count()
+        completed_count = completed_orders().count()
+        avg_order_value = total_sales / total_orders if total_orders > 0 else 0
+
+        # 2. Category Breakdown (for Pie Chart)
+        category_stats = Category.objects.filter(is_active=True).annotate(
+            sales=Sum('products__orderline__total_price', filter=~models.Q(products__orderline__order__status=Order.Status.CANCELLED)),
+            order_count=Count('products__orderline__order', distinct=True, filter=~models.Q(products__orderline__order__status=Order.Status.CANCELLED))
+        ).values('name', 'color', 'sales', 'order_count').order_by('-sales')
 
-            # 2. Category Breakdown (for Pie Chart)
-            category_stats = Category.objects.filter(is_active=True).annotate(
-                sales=Sum('products__orderline__total_price', filter=~models.Q(products__orderline__order__status=Order.Status.CANCELLED)),
-                order_count=Count('products__orderline__order', distinct=True, filter=~models.Q(products__orderline__order__status=Order.Status.CANCELLED))
-            ).values('name', 'color', 'sales', 'order_count').order_by('-sales')
+        # 3. Sales Trend based on period
+        sales_trend = self._get_sales_trend(period)
 
-            # 3. Sales Trend based on period
-            sales_trend = self._get_sales_trend(period)
+        return {
+            'summary': {
+                'total_sales': float(total_sales),
+                'total_orders': total_orders,
+                'completed_orders': completed_count,
+                'avg_order_value': float(avg_order_value),
+            },
+            'category_breakdown': list(category_stats),
+            'sales_trend': sales_trend
+        }
 
+    def get(self, request):
+        period = _trend_period(request)
+
+        try:
+            data = dashboard_cache.get_or_set(f'stats:{period}', lambda: self._build_stats(period))
             return APIResponse.success(
-                data={
-                    'summary': {
-                        'total_sales': float(total_sales),
-                        'total_orders': total_orders,
-                        'completed_orders': completed_orders,
-                        'avg_order_value': float(avg_order_value),
-                    },
-                    'category_breakdown': list(category_stats),
-                    'sales_trend': sales_trend
-                },
+                data=data,
                 message="Dashboard statistics retrieved successfully"
             )
         except Exception as e:
@@ -198,11 +241,11 @@ class SalesHistoryView(APIView):
     permission_classes = [IsAdmin]
 
     def get(self, request):
-        period = request.query_params.get('period', 'daily')
+        period = _trend_period(request)
         
         # Use the same _get_sales_trend method from DashboardStatsView
         stats_view = DashboardStatsView()
-        sales_data = stats_view._get_sales_trend(period)
+        sales_data = dashboard_cache.get_or_set(f'trend:{period}', lambda: stats_view._get_sales_trend(period))
 
         return APIResponse.success(
             data={'history': sales_data},
@@ -0,0 +1,145 @@
+"""
+Streaming export of orders with their lines and payments (CSV / NDJSON).
+
+Orders are read with a chunked server-side iterator and each chunk's lines
+and payments are prefetched, so memory stays flat however large the range
+(served with apps.core.streaming.streaming_export()).
+"""
+import json
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.core.streaming import stream_csv_rows
+from apps.payments.models import Payment
+from .models import OrderLine
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+CSV_COLUMNS = [
+    'order_number', 'created_at', 'session', 'cashier', 'table_number',
+    'order_type', 'status', 'customer_name', 'customer_phone',
+    'subtotal', 'tax_amount', 'discount_amount', 'total_amount',
+    'paid_amount', 'payment_methods',
+    'line_id', 'product', 'variant', 'quantity', 'unit_price',
+    'tax_rate', 'line_tax_amount', 'line_total', 'line_status',
+]
+
+
+class ExportFilterError(ValueError):
+    """Raised for malformed export filter parameters."""
+
+
+def filter_export_queryset(queryset, params):
+    """
+    Apply the export filters and the prefetches the writers need.
+
+    params: date_from / date_to (YYYY-MM-DD, inclusive, local time) and
+    session (id).
+    """
+    date_from = params.get('date_from')
+    date_to = params.get('date_to')
+    session = params.get('session')
+
+    if date_from:
+        day = parse_date(date_from)
+        if not day:
+            raise ExportFilterError('date_from must be YYYY-MM-DD.')
+        queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(day, time.min)))
+    if date_to:
+        day = parse_date(date_to)
+        if not day:
+            raise ExportFilterError('date_to must be YYYY-MM-DD.')
+        queryset = queryset.filter(created_at__lte=timezone.make_aware(datetime.combine(day, time.max)))
+    if session:
+        if not str(session).isdigit():
+            raise ExportFilterError('session must be a session id.')
+        queryset = queryset.filter(session_id=session)
+
+    return queryset.select_related('table', 'session__cashier').prefetch_related(None).prefetch_related(
+        Prefetch('lines', queryset=OrderLine.objects.select_related('product', 'variant')),
+        Prefetch('payments', queryset=Payment.objects.select_related('payment_method')),
+    ).order_by('created_at', 'id')
+
+
+def _order_fields(order):
+    completed = [p for p in order.payments.all() if p.status == Payment.Status.COMPLETED]
+    return {
+        'order_number': order.order_number,
+        'created_at': timezone.localtime(order.created_at).isoformat(),
+        'session': order.session.session_number,
+        'cashier': order.session.cashier.email,
+        'table_number': order.table.table_number if order.table else '',
+        'order_type': order.order_type,
+        'status': order.status,
+        'customer_name': order.customer_name,
+        'customer_phone': order.customer_phone,
+        'subtotal': str(order.subtotal),
+        'tax_amount': str(order.tax_amount),
+        'discount_amount': str(order.discount_amount),
+        'total_amount': str(order.total_amount),
+        'paid_amount': str(sum((p.amount for p in completed), Decimal('0.00'))),
+        'payment_methods': ';'.join(sorted({p.payment_method.name for p in completed})),
+    }
+
+
+def _line_fields(line):
+    return {
+        'line_id': line.id,
+        'product': line.product.name,
+        'variant': f"{line.variant.attribute}: {line.variant.value}" if line.variant else '',
+        'quantity': line.quantity,
+        'unit_price': str(line.unit_price),
+        'tax_rate': str(line.tax_rate),
+        'line_tax_amount': str(line.tax_amount),
+        'line_total': str(line.total_price),
+        'line_status': line.status,
+    }
+
+
+def stream_csv(queryset):
+    """Yield CSV text, one row per order line (orders without lines get one row)."""
+    return stream_csv_rows(CSV_COLUMNS, _csv_rows(queryset))
+
+
+def _csv_rows(queryset):
+    for order in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        header = _order_fields(order)
+        lines = order.lines.all()
+        if not lines:
+            yield header
+        for line in lines:
+            yield {**header, **_line_fields(line)}
+
+
+def stream_ndjson(queryset):
+    """Yield one JSON document per order with nested lines and payments."""
+    for order in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        record = _order_fields(order)
+        record['lines'] = [_line_fields(line) for line in order.lines.all()]
+        record['payments'] = [
+            {
+                'id': payment.id,
+                'method': payment.payment_method.name,
+                'amount': str(payment.amount),
+                'status': payment.status,
+                'transaction_id': payment.transaction_id,
+                'paid_at': timezone.localtime(payment.paid_at).isoformat(),
+            }
+            for payment in order.payments.all()
+        ]
+        yield json.dumps(record) + '\n'
+
+
+STREAM_WRITERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
@@ -0,0 +1,258 @@
+"""
+Live KPI aggregate for the admin dashboard socket.
+
+The dashboard's headline figures are sums over every order, so instead of
+re-running them per poll each admin socket keeps a running aggregate:
+seeded once with KPIAggregate.aseed(), then moved by deltas. Signal
+handlers (signals.py) turn order, line and payment saves into deltas and
+broadcast them to KPI_GROUP after commit, so an order event costs one
+message however many dashboards are open.
+
+Deltas are additive, with decimals as strings:
+
+    {'sales': '105.00', 'orders': 1, 'completed': 0, 'collected': '0',
+     'categories': {'3': '100.00'}}
+
+Category figures are line subtotals (as on the dashboard pie chart); the
+per-category order count is not tracked live. Bulk .update() calls bypass
+signals, so consumers reseed every WEBSOCKETS['KPI_RESEED_INTERVAL']
+seconds to bound any drift; bulk_create() inserts apply their deltas
+explicitly (publish_new_lines()).
+"""
+import logging
+import time
+from decimal import Decimal
+
+from django.core.cache import cache as shared_cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from apps.core.broadcast import broadcast
+from apps.menu.bundle import menu_cache
+from apps.menu.models import Category, Product
+from apps.payments.models import Payment
+from .models import Order, OrderLine
+
+logger = logging.getLogger(__name__)
+
+KPI_GROUP = 'dashboard_kpi'
+
+LISTENING_KEY = 'kpi:listening'
+LISTENER_TTL = 60
+LISTENER_CHECK_INTERVAL = 2.0
+
+_listening = {'value': False, 'checked': None}
+
+ZERO = Decimal('0')
+
+
+def _decimal(value):
+    # Unsaved instances may still hold the field's float/int default
+    return value if isinstance(value, Decimal) else Decimal(str(value or 0))
+
+
+def counts_as_sale(status):
+    """Cancelled orders are left out of every sales figure."""
+    return status is not None and status != Order.Status.CANCELLED
+
+
+def _product_categories():
+    # Product -> category map, invalidated with the menu bundle
+    return menu_cache.get_or_set(
+        'product_categories', lambda: dict(Product.objects.values_list('id', 'category_id'))
+    )
+
+
+# ---- Presence ---------------------------------------------------------------
+
+async def amark_listening():
+    """Tell writers a dashboard socket is open (for LISTENER_TTL seconds)."""
+    try:
+        await shared_cache.aset(LISTENING_KEY, True, LISTENER_TTL)
+    except Exception:
+        logger.warning('Could not mark the KPI socket as listening', exc_info=True)
+
+
+def listening():
+    """Whether any dashboard socket is open, re-checked every LISTENER_CHECK_INTERVAL."""
+    now = time.monotonic()
+    checked = _listening['checked']
+    if checked is None or now - checked >= LISTENER_CHECK_INTERVAL:
+        try:
+            value = bool(shared_cache.get(LISTENING_KEY))
+        except Exception:
+            # No cache, no presence: sockets still reseed on their own
+            logger.warning('Could not check for KPI listeners', exc_info=True)
+            value = False
+        _listening.update(value=value, checked=now)
+    return _listening['value']
+
+
+# ---- Deltas (sync, from signal handlers) ------------------------------------
+
+def publish(delta):
+    """Broadcast `delta` to open dashboards once the transaction commits."""
+    if 'categories' in delta:
+        delta['categories'] = {category_id: amount for category_id, amount in delta['categories'].items() if amount}
+    if any(delta.values()):
+        message = _encode(delta)
+        transaction.on_commit(lambda: _send(message))
+
+
+def _send(message):
+    try:
+        broadcast(KPI_GROUP, message, 'kpi.delta')
+    except Exception:
+        # The write is committed; the dashboard catches up on its next reseed
+        logger.warning('KPI delta broadcast failed', exc_info=True)
+
+
+def _encode(delta):
+    encoded = {}
+    for key, value in delta.items():
+        if key == 'categories':
+            value = {str(category_id): str(amount) for category_id, amount in value.items()}
+        elif isinstance(value, Decimal):
+            value = str(value)
+        encoded[key] = value
+    return encoded
+
+
+def order_delta(previous, status, total, order_id=None):
+    """
+    Delta for an order moving from `previous` ((status, total), or
+    (None, 0) for a new order) to `status` and `total`.
+
+    When an order starts or stops counting as a sale (cancelled or
+    restored) its lines move the category totals too; `order_id` is used
+    to read them.
+    """
+    old_status, old_total = previous
+    total, old_total = _decimal(total), _decimal(old_total)
+    was, now = counts_as_sale(old_status), counts_as_sale(status)
+    delta = {
+        'sales': (total if now else ZERO) - (old_total if was else ZERO),
+        'orders': int(now) - int(was),
+        'completed': int(status == Order.Status.COMPLETED) - int(old_status == Order.Status.COMPLETED),
+        'categories': {},
+    }
+    if was != now and order_id is not None:
+        sign = 1 if now else -1
+        rows = OrderLine.objects.filter(order_id=order_id).values('product__category_id').annotate(
+            total=Sum('total_price')
+        ).order_by()
+        delta['categories'] = {row['product__category_id']: sign * row['total'] for row in rows}
+    return delta
+
+
+def line_delta(previous, product_id, total):
+    """
+    Category delta for a line of a counted order moving from `previous`
+    ((product_id, total), or (product_id, 0) for a new line).
+    """
+    old_product_id, old_total = previous
+    product_categories = _product_categories()
+    categories = {}
+    for line_product_id, amount in ((old_product_id, -_decimal(old_total)), (product_id, _decimal(total))):
+        category_id = product_categories.get(line_product_id)
+        if category_id is not None:
+            categories[category_id] = categories.get(category_id, ZERO) + amount
+    return {'categories': categories}
+
+
+def publish_new_lines(lines):
+    """
+    Publish the category delta for lines inserted with bulk_create(), which
+    sends no post_save. The lines' order must count as a sale.
+    """
+    if not listening():
+        return
+    product_categories = _product_categories()
+    categories = {}
+    for line in lines:
+        category_id = product_categories.get(line.product_id)
+        if category_id is not None:
+            categories[category_id] = categories.get(category_id, ZERO) + _decimal(line.total_price)
+    publish({'categories': categories})
+
+
+def payment_delta(previous, status, amount):
+    """Delta for a payment moving from `previous` ((status, amount)) to `status`/`amount`."""
+    old_status, old_amount = previous
+    amount, old_amount = _decimal(amount), _decimal(old_amount)
+    completed = Payment.Status.COMPLETED
+    return {
+        'collected': (amount if status == completed else ZERO) - (old_amount if old_status == completed else ZERO),
+    }
+
+
+# ---- Aggregate (async, in the consumer) -------------------------------------
+
+class KPIAggregate:
+    """Running dashboard totals held by one admin socket."""
+
+    def __init__(self, sales, orders, completed, collected, categories):
+        self.sales = sales
+        self.orders = orders
+        self.completed = completed
+        self.collected = collected
+        self.categories = categories
+
+    @classmethod
+    async def aseed(cls):
+        """Read the current totals (three aggregate queries)."""
+        cancelled = Q(status=Order.Status.CANCELLED)
+        totals = await Order.objects.aaggregate(
+            sales=Sum('total_amount', filter=~cancelled),
+            orders=Count('id', filter=~cancelled),
+            completed=Count('id', filter=Q(status=Order.Status.COMPLETED)),
+        )
+        collected = await Payment.objects.filter(status=Payment.Status.COMPLETED).aaggregate(total=Sum('amount'))
+        categories = {
+            row['id']: row async for row in Category.objects.filter(is_active=True).annotate(
+                sales=Sum(
+                    'products__orderline__total_price',
+                    filter=~Q(products__orderline__order__status=Order.Status.CANCELLED)
+                )
+            ).values('id', 'name', 'color', 'sales')
+        }
+        for row in categories.values():
+            row['sales'] = row['sales'] or ZERO
+        return cls(
+            sales=totals['sales'] or ZERO,
+            orders=totals['orders'],
+            completed=totals['completed'],
+            collected=collected['total'] or ZERO,
+            categories=categories,
+        )
+
+    def apply(self, delta):
+        self.sales += Decimal(delta.get('sales', 0))
+        self.orders += delta.get('orders', 0)
+        self.completed += delta.get('completed', 0)
+        self.collected += Decimal(delta.get('collected', 0))
+        for category_id, amount in delta.get('categories', {}).items():
+            # Inactive categories are not shown; new ones appear on reseed
+            row = self.categories.get(int(category_id))
+            if row is not None:
+                row['sales'] += Decimal(amount)
+
+    def summary(self):
+        """Headline figures, in the shape of the dashboard stats summary."""
+        return {
+            'total_sales': float(self.sales),
+            'total_orders': self.orders,
+            'completed_orders': self.completed,
+            'avg_order_value': float(self.sales / self.orders) if self.orders > 0 else 0,
+            'collected': float(self.collected),
+        }
+
+    def as_dict(self):
+        breakdown = sorted(self.categories.values(), key=lambda row: row['sales'], reverse=True)
+        return {
+            'summary': self.summary(),
+            'category_breakdown': [
+                {'id': row['id'], 'name': row['name'], 'color': row['color'], 'sales': float(row['sales'])}
+                for row in breakdown
+            ],
+        }
@@ -0,0 +1,43 @@
+"""
+Query-plan regression check for the hot POS queries.
+
+Runs EXPLAIN on the dashboard, kitchen board, session lookup and payment
+querysets (apps.orders.query_plans) and fails when the planner stops using
+the composite index each one is meant to hit. The test suite runs the same
+check on its empty database; run this against a realistically sized one:
+
+    python manage.py check_query_plans
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.query_plans import hot_queries
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot POS queries and verify they use their composite indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full EXPLAIN output for every query.'
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+
+        for label, queryset, index_name in hot_queries():
+            plan = queryset.explain()
+            if options['verbose_plans']:
+                self.stdout.write(f"\n{label}:\n{plan}\n")
+
+            if index_name in plan:
+                self.stdout.write(self.style.SUCCESS(f"OK    {label} -> {index_name}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"MISS  {label} (expected {index_name})"))
+                failures.append(label)
+
+        if failures:
+            raise CommandError(
+                f"{len(failures)} hot queries are not using their index: {', '.join(failures)}"
+            )
@@ -0,0 +1,136 @@
+"""
+Built-in load generator and benchmark for the POS API.
+
+Creates a separate benchmark database (like the test runner: test_<NAME>,
+or benchmarks/posbench.sqlite3 on SQLite), seeds a realistic cafe and
+replays a concurrent mix of cashier order entry, QR ordering, kitchen
+status flips, payment verification and dashboard loads. Nothing touches
+the configured database.
+
+    python manage.py posbench
+    python manage.py posbench --concurrency 8 --operations 500 --save-baseline main
+    python manage.py posbench --keepdb --compare main
+"""
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.orders.benchmark import (
+    DEFAULT_MIX, bench_environment, build_context, compare, run_benchmark, summarize,
+)
+from apps.orders.synthetic import seed_cafe, synthetic_data_exists
+
+BENCH_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = 'Seed a benchmark database and measure POS API throughput, latency and queries per operation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Worker threads (default 4)')
+        parser.add_argument('--operations', type=int, default=200, help='Operations per worker (default 200)')
+        parser.add_argument('--mix', help='Operation weights, e.g. qr_order=5,dashboard=1')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for data and workload (default 42)')
+        parser.add_argument('--products', type=int, default=300)
+        parser.add_argument('--days', type=int, default=90, help='Days of order history (default 90)')
+        parser.add_argument('--orders-per-day', type=int, default=150)
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database and its data')
+        parser.add_argument('--save-baseline', metavar='NAME', help='Save results as benchmarks/baselines/NAME.json')
+        parser.add_argument('--compare', metavar='NAME', help='Compare against a saved baseline')
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def handle(self, *args, **options):
+        mix = self._parse_mix(options['mix'])
+        baseline = self._load_baseline(options['compare']) if options['compare'] else None
+
+        if connection.vendor == 'sqlite' and not connection.settings_dict['TEST'].get('NAME'):
+            # A file database so worker threads share it (in-memory would not)
+            BENCH_DIR.mkdir(exist_ok=True)
+            connection.settings_dict['TEST']['NAME'] = str(BENCH_DIR / 'posbench.sqlite3')
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            if not synthetic_data_exists():
+                self.stdout.write('Seeding benchmark cafe...')
+                seed_cafe(
+                    seed=options['seed'], products=options['products'], days=options['days'],
+                    orders_per_day=options['orders_per_day'], stdout=self.stdout,
+                )
+
+            with bench_environment():
+                context = build_context()
+                self.stdout.write(
+                    f"Running {options['operations']} operations x {options['concurrency']} workers..."
+                )
+                raw = run_benchmark(
+                    context, concurrency=options['concurrency'],
+                    operations=options['operations'], mix=mix, seed=options['seed'],
+                )
+            summary = summarize(raw)
+            summary['config'] = {
+                key: options[key] for key in ('concurrency', 'operations', 'seed', 'products', 'days', 'orders_per_day')
+            }
+            summary['config']['mix'] = mix
+            summary['config']['database'] = connection.vendor
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+        else:
+            self._report(summary, baseline)
+
+        if options['save_baseline']:
+            path = self._baseline_path(options['save_baseline'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(summary, indent=2))
+            self.stdout.write(self.style.SUCCESS(f'Baseline saved to {path}'))
+
+    def _parse_mix(self, value):
+        if not value:
+            return dict(DEFAULT_MIX)
+        mix = {}
+        for item in value.split(','):
+            name, _, weight = item.partition('=')
+            if name not in DEFAULT_MIX:
+                raise CommandError(f'Unknown operation {name!r}. Choices: {", ".join(DEFAULT_MIX)}')
+            try:
+                mix[name] = float(weight or 1)
+            except ValueError:
+                raise CommandError(f'Invalid weight for {name}: {weight!r}')
+        return mix
+
+    def _baseline_path(self, name):
+        return BENCH_DIR / 'baselines' / f'{name}.json'
+
+    def _load_baseline(self, name):
+        path = self._baseline_path(name)
+        if not path.exists():
+            raise CommandError(f'No baseline at {path}')
+        return json.loads(path.read_text())
+
+    def _report(self, summary, baseline):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'operation':<16}{'count':>7}{'err':>5}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+        )
+        for name, stats in summary['operations'].items():
+            line = (
+                f"{name:<16}{stats['count']:>7}{stats['errors']:>5}{stats['throughput']:>9}"
+                f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['mean_queries']:>9}"
+            )
+            self.stdout.write(self.style.ERROR(line) if stats['errors'] else line)
+            for error in stats['sample_errors']:
+                self.stdout.write(f'    {error}')
+        self.stdout.write(f"\nTotal: {summary['throughput']} ops/s over {summary['wall_seconds']}s")
+
+        if baseline:
+            self.stdout.write('\nChange vs baseline:')
+            for name, metric, before, after, change in compare(summary, baseline):
+                worse = change > 10 if metric != 'throughput' else change < -10
+                line = f'  {name:<16}{metric:<14}{before:>10} -> {after:<10} ({change:+.1f}%)'
+                self.stdout.write(self.style.WARNING(line) if worse else line)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0001_initial'),
+        ('orders', '0005_order_uuid'),
+        ('pos_sessions', '0004_floorsessionroute'),
+        ('tables', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('sent_to_kitchen', 'Sent to Kitchen'), ('prepared', 'Prepared'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], default='draft', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['session', 'status', 'created_at'], name='order_session_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderline',
+            index=models.Index(fields=['order', 'status'], name='orderline_order_status_idx'),
+        ),
+    ]
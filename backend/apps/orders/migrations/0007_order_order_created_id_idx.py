@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_alter_order_status_order_order_status_created_idx_and_more'),
+        ('pos_sessions', '0005_possession_session_cashier_status_idx_and_more'),
+        ('tables', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='order_created_id_idx'),
+        ),
+    ]
@@ -5,11 +5,15 @@ from apps.tables.models import Table
 from apps.sessions.models import POSSession
 from django.utils import timezone
 from decimal import Decimal
+from apps.core.tracing import get_tracer
+from apps.core.loaded_state import LoadedStateMixin
 import string
 import random
 import uuid
 
-class Order(models.Model):
+trace = get_tracer('orders')
+
+class Order(LoadedStateMixin, models.Model):
     """
     Main Order model.
     """
@@ -63,8 +67,19 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Diffed on save for the live dashboard KPIs (apps.orders.signals)
+    tracked_fields = ('status', 'total_amount')
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Dashboard totals/trend and the kitchen board (status IN ... ORDER BY created_at)
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            # Session totals and per-session order lists (newest first)
+            models.Index(fields=['session', 'status', 'created_at'], name='order_session_status_idx'),
+            # Keyset pagination over the full order history
+            models.Index(fields=['created_at', 'id'], name='order_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number} ({self.status})"
@@ -86,28 +101,25 @@ class Order(models.Model):
         """Recalculate order totals from lines."""
         # Force fresh queryset from database
         self.refresh_from_db()
-        lines = self.lines.all()
-        
-        print(f"🔧 CALCULATE_TOTALS - Order {self.order_number}")
-        print(f"   - Lines count: {lines.count()}")
-        for line in lines:
-            print(f"   - Line {line.id}: {line.product.name} qty={line.quantity} unit_price={line.unit_price} total={line.total_price} tax={line.tax_amount}")
+        lines = list(self.lines.all())
         
         subtotal = sum((line.total_price or Decimal('0')) for line in lines) or Decimal('0')
         tax = sum((line.tax_amount or Decimal('0')) for line in lines) or Decimal('0')
         discount = Decimal(self.discount_amount or 0)
-        
-        print(f"   - Calculated: subtotal={subtotal}, tax={tax}, discount={discount}, total={subtotal + tax - discount}")
 
         self.subtotal = subtotal
         self.tax_amount = tax
         self.total_amount = subtotal + tax - discount
-        self.save(update_fields=['subtotal', 'tax_amount', 'total_amount'])
-        print(f"   - Saved to DB: subtotal={self.subtotal}, tax={self.tax_amount}, total={self.total_amount}")
+        self.save(update_fields=['subtotal', 'tax_amount', 'total_amount', 'updated_at'])
+        trace.debug(
+            'Totals recalculated for %s', self.order_number,
+            lines=len(lines), subtotal=subtotal, tax=tax,
+            discount=discount, total=self.total_amount
+        )
 
 
 
-class OrderLine(models.Model):
+class OrderLine(LoadedStateMixin, models.Model):
     """
     Items within an order.
     """
@@ -138,13 +150,20 @@ class OrderLine(models.Model):
     
     notes = models.TextField(blank=True)
 
+    # Diffed on save for the live dashboard KPIs (apps.orders.signals)
+    tracked_fields = ('product_id', 'total_price')
+
     class Meta:
         ordering = ['id']
+        indexes = [
+            models.Index(fields=['order', 'status'], name='orderline_order_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
 
-    def save(self, *args, **kwargs):
+    def compute_amounts(self):
+        """Fill price/tax from the product when unset and compute line totals."""
         # Auto-fetch price/tax from product if not set or zero
         if not self.unit_price:
             self.unit_price = self.product.price
@@ -155,6 +174,9 @@ class OrderLine(models.Model):
         # Calculate total price and tax for this line
         self.total_price = self.unit_price * self.quantity
         self.tax_amount = (self.total_price * self.tax_rate) / 100
+
+    def save(self, *args, **kwargs):
+        self.compute_amounts()
         super().save(*args, **kwargs)
         # Refresh order totals
         self.order.calculate_totals()
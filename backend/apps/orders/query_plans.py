@@ -0,0 +1,69 @@
+"""
+Query-plan expectations for the hot POS queries.
+
+Each entry is built from the queryset the code actually runs (the
+dashboard helpers, the kitchen board's viewset queryset, the related
+lookups sessions and payments make), paired with the composite index it
+is meant to use. Checked by apps.orders.tests on every test run and, on a
+realistically sized database, by `manage.py check_query_plans`.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.kitchen.views import KitchenOrderViewSet
+from apps.payments.models import Payment
+from apps.sessions.models import POSSession
+
+from .dashboard import completed_orders, sales_orders_since
+from .models import Order, OrderLine
+
+
+def hot_queries():
+    """(label, queryset, expected index name) for each hot path."""
+    # Unsaved stand-ins: the related managers only need a primary key
+    session = POSSession(pk=1)
+    order = Order(pk=1)
+    return [
+        (
+            'Dashboard sales trend',
+            sales_orders_since(timezone.now() - timedelta(days=7)),
+            'order_status_created_idx',
+        ),
+        (
+            'Dashboard completed orders',
+            completed_orders(),
+            'order_status_created_idx',
+        ),
+        (
+            'Kitchen board',
+            KitchenOrderViewSet.queryset.all(),
+            'order_status_created_idx',
+        ),
+        (
+            'Session completed orders',
+            session.orders.filter(status=Order.Status.COMPLETED),
+            'order_session_status_idx',
+        ),
+        (
+            'Kitchen line status',
+            order.lines.filter(status=OrderLine.Status.PENDING),
+            'orderline_order_status_idx',
+        ),
+        (
+            'Current session (cashier)',
+            POSSession.objects.filter(cashier_id=1, status=POSSession.Status.OPEN),
+            'session_cashier_status_idx',
+        ),
+        (
+            'Current session (floor)',
+            POSSession.objects.filter(floor_id=1, status=POSSession.Status.OPEN),
+            'session_floor_status_idx',
+        ),
+        (
+            'Order payments',
+            order.payments.filter(status=Payment.Status.COMPLETED),
+            'payment_order_status_idx',
+        ),
+    ]
+
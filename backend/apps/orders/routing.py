@@ -0,0 +1,7 @@
+from django.urls import re_path
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(r'ws/orders/(?P<order_uuid>[0-9a-fA-F-]{32,36})/$', consumers.OrderTrackingConsumer.as_asgi()),
+    re_path(r'ws/dashboard/kpis/$', consumers.DashboardKPIConsumer.as_asgi()),
+]
@@ -12,6 +12,11 @@ class OrderLineSerializer(serializers.ModelSerializer):
             'tax_amount', 'total_price', 'notes', 'status'
         ]
         read_only_fields = ['tax_amount', 'total_price', 'status', 'product_name']
+        # ?expand= targets (apps.core.fieldsets)
+        expandable_fields = {
+            'product': 'apps.menu.serializers.ProductSerializer',
+            'variant': 'apps.menu.serializers.ProductVariantSerializer',
+        }
 
 class OrderSerializer(serializers.ModelSerializer):
     lines = OrderLineSerializer(many=True, read_only=True)
@@ -29,3 +34,7 @@ class OrderSerializer(serializers.ModelSerializer):
             'order_number', 'status', 'subtotal', 
             'tax_amount', 'total_amount', 'created_at'
         ]
+        expandable_fields = {
+            'table': 'apps.tables.serializers.TableSerializer',
+            'session': 'apps.sessions.serializers.POSSessionSerializer',
+        }
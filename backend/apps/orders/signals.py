@@ -0,0 +1,81 @@
+"""
+Signal handlers that keep dashboard figures in sync: the cached dashboard
+payloads (invalidated) and the live KPI sockets (sent deltas, see kpi.py).
+
+Deltas are worked out only while a dashboard is listening. The previous
+values come from the models' loaded state (apps.core.loaded_state), noted
+again after every save so repeated saves of one instance diff correctly.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.payments.models import Payment
+from . import kpi
+from .dashboard import invalidate_dashboard
+from .models import Order, OrderLine
+
+# Saves in these statuses move the headline figures; other order saves
+# (drafts, line edits) are left to the dashboard's short cache timeout.
+DASHBOARD_STATUSES = {Order.Status.COMPLETED, Order.Status.CANCELLED}
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created, **kwargs):
+    """Order completion and cancellation; totals for the live KPIs."""
+    if instance.status in DASHBOARD_STATUSES:
+        # After commit, so a rebuild cannot cache the pre-commit figures
+        transaction.on_commit(invalidate_dashboard)
+
+    previous = (None, 0) if created else instance.loaded_state
+    if previous is not None and kpi.listening():
+        kpi.publish(kpi.order_delta(previous, instance.status, instance.total_amount, instance.pk))
+    instance.remember_state()
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_dashboard)
+    # Category totals follow from the cascaded line deletes
+    if kpi.listening():
+        kpi.publish(kpi.order_delta((instance.status, instance.total_amount), None, 0))
+
+
+def _line_counts(line):
+    try:
+        return kpi.counts_as_sale(line.order.status)
+    except Order.DoesNotExist:
+        # Deleted along with its order
+        return False
+
+
+@receiver(post_save, sender=OrderLine)
+def line_saved(sender, instance, created, **kwargs):
+    """Line subtotals move the live category totals."""
+    previous = (instance.product_id, 0) if created else instance.loaded_state
+    if previous is not None and kpi.listening() and _line_counts(instance):
+        kpi.publish(kpi.line_delta(previous, instance.product_id, instance.total_price))
+    instance.remember_state()
+
+
+@receiver(post_delete, sender=OrderLine)
+def line_deleted(sender, instance, **kwargs):
+    if kpi.listening() and _line_counts(instance):
+        kpi.publish(kpi.line_delta((instance.product_id, instance.total_price), instance.product_id, 0))
+
+
+@receiver(post_save, sender=Payment)
+def payment_saved(sender, instance, created, **kwargs):
+    """Payments recorded at the counter or verified online."""
+    transaction.on_commit(invalidate_dashboard)
+    previous = (None, 0) if created else instance.loaded_state
+    if previous is not None and kpi.listening():
+        kpi.publish(kpi.payment_delta(previous, instance.status, instance.amount))
+    instance.remember_state()
+
+
+@receiver(post_delete, sender=Payment)
+def payment_deleted(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_dashboard)
+    if kpi.listening():
+        kpi.publish(kpi.payment_delta((instance.status, instance.amount), None, 0))
@@ -0,0 +1,425 @@
+"""
+Deterministic synthetic cafe data at configurable scale.
+
+Rows are written with bulk_create in batches, bypassing the per-row save()
+side effects (order totals, session routing, payment status checks), and
+with primary keys assigned up front so lines and payments can reference
+their orders on every backend (MySQL does not return ids from
+bulk_create). Order history is generated one day at a time, each day in
+its own transaction, so memory stays flat up to tens of millions of lines.
+The same seed and options always produce the same data.
+
+    generator = SyntheticDataGenerator(seed=7, **SCALES['large'])
+    generator.run()
+"""
+import random
+import time as clock
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.menu.models import Category, Product, ProductVariant
+from apps.payments.models import Payment, PaymentMethod
+from apps.sessions.models import FloorSessionRoute, POSSession
+from apps.tables.models import Floor, Table
+from .models import Order, OrderLine
+
+SYNTHETIC_EMAIL_DOMAIN = 'synthetic.local'
+SYNTHETIC_PREFIX = 'Synthetic '
+SYNTHETIC_PASSWORD = 'posbench'
+
+# Approximate volumes: lines ~= days * orders_per_day * 2.3
+SCALES = {
+    'small': {'days': 30, 'orders_per_day': 100, 'products': 120, 'cashiers': 2},
+    'medium': {'days': 180, 'orders_per_day': 400, 'products': 300, 'cashiers': 4},
+    'large': {'days': 730, 'orders_per_day': 1500, 'products': 800, 'cashiers': 8,
+              'floors': 4, 'tables_per_floor': 25},
+    'xl': {'days': 1825, 'orders_per_day': 5000, 'products': 2000, 'cashiers': 16,
+           'floors': 8, 'tables_per_floor': 40},
+}
+
+CATEGORY_NAMES = [
+    'Coffee', 'Tea', 'Cold Drinks', 'Shakes', 'Breakfast', 'Sandwiches',
+    'Wraps', 'Salads', 'Pasta', 'Pizza', 'Burgers', 'Desserts', 'Bakery',
+    'Sides', 'Specials',
+]
+CATEGORY_COLORS = ['#6F4E37', '#8BC34A', '#03A9F4', '#E91E63', '#FF9800', '#795548', '#9C27B0', '#F44336']
+NAME_WORDS = [
+    'Classic', 'House', 'Masala', 'Smoked', 'Spicy', 'Honey', 'Garden',
+    'Double', 'Iced', 'Hazelnut', 'Paneer', 'Chicken', 'Mushroom', 'Truffle',
+    'Caramel', 'Mint', 'Mango', 'Peri Peri', 'Cheese', 'Chocolate',
+]
+VARIANT_SETS = [
+    ('Size', ['Small', 'Regular', 'Large'], [Decimal('0'), Decimal('30'), Decimal('60')]),
+    ('Milk', ['Dairy', 'Oat', 'Almond'], [Decimal('0'), Decimal('40'), Decimal('40')]),
+    ('Pack', ['Single', 'Pack of 2'], [Decimal('0'), Decimal('90')]),
+]
+TAX_RATES = [Decimal('5.00'), Decimal('5.00'), Decimal('5.00'), Decimal('12.00'), Decimal('18.00')]
+PAYMENT_METHODS = [
+    ('Cash', 'cash', PaymentMethod.MethodType.CASH, 35),
+    ('Card', 'card', PaymentMethod.MethodType.CARD, 25),
+    ('UPI', 'upi', PaymentMethod.MethodType.DIGITAL, 40),
+]
+
+# Relative order volume per local hour. Weekdays have a sharp lunch peak;
+# weekends a late-morning brunch and a longer evening
+WEEKDAY_HOURS = {
+    8: 4, 9: 6, 10: 5, 11: 6, 12: 12, 13: 14, 14: 9, 15: 5,
+    16: 5, 17: 7, 18: 9, 19: 11, 20: 10, 21: 6, 22: 2,
+}
+WEEKEND_HOURS = {
+    8: 2, 9: 4, 10: 8, 11: 11, 12: 12, 13: 12, 14: 10, 15: 7,
+    16: 7, 17: 8, 18: 10, 19: 12, 20: 12, 21: 9, 22: 4,
+}
+# Mon..Sun volume multipliers
+WEEKDAY_VOLUME = [0.85, 0.85, 0.9, 0.95, 1.15, 1.35, 1.25]
+
+# Items per order: mostly one to three; meal times skew larger
+BASKET_SIZES = [1, 2, 3, 4, 5, 6, 8]
+BASKET_WEIGHTS = [30, 28, 18, 10, 7, 4, 3]
+MEAL_BASKET_WEIGHTS = [20, 26, 20, 14, 10, 6, 4]
+MEAL_HOURS = {12, 13, 19, 20}
+QUANTITY_WEIGHTS = [80, 15, 5]  # quantity 1, 2, 3 per line
+
+# Outcome of historical orders
+HISTORY_STATUSES = [Order.Status.COMPLETED, Order.Status.CANCELLED, Order.Status.DRAFT]
+HISTORY_STATUS_WEIGHTS = [94, 4, 2]
+LIVE_STATUSES = [Order.Status.DRAFT, Order.Status.SENT_TO_KITCHEN, Order.Status.PREPARED, Order.Status.COMPLETED]
+
+
+@contextmanager
+def backdated(*models):
+    """Let bulk_create keep explicit created_at/updated_at values."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _next_id(model):
+    return (model.objects.aggregate(top=Max('id'))['top'] or 0) + 1
+
+
+def synthetic_data_exists():
+    return User.objects.filter(email__endswith='@' + SYNTHETIC_EMAIL_DOMAIN).exists()
+
+
+def delete_synthetic_data():
+    """Remove everything a previous run created, children first so each delete stays a single query."""
+    orders = Order.objects.filter(order_number__startswith='SYN-')
+    with transaction.atomic():
+        Payment.objects.filter(order__in=orders).delete()
+        OrderLine.objects.filter(order__in=orders).delete()
+        orders.delete()
+        FloorSessionRoute.objects.filter(floor__name__startswith=SYNTHETIC_PREFIX).delete()
+        POSSession.objects.filter(session_number__startswith='SYN-').delete()
+        User.objects.filter(email__endswith='@' + SYNTHETIC_EMAIL_DOMAIN).delete()
+        Table.objects.filter(floor__name__startswith=SYNTHETIC_PREFIX).delete()
+        Floor.objects.filter(name__startswith=SYNTHETIC_PREFIX).delete()
+        Category.objects.filter(name__startswith=SYNTHETIC_PREFIX).delete()
+
+
+class SyntheticDataGenerator:
+    """
+    Generate floors, tables, staff, menu and order history.
+
+    Staff log in with SYNTHETIC_PASSWORD. Each cashier gets one session per
+    day; today's sessions stay open (and are routed to their floors) so the
+    live endpoints have somewhere to send orders. Session totals are filled
+    in, since update_totals() never runs for bulk inserted rows.
+    """
+
+    def __init__(self, seed=42, floors=2, tables_per_floor=12, categories=15, products=300,
+                 variant_share=0.33, cashiers=4, kitchen_staff=2, days=90, orders_per_day=150,
+                 qr_share=0.4, growth=0.0, batch_size=5000, stdout=None):
+        self.rng = random.Random(seed)
+        self.floors = floors
+        self.tables_per_floor = tables_per_floor
+        self.categories = categories
+        self.products = products
+        self.variant_share = variant_share
+        self.cashiers = cashiers
+        self.kitchen_staff = kitchen_staff
+        self.days = days
+        self.orders_per_day = orders_per_day
+        self.qr_share = qr_share
+        self.growth = growth
+        self.batch_size = batch_size
+        self.log = stdout.write if stdout else (lambda message: None)
+        self.counts = {'orders': 0, 'lines': 0, 'payments': 0, 'sessions': 0}
+
+    def run(self):
+        """Generate everything; returns row counts."""
+        started = clock.perf_counter()
+        with transaction.atomic():
+            self.create_layout()
+            self.create_staff()
+            self.create_menu()
+            self.create_payment_methods()
+        self.create_history()
+        self.counts['seconds'] = round(clock.perf_counter() - started, 1)
+        return self.counts
+
+    # ---- Reference data --------------------------------------------------
+
+    def create_layout(self):
+        Floor.objects.bulk_create([
+            Floor(name=f'{SYNTHETIC_PREFIX}Floor {i + 1}', number=100 + i)
+            for i in range(self.floors)
+        ], batch_size=self.batch_size)
+        self.floor_rows = list(Floor.objects.filter(name__startswith=SYNTHETIC_PREFIX).order_by('number'))
+
+        Table.objects.bulk_create([
+            Table(
+                floor=floor,
+                table_number=f'S{floor.number}-{t + 1:02d}',
+                capacity=self.rng.choice([2, 2, 4, 4, 6]),
+                token=str(uuid.UUID(int=self.rng.getrandbits(128))),
+            )
+            for floor in self.floor_rows for t in range(self.tables_per_floor)
+        ], batch_size=self.batch_size)
+        self.table_ids = list(
+            Table.objects.filter(floor__in=self.floor_rows).order_by('id').values_list('id', flat=True)
+        )
+        self.log(f"Layout: {len(self.floor_rows)} floors, {len(self.table_ids)} tables\n")
+
+    def create_staff(self):
+        template = User()
+        template.set_password(SYNTHETIC_PASSWORD)
+        staff = [('admin', User.Role.ADMIN, 0)]
+        staff += [('kitchen', User.Role.KITCHEN, i) for i in range(self.kitchen_staff)]
+        staff += [('cashier', User.Role.CASHIER, i) for i in range(self.cashiers)]
+        User.objects.bulk_create([
+            User(
+                email=f'{prefix}{index}@{SYNTHETIC_EMAIL_DOMAIN}',
+                first_name=prefix.title(), last_name=str(index),
+                role=role, is_staff=role == User.Role.ADMIN, password=template.password,
+                employee_code=None if role == User.Role.ADMIN else f'SYN-{number:04d}',
+            )
+            for number, (prefix, role, index) in enumerate(staff, start=1)
+        ], batch_size=self.batch_size)
+        self.cashier_ids = list(
+            User.objects.filter(email__endswith='@' + SYNTHETIC_EMAIL_DOMAIN, role=User.Role.CASHIER)
+            .order_by('email').values_list('id', flat=True)
+        )
+        self.log(f"Staff: {len(staff)} users (password '{SYNTHETIC_PASSWORD}')\n")
+
+    def create_menu(self):
+        names = [
+            CATEGORY_NAMES[i % len(CATEGORY_NAMES)] + (f' {i // len(CATEGORY_NAMES) + 1}' if i >= len(CATEGORY_NAMES) else '')
+            for i in range(self.categories)
+        ]
+        Category.objects.bulk_create([
+            Category(name=f'{SYNTHETIC_PREFIX}{name}', color=CATEGORY_COLORS[i % len(CATEGORY_COLORS)], sequence=i)
+            for i, name in enumerate(names)
+        ], batch_size=self.batch_size)
+        categories = list(Category.objects.filter(name__startswith=SYNTHETIC_PREFIX).order_by('sequence'))
+
+        product_id = _next_id(Product)
+        variant_id = _next_id(ProductVariant)
+        products, variants = [], []
+        self.menu = []  # (product_id, price, tax_rate, [(variant_id, extra_price)])
+        for i in range(self.products):
+            category = categories[i % len(categories)]
+            price = Decimal(self.rng.randrange(60, 600, 10))
+            tax_rate = self.rng.choice(TAX_RATES)
+            has_variants = self.rng.random() < self.variant_share
+            products.append(Product(
+                id=product_id, category=category,
+                name=f'{self.rng.choice(NAME_WORDS)} {category.name[len(SYNTHETIC_PREFIX):]} {i + 1}',
+                price=price, tax_rate=tax_rate, has_variants=has_variants,
+            ))
+            options = []
+            if has_variants:
+                attribute, values, extras = self.rng.choice(VARIANT_SETS)
+                for value, extra in zip(values, extras):
+                    variants.append(ProductVariant(
+                        id=variant_id, product_id=product_id,
+                        attribute=attribute, value=value, extra_price=extra,
+                    ))
+                    options.append((variant_id, extra))
+                    variant_id += 1
+            self.menu.append((product_id, price, tax_rate, options))
+            product_id += 1
+
+        Product.objects.bulk_create(products, batch_size=self.batch_size)
+        ProductVariant.objects.bulk_create(variants, batch_size=self.batch_size)
+
+        # Popularity follows a long tail: a few best sellers, many rarely ordered
+        self.menu_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(self.menu))]
+        self.rng.shuffle(self.menu_weights)
+        self.log(f"Menu: {len(categories)} categories, {len(products)} products, {len(variants)} variants\n")
+
+    def create_payment_methods(self):
+        for name, code, method_type, _ in PAYMENT_METHODS:
+            PaymentMethod.objects.get_or_create(code=code, defaults={'name': name, 'type': method_type})
+        PaymentMethod.objects.get_or_create(
+            code='razorpay',
+            defaults={'name': 'Razorpay Online', 'type': PaymentMethod.MethodType.DIGITAL},
+        )
+        by_code = dict(PaymentMethod.objects.values_list('code', 'id'))
+        self.counter_methods = [by_code[code] for _, code, _, _ in PAYMENT_METHODS]
+        self.counter_method_weights = [weight for *_, weight in PAYMENT_METHODS]
+        self.razorpay_method = by_code['razorpay']
+
+    # ---- Order history ---------------------------------------------------
+
+    def create_history(self):
+        self.session_id = _next_id(POSSession)
+        self.order_id = _next_id(Order)
+        self.payment_id = _next_id(Payment)
+        self.now = timezone.now()
+        self.tz = timezone.get_current_timezone()
+        today = timezone.localdate()
+        last_report = clock.perf_counter()
+
+        with backdated(Order):
+            for day_offset in range(self.days, -1, -1):
+                with transaction.atomic():
+                    self.create_day(today - timedelta(days=day_offset), is_today=day_offset == 0,
+                                    progress=1 - day_offset / max(self.days, 1))
+                if clock.perf_counter() - last_report > 5 or day_offset == 0:
+                    last_report = clock.perf_counter()
+                    self.log(
+                        f"  {today - timedelta(days=day_offset)}: {self.counts['orders']} orders, "
+                        f"{self.counts['lines']} lines, {self.counts['payments']} payments\n"
+                    )
+
+    def create_day(self, day, is_today, progress):
+        rng = self.rng
+        opened = timezone.make_aware(datetime.combine(day, time(7, 30)), self.tz)
+        sessions = []
+        for index, cashier_id in enumerate(self.cashier_ids):
+            floor = self.floor_rows[index] if index < len(self.floor_rows) else None
+            sessions.append(POSSession(
+                id=self.session_id, cashier_id=cashier_id, floor=floor,
+                start_time=opened,
+                end_time=None if is_today else opened + timedelta(hours=15),
+                status=POSSession.Status.OPEN if is_today else POSSession.Status.CLOSED,
+                session_number=f'SYN-{self.session_id:08d}',
+            ))
+            self.session_id += 1
+
+        weekend = day.weekday() >= 5
+        hours = WEEKEND_HOURS if weekend else WEEKDAY_HOURS
+        hour_list, hour_weights = list(hours), list(hours.values())
+        mean = self.orders_per_day * WEEKDAY_VOLUME[day.weekday()] * (1 + self.growth * progress)
+        count = max(0, int(rng.gauss(mean, mean ** 0.5)))
+
+        orders, lines, payments = [], [], []
+        for _ in range(count):
+            hour = rng.choices(hour_list, weights=hour_weights)[0]
+            created = timezone.make_aware(
+                datetime.combine(day, time(hour, rng.randrange(60), rng.randrange(60))), self.tz
+            )
+            if created > self.now:
+                continue
+            order, order_lines, payment = self.build_order(sessions, created, hour, is_today)
+            orders.append(order)
+            lines.extend(order_lines)
+            if payment:
+                payments.append(payment)
+
+        # Closed sessions carry their totals, as update_totals() would leave them
+        totals = {}
+        for order in orders:
+            if order.status == Order.Status.COMPLETED:
+                count_, sales = totals.get(order.session_id, (0, Decimal('0')))
+                totals[order.session_id] = (count_ + 1, sales + order.total_amount)
+        for session in sessions:
+            session.total_orders, session.total_sales = totals.get(session.id, (0, Decimal('0')))
+
+        POSSession.objects.bulk_create(sessions, batch_size=self.batch_size)
+        if is_today:
+            FloorSessionRoute.objects.bulk_create([
+                FloorSessionRoute(floor_id=s.floor_id, session_id=s.id) for s in sessions if s.floor_id
+            ])
+        Order.objects.bulk_create(orders, batch_size=self.batch_size)
+        OrderLine.objects.bulk_create(lines, batch_size=self.batch_size)
+        Payment.objects.bulk_create(payments, batch_size=self.batch_size)
+
+        self.counts['sessions'] += len(sessions)
+        self.counts['orders'] += len(orders)
+        self.counts['lines'] += len(lines)
+        self.counts['payments'] += len(payments)
+
+    def build_order(self, sessions, created, hour, is_today):
+        rng = self.rng
+        order_id = self.order_id
+        self.order_id += 1
+
+        qr = rng.random() < self.qr_share
+        dine_in = qr or rng.random() < 0.6
+        if is_today:
+            status = rng.choice(LIVE_STATUSES)
+        else:
+            status = rng.choices(HISTORY_STATUSES, weights=HISTORY_STATUS_WEIGHTS)[0]
+
+        basket = rng.choices(BASKET_SIZES, weights=MEAL_BASKET_WEIGHTS if hour in MEAL_HOURS else BASKET_WEIGHTS)[0]
+        lines = []
+        subtotal = tax = Decimal('0')
+        for product_id, price, tax_rate, options in rng.choices(self.menu, weights=self.menu_weights, k=basket):
+            variant_id = None
+            if options:
+                variant_id, extra = rng.choice(options)
+                price += extra
+            quantity = rng.choices([1, 2, 3], weights=QUANTITY_WEIGHTS)[0]
+            total = price * quantity
+            line_tax = (total * tax_rate / 100).quantize(Decimal('0.01'))
+            subtotal += total
+            tax += line_tax
+            lines.append(OrderLine(
+                order_id=order_id, product_id=product_id, variant_id=variant_id,
+                quantity=quantity, unit_price=price, tax_rate=tax_rate,
+                total_price=total, tax_amount=line_tax,
+                status=OrderLine.Status.READY if status == Order.Status.COMPLETED else OrderLine.Status.PENDING,
+            ))
+
+        total_amount = subtotal + tax
+        order = Order(
+            id=order_id,
+            order_number=f'SYN-{order_id:010d}',
+            session_id=rng.choice(sessions).id,
+            table_id=rng.choice(self.table_ids) if dine_in else None,
+            order_type=Order.OrderType.DINE_IN if dine_in else Order.OrderType.TAKEAWAY,
+            status=status,
+            subtotal=subtotal, tax_amount=tax, total_amount=total_amount,
+            created_at=created, updated_at=created,
+        )
+
+        payment = None
+        if status == Order.Status.COMPLETED:
+            paid_at = created + timedelta(minutes=rng.randrange(5, 60))
+            if qr:
+                order.razorpay_order_id = f'order_SYN{order_id}'
+                order.razorpay_payment_id = f'pay_SYN{order_id}'
+                payment = Payment(
+                    order_id=order_id, payment_method_id=self.razorpay_method, amount=total_amount,
+                    transaction_id=order.razorpay_payment_id, paid_at=paid_at,
+                )
+            else:
+                payment = Payment(
+                    order_id=order_id,
+                    payment_method_id=rng.choices(self.counter_methods, weights=self.counter_method_weights)[0],
+                    amount=total_amount, paid_at=paid_at,
+                )
+        return order, lines, payment
+
+
+def seed_cafe(seed=42, stdout=None, **options):
+    """Seed the posbench cafe (see SyntheticDataGenerator for options)."""
+    return SyntheticDataGenerator(seed=seed, stdout=stdout, **options).run()
@@ -0,0 +1,222 @@
+import hashlib
+import hmac
+import warnings
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import User
+from apps.core import streaming
+from apps.core.tests import CompiledParityMixin, asgi_get
+from apps.menu.models import Category, Product, ProductVariant
+from apps.sessions.models import POSSession
+from apps.tables.models import Floor, Table
+
+from . import export
+from .export import EXPORT_FORMATS
+from .models import Order, OrderLine
+from .query_plans import hot_queries
+from .serializers import OrderSerializer
+
+
+class QueryPlanTests(TestCase):
+    """The hot queries keep using their composite indexes (apps.orders.query_plans)."""
+
+    def test_hot_queries_use_their_indexes(self):
+        for label, queryset, index_name in hot_queries():
+            with self.subTest(label):
+                self.assertIn(index_name, queryset.explain())
+
+
+class CompiledParityTests(CompiledParityMixin, TestCase):
+    """Compiled list rows (apps.core.compiled) match OrderSerializer(order).data."""
+    serializer_class = OrderSerializer
+    path = '/api/orders/'
+    sparse_fields = 'id,status,table_number,lines.product_name,lines.total_price'
+    expanded_fields = 'id,table,lines.variant,lines.product'
+    expand = 'table,lines.variant,lines.product'
+
+    @classmethod
+    def setUpTestData(cls):
+        cashier = User.objects.create_user('cashier@test.local', 'pw123456', role='cashier')
+        floor = Floor.objects.create(name='Ground', number=0)
+        table = Table.objects.create(floor=floor, table_number='T-1')
+        category = Category.objects.create(name='Drinks')
+        latte = Product.objects.create(category=category, name='Latte', price=Decimal('100'), tax_rate=Decimal('5.00'))
+        tea = Product.objects.create(category=category, name='Tea', price=Decimal('40'), tax_rate=Decimal('0.00'))
+        large = ProductVariant.objects.create(product=latte, attribute='Size', value='Large', extra_price=Decimal('10'))
+        session = POSSession.objects.create(cashier=cashier, floor=floor)
+
+        Order.objects.create(session=session)  # no table, no lines
+        order = Order.objects.create(session=session, table=table, customer_name='Zoë', notes='window')
+        OrderLine.objects.create(order=order, product=latte, variant=large, quantity=2, notes='oat milk')
+        OrderLine.objects.create(order=order, product=tea)
+        order.calculate_totals()
+
+
+class OrderListViewTests(TestCase):
+    """GET /api/orders/ served from compiled rows, keyset pages and ?fields= / ?search=."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin@test.local', 'pw123456', role='admin')
+        cashier = User.objects.create_user('cashier@test.local', 'pw123456', role='cashier')
+        session = POSSession.objects.create(cashier=cashier)
+        category = Category.objects.create(name='Drinks')
+        tea = Product.objects.create(category=category, name='Tea', price=Decimal('40'), tax_rate=Decimal('0.00'))
+        for name in ['Asha', 'Ben', 'Chen', 'Dev', 'Esi']:
+            order = Order.objects.create(session=session, customer_name=name)
+            OrderLine.objects.create(order=order, product=tea)
+        cls.newest_first = list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        token = RefreshToken.for_user(self.admin).access_token
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+    def test_keyset_pages_with_sparse_fields(self):
+        seen = []
+        url = '/api/orders/?page_size=2&fields=id,customer_name,lines.product_name'
+        while url:
+            data = self.client.get(url).json()['data']
+            for row in data['orders']:
+                self.assertEqual(set(row), {'id', 'customer_name', 'lines'})
+                self.assertEqual(row['lines'], [{'product_name': 'Tea'}])
+            seen += [row['id'] for row in data['orders']]
+            url = data['next']
+
+        self.assertEqual(seen, self.newest_first)
+
+    def test_previous_page(self):
+        first = self.client.get('/api/orders/?page_size=2&fields=id').json()['data']
+        second = self.client.get(first['next']).json()['data']
+        back = self.client.get(second['previous']).json()['data']
+
+        self.assertEqual([row['id'] for row in second['orders']], self.newest_first[2:4])
+        self.assertEqual(back['orders'], first['orders'])
+
+    def test_search_with_fields(self):
+        data = self.client.get('/api/orders/?search=chen&fields=id,customer_name&count=exact').json()['data']
+
+        self.assertEqual(data['orders'], [{'id': self.newest_first[2], 'customer_name': 'Chen'}])
+        self.assertEqual(data['count'], 1)
+        self.assertIsNone(data['next'])
+
+
+class ConditionalGetTests(TestCase):
+    """ETags for the order list and detail (apps.core.conditional)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cashier = User.objects.create_user('cashier@test.local', 'pw123456', role='cashier')
+        floor = Floor.objects.create(name='Ground', number=0)
+        session = POSSession.objects.create(cashier=cls.cashier, floor=floor)
+        cls.orders = [Order.objects.create(session=session) for _ in range(3)]
+        cls.kitchen = User.objects.create_user('kitchen@test.local', 'pw123456', role='kitchen')
+        category = Category.objects.create(name='Drinks')
+        cls.tea = Product.objects.create(category=category, name='Tea', price=Decimal('40'), tax_rate=Decimal('0.00'))
+
+    def setUp(self):
+        token = RefreshToken.for_user(self.cashier).access_token
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+    def assertNotModified(self, url, etag):
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    @override_settings(RAZORPAY_KEY_SECRET='test-secret')
+    @mock.patch('apps.payments.views.razorpay.Client', side_effect=ConnectionError)
+    def test_detail_etag_changes_when_payment_verified(self, client):
+        order = self.orders[0]
+        order.razorpay_order_id = 'order_test'
+        order.save()
+        url = f'/api/orders/{order.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, etag)
+
+        signature = hmac.new(b'test-secret', b'order_test|pay_test', hashlib.sha256).hexdigest()
+        response = self.client.post('/api/payments/verify/', {
+            'razorpay_order_id': 'order_test', 'razorpay_payment_id': 'pay_test', 'razorpay_signature': signature,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.assertModified(url, etag)
+        self.assertEqual(response.json()['data']['status'], Order.Status.SENT_TO_KITCHEN)
+
+    def test_etags_change_when_kitchen_updates_lines(self):
+        order = self.orders[1]
+        OrderLine.objects.create(order=order, product=self.tea)
+        Order.objects.filter(pk=order.pk).update(status=Order.Status.SENT_TO_KITCHEN)
+        detail, listing = f'/api/orders/{order.id}/', '/api/orders/'
+        etags = {url: self.client.get(url)['ETag'] for url in (detail, listing)}
+
+        kitchen_token = RefreshToken.for_user(self.kitchen).access_token
+        response = self.client.patch(
+            f'/api/kitchen/orders/{order.id}/update-status/', {'status': 'ready', 'update_all': True},
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {kitchen_token}',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        for url, etag in etags.items():
+            with self.subTest(url):
+                response = self.assertModified(url, etag)
+        self.assertEqual([line['status'] for line in response.json()['data']['orders'][1]['lines']], ['ready'])
+
+    def test_invalid_id_is_not_found(self):
+        response = self.client.get('/api/orders/abc/')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_etag_covers_only_the_page(self):
+        etag = self.client.get('/api/orders/?page_size=2')['ETag']
+        oldest = Order.objects.get(pk=self.orders[0].pk)
+        oldest.notes = 'off the page'
+        oldest.save()
+
+        response = self.client.get('/api/orders/?page_size=2', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        newest = Order.objects.get(pk=self.orders[-1].pk)
+        newest.notes = 'on the page'
+        newest.save()
+
+        response = self.client.get('/api/orders/?page_size=2', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class OrderExportTests(TransactionTestCase):
+    """GET /api/orders/export/ streams under ASGI (apps.core.streaming)."""
+
+    def setUp(self):
+        admin = User.objects.create_user('admin@test.local', 'pw123456', role='admin')
+        self.token = str(RefreshToken.for_user(admin).access_token)
+        floor = Floor.objects.create(name='Ground', number=0)
+        category = Category.objects.create(name='Drinks')
+        product = Product.objects.create(category=category, name='Latte', price=Decimal('100'), tax_rate=Decimal('5.00'))
+        session = POSSession.objects.create(cashier=admin, floor=floor)
+        for _ in range(6):
+            OrderLine.objects.create(order=Order.objects.create(session=session), product=product)
+
+    def test_export_streams_through_the_asgi_handler(self):
+        for fmt in EXPORT_FORMATS:
+            with self.subTest(fmt):
+                with mock.patch.object(export, 'EXPORT_CHUNK_SIZE', 2), \
+                        mock.patch.object(streaming, 'STREAM_BATCH_ROWS', 2), \
+                        warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter('always')
+                    status, parts = async_to_sync(asgi_get)('/api/orders/export/', f'fmt={fmt}', self.token)
+
+                self.assertEqual(status, 200)
+                # Sent batch by batch, not collected with sync_to_async(list)
+                self.assertGreater(len(parts), 2)
+                self.assertFalse([w for w in caught if 'synchronous iterators' in str(w.message)])
+
+                response = self.client.get(f'/api/orders/export/?fmt={fmt}', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+                self.assertEqual(b''.join(parts), b''.join(response.streaming_content))
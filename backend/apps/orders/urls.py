@@ -8,8 +8,9 @@ router = DefaultRouter()
 router.register(r'', views.OrderViewSet)
 
 urlpatterns = [
-    path('qr/info/', views.QRInfoView.as_view(), name='qr_info'),
+    path('qr/info/', views.qr_info, name='qr_info'),
     path('qr/', views.QROrderView.as_view(), name='qr_order'),
+    path('track/<uuid:order_uuid>/', views.track_order, name='track_order'),
     
     # Dashboard stats (Admin only)
     path('dashboard/stats/', dashboard.DashboardStatsView.as_view(), name='dashboard_stats'),
@@ -6,17 +6,29 @@ import uuid
 
 logger = logging.getLogger(__name__)
 from rest_framework.response import Response
+from django.db import transaction
 from django.utils import timezone
-from apps.core.responses import APIResponse
+from django.views.decorators.http import require_GET
+from apps.core.responses import APIResponse, AsyncAPIResponse
+from apps.core.tracing import get_tracer
+from apps.core.broadcast import broadcast_order
+from apps.core import metrics
+from apps.core.pagination import KeysetPagination
+from apps.core.compiled import CompiledReadMixin
+from apps.core.conditional import ConditionalGetMixin
+from . import kpi
 from .models import Order, OrderLine
 from .serializers import OrderSerializer, OrderLineSerializer
 from apps.sessions.models import POSSession
 
-class OrderViewSet(viewsets.ModelViewSet):
+trace = get_tracer('orders')
+qr_trace = get_tracer('qr')
+
+class OrderViewSet(ConditionalGetMixin, CompiledReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for orders.
     """
-    queryset = Order.objects.all().prefetch_related('lines', 'lines__product', 'lines__variant')
+    queryset = Order.objects.select_related('table').prefetch_related('lines', 'lines__product', 'lines__variant')
     serializer_class = OrderSerializer
     lookup_field = 'id'  # Changed from 'uuid' to 'id' to accept numeric IDs from frontend
     permission_classes = [permissions.IsAuthenticated]
@@ -24,6 +36,11 @@ class OrderViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'order_type', 'session', 'table']
     search_fields = ['order_number', 'customer_name', 'customer_phone']
     ordering_fields = ['created_at', 'total_amount']
+    ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    sparse_keep = ['order_number']  # retrieve message
+    # Line edits bump the order's updated_at (calculate_totals, kitchen)
+    conditional_timestamps = ('updated_at', 'table__updated_at')
 
     def get_queryset(self):
         """
@@ -47,9 +64,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             return APIResponse.success(
                 data={
                     'orders': serializer.data,
-                    'count': self.paginator.page.paginator.count,
-                    'next': self.paginator.get_next_link(),
-                    'previous': self.paginator.get_previous_link()
+                    **self.paginator.get_page_metadata()
                 },
                 message="Orders retrieved successfully"
             )
@@ -91,6 +106,7 @@ class OrderViewSet(viewsets.ModelViewSet):
                 error_code="VALIDATION_ERROR"
             )
         self.perform_create(serializer)
+        metrics.ORDERS_CREATED.inc(source='pos')
         logger.info(f"Order created: {serializer.data.get('order_number')} at table {serializer.data.get('table_number')} by user {request.user}")
         
         # NOTE: Usually orders are drafted first, so we might not want to notify kitchen yet.
@@ -103,6 +119,36 @@ class OrderViewSet(viewsets.ModelViewSet):
             message="Order created successfully"
         )
 
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        GET /api/orders/export/?fmt=csv|ndjson&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&session={id}
+        Stream orders with their lines and payments for accounting.
+        """
+        from apps.core.streaming import streaming_export
+        from .export import EXPORT_FORMATS, STREAM_WRITERS, ExportFilterError, filter_export_queryset
+
+        export_format = request.query_params.get('fmt', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return APIResponse.error(
+                message=f"Invalid format. Choices: {list(EXPORT_FORMATS)}",
+                error_code="INVALID_FORMAT"
+            )
+
+        try:
+            queryset = filter_export_queryset(self.get_queryset(), request.query_params)
+        except ExportFilterError as e:
+            return APIResponse.error(message=str(e), error_code="INVALID_FILTER")
+
+        logger.info(f"Order export ({export_format}) started by user {request.user}")
+
+        return streaming_export(
+            request,
+            STREAM_WRITERS[export_format](queryset),
+            content_type=EXPORT_FORMATS[export_format],
+            filename=f"orders-{timezone.localdate().isoformat()}.{export_format}",
+        )
+
     @action(detail=True, methods=['post'], url_path='lines')
     def add_line(self, request, id=None):
         """
@@ -116,12 +162,9 @@ class OrderViewSet(viewsets.ModelViewSet):
                 error_code="ORDER_NOT_DRAFT"
             )
         
-        print(f"🔵 ADD_LINE - Order {order.order_number} current totals: sub={order.subtotal}, tax={order.tax_amount}, total={order.total_amount}")
-        print(f"🔵 ADD_LINE - Incoming data: {request.data}")
-            
         serializer = OrderLineSerializer(data=request.data)
         if not serializer.is_valid():
-            print(f"❌ ADD_LINE - Validation failed: {serializer.errors}")
+            trace.info('add_line validation failed for %s', order.order_number, errors=serializer.errors)
             return APIResponse.error(
                 message="Validation failed",
                 errors=serializer.errors,
@@ -130,17 +173,11 @@ class OrderViewSet(viewsets.ModelViewSet):
         
         # Save the line
         line = serializer.save(order=order)
-        
-        # Refresh order and line to see updated values
-        order.refresh_from_db()
-        line.refresh_from_db()
-        
-        print(f"✅ ADD_LINE - Line created: id={line.id}, product={line.product.name}, qty={line.quantity}")
-        print(f"   - unit_price: {line.unit_price}")
-        print(f"   - tax_rate: {line.tax_rate}")
-        print(f"   - total_price: {line.total_price}")
-        print(f"   - tax_amount: {line.tax_amount}")
-        print(f"✅ ADD_LINE - Order {order.order_number} NEW totals: sub={order.subtotal}, tax={order.tax_amount}, total={order.total_amount}")
+        trace.debug(
+            'Line added to %s', order.order_number,
+            line=line.id, product=line.product_id, qty=line.quantity,
+            unit_price=line.unit_price, total=line.total_price, tax=line.tax_amount
+        )
             
         return APIResponse.success(
             data=serializer.data,
@@ -199,25 +236,15 @@ class OrderViewSet(viewsets.ModelViewSet):
             
         order.status = Order.Status.SENT_TO_KITCHEN
         order.save()
+        metrics.ORDERS_SENT_TO_KITCHEN.inc(source='pos')
         
         logger.info(f"Order {order.order_number} sent to kitchen by user {request.user}")
         
         # Trigger WebSocket notification
-        from asgiref.sync import async_to_sync
-        from channels.layers import get_channel_layer
-        from .serializers import OrderSerializer
-        
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            "kitchen_orders",
-            {
-                "type": "order.update",
-                "message": {
-                    "action": "create", # Treat sending to kitchen as 'create' for the kitchen view
-                    "order": OrderSerializer(order).data
-                }
-            }
-        )
+        broadcast_order(order, {
+            "action": "create", # Treat sending to kitchen as 'create' for the kitchen view
+            "order": OrderSerializer(order).data
+        })
         
         return APIResponse.success(
             data={'status': order.status, 'sent_at': timezone.now()},
@@ -236,8 +263,11 @@ class OrderViewSet(viewsets.ModelViewSet):
         order = self.get_object()
         
         # Mark order as completed
+        was_completed = order.status == Order.Status.COMPLETED
         order.status = Order.Status.COMPLETED
         order.save()
+        if not was_completed:
+            metrics.ORDERS_COMPLETED.inc(source='pos')
         
         # Unoccupy the table
         if order.table:
@@ -374,49 +404,88 @@ class OrderViewSet(viewsets.ModelViewSet):
         )
 
 
-class QRInfoView(views.APIView):
+@require_GET
+async def qr_info(request):
     """
     GET /api/orders/qr/info/?table_token=...
-    Privacy: AllowAny.
+    Privacy: AllowAny. Async: hit by every phone that scans a table QR.
     Validate table token and check for active floor session.
     """
-    permission_classes = [permissions.AllowAny]
+    from apps.tables.resolver import aresolve_table
 
-    def get(self, request):
-        from apps.tables.models import Table
-        from apps.sessions.models import POSSession
-        
-        table_token = request.query_params.get('table_token')
-        if not table_token:
-            return APIResponse.error(message="Table token is required.", error_code="TOKEN_REQUIRED")
-            
-        try:
-            table = Table.objects.select_related('floor').get(token=table_token)
-        except Table.DoesNotExist:
-            return APIResponse.error(message="Invalid table token.", error_code="INVALID_TOKEN")
-            
-        # Check if any active session exists on this floor
-        active_session = POSSession.objects.filter(
-            status=POSSession.Status.OPEN,
-            floor=table.floor
-        ).first()
-        
-        if not active_session:
-            return APIResponse.error(
-                message="Self-ordering is currently unavailable for this floor. Please contact staff.",
-                error_code="ORDERING_UNAVAILABLE"
-            )
-            
-        return APIResponse.success(
-            data={
-                "table_id": table.id,
-                "table_number": table.table_number,
-                "floor_name": table.floor.name if table.floor else None,
-                "session_id": active_session.id
-            },
-            message="Table and session validated successfully."
+    table_token = request.GET.get('table_token')
+    if not table_token:
+        return AsyncAPIResponse.error(message="Table token is required.", error_code="TOKEN_REQUIRED")
+
+    table = await aresolve_table(table_token)
+    if not table:
+        return AsyncAPIResponse.error(message="Invalid table token.", error_code="INVALID_TOKEN")
+
+    # Check if any active session exists on this floor
+    if not table['session_id']:
+        return AsyncAPIResponse.error(
+            message="Self-ordering is currently unavailable for this floor. Please contact staff.",
+            error_code="ORDERING_UNAVAILABLE"
         )
 
+    return AsyncAPIResponse.success(
+        data={
+            "table_id": table['table_id'],
+            "table_number": table['table_number'],
+            "floor_name": table['floor_name'],
+            "session_id": table['session_id']
+        },
+        message="Table and session validated successfully."
+    )
+
+
+@require_GET
+async def track_order(request, order_uuid):
+    """
+    GET /api/orders/track/<uuid>/
+    Privacy: AllowAny; the order uuid is the capability (it is only handed
+    to the customer who placed the order). Async: customers poll it.
+    Returns status and line progress, no customer details.
+    """
+    try:
+        order = await Order.objects.select_related('table').only(
+            'uuid', 'order_number', 'status', 'order_type', 'subtotal', 'tax_amount',
+            'discount_amount', 'total_amount', 'created_at', 'updated_at', 'table__table_number',
+        ).aget(uuid=order_uuid)
+    except Order.DoesNotExist:
+        return AsyncAPIResponse.not_found("Order not found.")
+
+    lines = [
+        line async for line in OrderLine.objects.filter(order_id=order.pk).order_by('id').values(
+            'id', 'product__name', 'variant__attribute', 'variant__value', 'quantity', 'status', 'total_price',
+        )
+    ]
+    return AsyncAPIResponse.success(data={
+        'uuid': order.uuid,
+        'order_number': order.order_number,
+        'status': order.status,
+        'order_type': order.order_type,
+        'table_number': order.table.table_number if order.table else None,
+        'subtotal': order.subtotal,
+        'tax_amount': order.tax_amount,
+        'discount_amount': order.discount_amount,
+        'total_amount': order.total_amount,
+        'created_at': order.created_at,
+        'updated_at': order.updated_at,
+        'lines': [
+            {
+                'id': line['id'],
+                'product_name': line['product__name'],
+                'variant': f"{line['variant__attribute']}: {line['variant__value']}" if line['variant__value'] else None,
+                'quantity': line['quantity'],
+                'status': line['status'],
+                'total_price': line['total_price'],
+            }
+            for line in lines
+        ],
+    })
+
+
 class QROrderView(views.APIView):
     """
     POST /api/orders/qr/
@@ -425,93 +494,65 @@ class QROrderView(views.APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        from apps.tables.models import Table
+        from apps.tables.resolver import resolve_table
 
         request_id = str(uuid.uuid4())[:8]
         incoming_data = request.data
-        logger.info(f"[QR_ORDER][{request_id}] Incoming payload: {incoming_data}")
-        print(f"QR_ORDER {request_id} incoming: {incoming_data}")
+        qr_trace.debug('[%s] Incoming payload', request_id, payload=incoming_data)
 
         table_identifier = request.data.get('table_token') or request.data.get('table') or request.data.get('table_number')
         if not table_identifier:
             logger.warning(f"[QR_ORDER][{request_id}] Missing table_token/table identifier")
-            print(f"QR_ORDER {request_id} missing table identifier")
             return APIResponse.error(message="Table identifier is required.")
 
-        table = None
-        # Normalize identifier to string for comparisons
-        table_identifier_str = str(table_identifier).strip()
-
-        # 1) Try token (canonical path)
-        table = Table.objects.filter(token=table_identifier_str).first()
-        if table:
-            logger.info(f"[QR_ORDER][{request_id}] Table resolved by token: id={table.id}, number={table.table_number}, floor={getattr(table.floor, 'name', None)}")
-        else:
-            # 2) Try table_number for backward compatibility with frontend sending numeric/string table numbers
-            table = Table.objects.filter(table_number=table_identifier_str).first()
-            if table:
-                logger.info(f"[QR_ORDER][{request_id}] Table resolved by table_number: id={table.id}, number={table.table_number}, floor={getattr(table.floor, 'name', None)}")
-            else:
-                # 3) Try primary key (id) if numeric was sent (e.g., 12 meaning pk=12)
-                try:
-                    table_pk = int(table_identifier_str)
-                except ValueError:
-                    table_pk = None
-
-                if table_pk is not None:
-                    table = Table.objects.filter(pk=table_pk).first()
-                    if table:
-                        logger.info(f"[QR_ORDER][{request_id}] Table resolved by pk: id={table.id}, number={table.table_number}, floor={getattr(table.floor, 'name', None)}")
-
-                if not table:
-                    logger.warning(f"[QR_ORDER][{request_id}] Invalid table reference: {table_identifier}")
-                    print(f"QR_ORDER {request_id} invalid table identifier {table_identifier}")
-                    return APIResponse.error(message="Invalid table reference.")
-
-        # Find any active session to associate this order with
-        # In a real scenario, we might need a more specific session logic (per floor/owner)
-        # For now, we take the most recent open session overall or for a specific cashier
-        current_session = POSSession.objects.filter(status=POSSession.Status.OPEN).first()
-
-        if not current_session:
-            logger.warning(f"[QR_ORDER][{request_id}] No active POS session found")
-            print(f"QR_ORDER {request_id} no active session")
+        # Resolve by token (canonical path), then table_number, then pk for
+        # backward compatibility with frontends sending numbers.
+        table = resolve_table(table_identifier, allow_fallback=True)
+        if not table:
+            logger.warning(f"[QR_ORDER][{request_id}] Invalid table reference: {table_identifier}")
+            return APIResponse.error(message="Invalid table reference.")
+        qr_trace.debug(
+            '[%s] Table resolved', request_id,
+            table=table['table_id'], number=table['table_number'], floor=table['floor_name']
+        )
+
+        # Attach the order to the session routed to this table's floor
+        # (FloorSessionRoute), i.e. the cashier actually serving the table.
+        session_id = table['session_id']
+
+        if not session_id:
+            logger.warning(f"[QR_ORDER][{request_id}] No active POS session for floor {table['floor_name']}")
             return APIResponse.error(message="Ordering is currently unavailable (no active session).")
 
         data = request.data.copy()
-        data['table'] = table.id
-        data['session'] = current_session.id
+        data['table'] = table['table_id']
+        data['session'] = session_id
         data['order_type'] = 'dine_in'
         data['status'] = Order.Status.DRAFT # Customers start as Draft
 
         serializer = OrderSerializer(data=data)
         if not serializer.is_valid():
             logger.error(f"[QR_ORDER][{request_id}] Validation failed: errors={serializer.errors} payload={data}")
-            print(f"QR_ORDER {request_id} validation failed: {serializer.errors}")
             return APIResponse.error(
                 message="Validation failed",
                 errors=serializer.errors
             )
 
-        order = serializer.save()
-        logger.info(f"[QR_ORDER][{request_id}] Order saved draft: order_number={order.order_number}, total={order.total_amount}")
-
         # Attach order lines from payload (nested lines are read-only in serializer, so handle here)
         lines_payload = request.data.get('lines', []) or []
         if not lines_payload:
             logger.warning(f"[QR_ORDER][{request_id}] No lines provided in payload; aborting")
-            print(f"QR_ORDER {request_id} missing lines")
             return APIResponse.error(
                 message="Order must contain at least one line item.",
                 error_code="NO_LINES"
             )
 
-        created_lines = []
+        from apps.menu.models import Product, ProductVariant
+
+        parsed_lines = []
         for idx, line in enumerate(lines_payload, start=1):
             product_id = line.get('product')
-            variant_id = line.get('variant') or None
             qty = line.get('quantity', 1)
-            notes = line.get('notes', '')
 
             if not product_id:
                 logger.error(f"[QR_ORDER][{request_id}] Line {idx} missing product id: {line}")
@@ -532,51 +573,71 @@ class QROrderView(views.APIView):
                     error_code="LINE_QUANTITY_INVALID"
                 )
 
-            # Fetch product to get price and tax_rate
-            from apps.menu.models import Product
-            
-            try:
-                product = Product.objects.get(pk=product_id)
-            except Product.DoesNotExist:
+            parsed_lines.append((idx, product_id, line.get('variant') or None, qty_val, line.get('notes', '')))
+
+        # One query each for every product and variant referenced by the payload,
+        # all checked before anything is written
+        try:
+            products = Product.objects.in_bulk({product_id for _, product_id, _, _, _ in parsed_lines})
+        except (TypeError, ValueError):
+            products = {}
+        variant_ids = {variant_id for _, _, variant_id, _, _ in parsed_lines if variant_id is not None}
+        try:
+            variants = ProductVariant.objects.filter(product_id__in=products).in_bulk(variant_ids) if variant_ids else {}
+        except (TypeError, ValueError):
+            variants = {}
+
+        order_lines = []
+        for idx, product_id, variant_id, qty_val, notes in parsed_lines:
+            product = products.get(int(product_id)) if str(product_id).isdigit() else None
+            if product is None:
                 logger.error(f"[QR_ORDER][{request_id}] Line {idx} product not found: {product_id}")
                 return APIResponse.error(
                     message=f"Line {idx} references an invalid product.",
                     error_code="PRODUCT_NOT_FOUND"
                 )
 
-            # Create order line with explicit unit_price and tax_rate
-            print(f"[QR_ORDER][{request_id}] BEFORE CREATE - Product: {product.name}, Price: {product.price}, Tax: {product.tax_rate}")
-            
-            created_line = OrderLine.objects.bulk_create(
-                order=order,
+            variant = None
+            if variant_id is not None:
+                variant = variants.get(int(variant_id)) if str(variant_id).isdigit() else None
+                if variant is None or variant.product_id != product.id:
+                    logger.error(f"[QR_ORDER][{request_id}] Line {idx} variant {variant_id} not found for product {product.id}")
+                    return APIResponse.error(
+                        message=f"Line {idx} references an invalid variant for its product.",
+                        error_code="VARIANT_NOT_FOUND"
+                    )
+
+            # Explicit unit_price and tax_rate; bulk_create skips save(), so
+            # compute the line amounts here
+            order_line = OrderLine(
                 product=product,
-                variant_id=variant_id,
+                variant=variant,
                 quantity=qty_val,
                 unit_price=product.price,
                 tax_rate=product.tax_rate,
                 notes=notes,
             )
-            
-            # Refresh to get saved values
-            created_line.refresh_from_db()
-            print(f"[QR_ORDER][{request_id}] AFTER CREATE - Line ID: {created_line.id}")
-            print(f"   - unit_price: {created_line.unit_price}")
-            print(f"   - tax_rate: {created_line.tax_rate}")
-            print(f"   - quantity: {created_line.quantity}")
-            print(f"   - total_price: {created_line.total_price}")
-            print(f"   - tax_amount: {created_line.tax_amount}")
-            
-            created_lines.append(created_line.id)
-            logger.info(f"[QR_ORDER][{request_id}] Line {idx} created: product={product.name}, qty={qty_val}, price={product.price}, tax={product.tax_rate}")
-
-        # Recalculate totals now that lines are added
-        print(f"[QR_ORDER][{request_id}] BEFORE calculate_totals - Order totals: subtotal={order.subtotal}, tax={order.tax_amount}, total={order.total_amount}")
-        
-        order.calculate_totals()
-        order.refresh_from_db()
-        
-        print(f"[QR_ORDER][{request_id}] AFTER calculate_totals - Order totals: subtotal={order.subtotal}, tax={order.tax_amount}, total={order.total_amount}")
-        logger.info(f"[QR_ORDER][{request_id}] Lines created: {created_lines}; totals updated subtotal={order.subtotal} tax={order.tax_amount} total={order.total_amount}")
+            order_line.compute_amounts()
+            order_lines.append(order_line)
+
+        # The order and its lines are written together or not at all
+        with transaction.atomic():
+            order = serializer.save()
+            for order_line in order_lines:
+                order_line.order = order
+            OrderLine.objects.bulk_create(order_lines)
+            # No post_save for bulk inserts: move the live category totals here
+            kpi.publish_new_lines(order_lines)
+
+            # Recalculate totals once now that all lines are added
+            order.calculate_totals()
+        metrics.ORDERS_CREATED.inc(source='qr')
+        qr_trace.info('[%s] Draft order saved', request_id, order=order.order_number)
+        qr_trace.info(
+            '[%s] Lines created for %s', request_id, order.order_number,
+            lines=len(order_lines), subtotal=order.subtotal,
+            tax=order.tax_amount, total=order.total_amount
+        )
 
         # Razorpay Integration: Create Razorpay Order
         try:
@@ -589,7 +650,6 @@ class QROrderView(views.APIView):
 
             if not razorpay_key_id or not razorpay_key_secret:
                 logger.error(f"[QR_ORDER][{request_id}] Razorpay credentials not configured")
-                print(f"QR_ORDER {request_id} missing Razorpay creds")
                 return APIResponse.created(
                     data=OrderSerializer(order).data,
                     message="Order created but payment gateway not configured. Please contact staff."
@@ -604,7 +664,6 @@ class QROrderView(views.APIView):
             if razorpay_amount <= 0:
                 # Allow zero-amount orders to proceed without Razorpay; return draft
                 logger.warning(f"[QR_ORDER][{request_id}] Zero/invalid amount for Razorpay: {order.total_amount}. Returning draft without payment session.")
-                print(f"QR_ORDER {request_id} zero/invalid amount {order.total_amount}")
                 return APIResponse.created(
                     data=OrderSerializer(order).data,
                     message="Order placed as draft. No payment required or amount is zero."
@@ -618,10 +677,12 @@ class QROrderView(views.APIView):
             })
 
             order.razorpay_order_id = razorpay_order['id']
-            order.save(update_fields=['razorpay_order_id'])
+            order.save(update_fields=['razorpay_order_id', 'updated_at'])
 
-            logger.info(f"[QR_ORDER][{request_id}] Razorpay order created: {razorpay_order['id']} for order {order.order_number}")
-            print(f"QR_ORDER {request_id} razorpay order {razorpay_order['id']}")
+            qr_trace.info(
+                '[%s] Razorpay order created for %s', request_id, order.order_number,
+                razorpay_order=razorpay_order['id']
+            )
 
             # Add razorpay details to response
             response_data = OrderSerializer(order).data
@@ -635,14 +696,12 @@ class QROrderView(views.APIView):
 
         except ImportError:
             logger.error(f"[QR_ORDER][{request_id}] Razorpay SDK not installed")
-            print(f"QR_ORDER {request_id} razorpay sdk missing")
             return APIResponse.created(
                 data=OrderSerializer(order).data,
                 message="Order created but payment gateway unavailable. Please contact staff."
             )
         except razorpay.errors.BadRequestError as e:
             logger.error(f"[QR_ORDER][{request_id}] Razorpay bad request: {str(e)}")
-            print(f"QR_ORDER {request_id} razorpay bad request {e}")
             # Treat auth/config issues as soft-fail: return draft without Razorpay session
             return APIResponse.created(
                 data=OrderSerializer(order).data,
@@ -650,7 +709,6 @@ class QROrderView(views.APIView):
             )
         except Exception as e:
             logger.error(f"[QR_ORDER][{request_id}] Razorpay order creation failed: {str(e)}", exc_info=True)
-            print(f"QR_ORDER {request_id} razorpay exception {e}")
             # Order is saved as draft in our DB even if Razorpay fails
             return APIResponse.created(
                 data=OrderSerializer(order).data,
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_alter_order_status_order_order_status_created_idx_and_more'),
+        ('payments', '0003_paymentmethod_code_alter_payment_transaction_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['order', 'status'], name='payment_order_status_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from apps.orders.models import Order
 from django.utils import timezone
+from apps.core.loaded_state import LoadedStateMixin
 
 class PaymentMethod(models.Model):
     """
@@ -20,7 +21,7 @@ class PaymentMethod(models.Model):
     def __str__(self):
         return f"{self.name} ({self.type})"
 
-class Payment(models.Model):
+class Payment(LoadedStateMixin, models.Model):
     """
     Record of a payment for an order.
     """
@@ -41,6 +42,15 @@ class Payment(models.Model):
     
     paid_at = models.DateTimeField(default=timezone.now)
 
+    # Diffed on save for the live dashboard KPIs (apps.orders.signals)
+    tracked_fields = ('status', 'amount')
+
+    class Meta:
+        indexes = [
+            # Paid-total checks after every payment
+            models.Index(fields=['order', 'status'], name='payment_order_status_idx'),
+        ]
+
     def __str__(self):
         return f"Payment {self.id} for Order {self.order.order_number}"
 
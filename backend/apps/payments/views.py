@@ -3,6 +3,9 @@ from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from apps.core.responses import APIResponse
+from apps.core.tracing import get_tracer
+from apps.core.broadcast import broadcast_order
+from apps.core import metrics
 from .models import PaymentMethod, Payment, Receipt
 from .serializers import PaymentMethodSerializer, PaymentSerializer, ReceiptSerializer
 from apps.orders.models import Order
@@ -12,11 +15,10 @@ import hmac
 import hashlib
 import logging
 from decimal import Decimal
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 from apps.orders.serializers import OrderSerializer
 
 logger = logging.getLogger(__name__)
+trace = get_tracer('payments')
 
 class PaymentMethodViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -105,43 +107,20 @@ class CreateRazorpayOrderView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        print("\n" + "="*80)
-        print("🔵 CREATE RAZORPAY ORDER - DEBUGGING")
-        print("="*80)
-        
-        # ========== STEP 1: VALIDATE REQUEST DATA ==========
-        print("\n📥 STEP 1: REQUEST DATA")
-        print(f"   Raw Request Data: {request.data}")
-        
         order_id = request.data.get('order_id')
         amount = request.data.get('amount')
-        
-        print(f"   Order ID: {order_id}")
-        print(f"   Amount: {amount}")
-        logger.info(f"📥 Request received - order_id: {order_id}, amount: {amount}")
+        trace.debug('Create Razorpay order requested', order_id=order_id, amount=amount)
 
         if not order_id or not amount:
-            print(f"   ❌ MISSING DATA: order_id={order_id}, amount={amount}")
             logger.error(f"❌ Missing required fields: order_id={order_id}, amount={amount}")
             return APIResponse.error(
                 message="order_id and amount are required",
                 status_code=status.HTTP_400_BAD_REQUEST
             )
-        print(f"   ✅ Valid request data")
 
-        # ========== STEP 2: FETCH ORDER ==========
-        print("\n📦 STEP 2: FETCH ORDER FROM DATABASE")
-        print(f"   Looking for order with id: {order_id}")
-        
         try:
-            order = Order.objects.get(pk=order_id)
-            print(f"   ✅ Order found: {order.order_number}")
-            print(f"      - Table: {order.table}")
-            print(f"      - Status: {order.status}")
-            print(f"      - Total Amount: {order.total_amount}")
-            logger.info(f"✅ Order found: {order.order_number}")
+            order = Order.objects.select_related('table').get(pk=order_id)
         except Order.DoesNotExist:
-            print(f"   ❌ ORDER NOT FOUND for id: {order_id}")
             logger.error(f"❌ Order not found: {order_id}")
             return APIResponse.error(
                 message="Order not found",
@@ -149,46 +128,23 @@ class CreateRazorpayOrderView(APIView):
                 status_code=status.HTTP_404_NOT_FOUND
             )
 
-        # ========== STEP 3: CHECK RAZORPAY CREDENTIALS ==========
-        print("\n🔐 STEP 3: RAZORPAY CREDENTIALS")
         razorpay_key_id = settings.RAZORPAY_KEY_ID
         razorpay_key_secret = settings.RAZORPAY_KEY_SECRET
-        
-        print(f"   Key ID: {razorpay_key_id}")
-        print(f"   Key Secret: {razorpay_key_secret[:10] if razorpay_key_secret else 'EMPTY'}***")
-        
+
         if not razorpay_key_id or not razorpay_key_secret:
-            print(f"   ❌ MISSING CREDENTIALS!")
-            print(f"      Key ID Empty: {not razorpay_key_id}")
-            print(f"      Key Secret Empty: {not razorpay_key_secret}")
             logger.error(f"❌ Missing Razorpay credentials!")
             return APIResponse.error(
                 message="Razorpay credentials not configured",
                 error_code="RAZORPAY_CONFIG_ERROR",
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        print(f"   ✅ Credentials loaded")
-        logger.info(f"✅ Razorpay credentials available")
 
         try:
-            # ========== STEP 4: INITIALIZE RAZORPAY CLIENT ==========
-            print("\n🚀 STEP 4: INITIALIZE RAZORPAY CLIENT")
-            print(f"   Initializing with:")
-            print(f"      - Key ID: {razorpay_key_id}")
-            print(f"      - Auth tuple prepared")
-            
             client = razorpay.Client(
                 auth=(razorpay_key_id, razorpay_key_secret)
             )
-            print(f"   ✅ Razorpay client initialized")
-            logger.info(f"✅ Razorpay client initialized")
 
-            # ========== STEP 5: PREPARE ORDER DATA ==========
-            print("\n📋 STEP 5: PREPARE RAZORPAY ORDER DATA")
             amount_in_paisa = int(Decimal(str(amount)) * 100)
-            print(f"   Amount: {amount} INR")
-            print(f"   Amount in Paisa: {amount_in_paisa}")
-            
             razorpay_order_data = {
                 'amount': amount_in_paisa,
                 'currency': 'INR',
@@ -198,38 +154,17 @@ class CreateRazorpayOrderView(APIView):
                     'table_number': str(order.table.table_number if order.table else 'N/A')
                 }
             }
-            
-            print(f"   📝 Order Data to Send:")
-            print(f"      - Amount: {razorpay_order_data['amount']}")
-            print(f"      - Currency: {razorpay_order_data['currency']}")
-            print(f"      - Receipt: {razorpay_order_data['receipt']}")
-            print(f"      - Notes: {razorpay_order_data['notes']}")
-            logger.info(f"📋 Razorpay order data prepared: {razorpay_order_data}")
+            trace.debug('Razorpay order data prepared for %s', order.order_number, data=razorpay_order_data)
 
-            # ========== STEP 6: CREATE RAZORPAY ORDER ==========
-            print("\n🌐 STEP 6: CALL RAZORPAY API")
-            print(f"   Sending request to Razorpay...")
-            
             razorpay_order = client.order.create(data=razorpay_order_data)
-            
-            print(f"   ✅ RAZORPAY RESPONSE RECEIVED:")
-            print(f"      - Order ID: {razorpay_order.get('id')}")
-            print(f"      - Amount: {razorpay_order.get('amount')}")
-            print(f"      - Currency: {razorpay_order.get('currency')}")
-            print(f"      - Receipt: {razorpay_order.get('receipt')}")
-            print(f"      - Status: {razorpay_order.get('status')}")
-            print(f"      - Full Response: {razorpay_order}")
-            logger.info(f"✅ Razorpay order created successfully: {razorpay_order.get('id')}")
-            
-            # ========== STEP 7: SAVE ORDER ID ==========
-            print("\n💾 STEP 7: SAVE RAZORPAY ORDER ID TO DATABASE")
+
             order.razorpay_order_id = razorpay_order['id']
-            order.save(update_fields=['razorpay_order_id'])
-            print(f"   ✅ Saved to database")
-            logger.info(f"💾 Razorpay order ID saved: {razorpay_order['id']}")
+            order.save(update_fields=['razorpay_order_id', 'updated_at'])
+            trace.info(
+                'Razorpay order created for %s', order.order_number,
+                razorpay_order=razorpay_order['id'], amount=amount_in_paisa
+            )
 
-            # ========== STEP 8: RETURN SUCCESS ==========
-            print("\n✅ STEP 8: RETURN SUCCESS RESPONSE")
             response_data = {
                 'razorpay_order_id': razorpay_order['id'],
                 'razorpay_key': razorpay_key_id,
@@ -237,9 +172,6 @@ class CreateRazorpayOrderView(APIView):
                 'currency': 'INR',
                 'order_number': order.order_number
             }
-            print(f"   Response: {response_data}")
-            print("="*80 + "\n")
-            logger.info(f"✅ Success response prepared")
 
             return APIResponse.success(
                 data=response_data,
@@ -247,11 +179,6 @@ class CreateRazorpayOrderView(APIView):
             )
 
         except razorpay.errors.BadRequestError as e:
-            print(f"\n❌ RAZORPAY BAD REQUEST ERROR")
-            print(f"   Error: {str(e)}")
-            print(f"   Error Type: {type(e)}")
-            print(f"   Full Error: {e}")
-            print("="*80 + "\n")
             logger.error(f"❌ Razorpay BadRequestError: {str(e)}", exc_info=True)
             return APIResponse.error(
                 message="Invalid request to Razorpay - Check credentials",
@@ -259,11 +186,6 @@ class CreateRazorpayOrderView(APIView):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         except razorpay.errors.ServerError as e:
-            print(f"\n❌ RAZORPAY SERVER ERROR")
-            print(f"   Error: {str(e)}")
-            print(f"   Error Type: {type(e)}")
-            print(f"   Full Error: {e}")
-            print("="*80 + "\n")
             logger.error(f"❌ Razorpay ServerError: {str(e)}", exc_info=True)
             return APIResponse.error(
                 message="Razorpay server error",
@@ -271,25 +193,12 @@ class CreateRazorpayOrderView(APIView):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         except Exception as e:
-            print(f"\n❌ UNEXPECTED ERROR")
-            print(f"   Error: {str(e)}")
-            print(f"   Error Type: {type(e)}")
-            print(f"   Error Details:")
-            import traceback
-            traceback.print_exc()
-            print("="*80 + "\n")
             logger.error(f"❌ Unexpected error: {str(e)}", exc_info=True)
             return APIResponse.error(
                 message="Failed to create Razorpay order",
                 error_code="RAZORPAY_ERROR",
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-            logger.error(f"Razorpay order creation failed: {str(e)}", exc_info=True)
-            return APIResponse.error(
-                message="Failed to create Razorpay order",
-                error_code="RAZORPAY_ERROR",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
 
 
 class VerifyPaymentView(APIView):
@@ -313,6 +222,7 @@ class VerifyPaymentView(APIView):
 
         if not all([razorpay_order_id, razorpay_payment_id, razorpay_signature]):
             logger.warning("Payment verification: Missing required parameters")
+            metrics.PAYMENT_VERIFICATIONS.inc(outcome='missing_parameters')
             return Response({
                 "error": "Missing parameters",
                 "details": "razorpay_order_id, razorpay_payment_id, and razorpay_signature are required"
@@ -331,12 +241,14 @@ class VerifyPaymentView(APIView):
 
             if not hmac.compare_digest(expected_signature, razorpay_signature):
                 logger.warning(f"Payment verification: Invalid signature for order {razorpay_order_id}")
+                metrics.PAYMENT_VERIFICATIONS.inc(outcome='invalid_signature')
                 return Response({
                     "error": "Invalid signature",
                     "message": "Payment verification failed"
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Payment verification: Signature check error - {str(e)}")
+            metrics.PAYMENT_VERIFICATIONS.inc(outcome='signature_error')
             return Response({
                 "error": "Verification error",
                 "details": str(e)
@@ -350,6 +262,7 @@ class VerifyPaymentView(APIView):
             existing_payment = Payment.objects.filter(transaction_id=razorpay_payment_id).first()
             if existing_payment:
                 logger.info(f"Payment {razorpay_payment_id} already processed")
+                metrics.PAYMENT_VERIFICATIONS.inc(outcome='duplicate')
                 return APIResponse.success(
                     data={
                         'order': OrderSerializer(order).data,
@@ -403,24 +316,20 @@ class VerifyPaymentView(APIView):
             # Update order status to SENT_TO_KITCHEN if still in DRAFT
             if order.status == Order.Status.DRAFT:
                 order.status = Order.Status.SENT_TO_KITCHEN
+                metrics.ORDERS_SENT_TO_KITCHEN.inc(source='payment')
                 
-            order.save(update_fields=['razorpay_payment_id', 'razorpay_signature', 'status'])
+            # updated_at too: it is what the order's ETag is built from (conditional GET)
+            order.save(update_fields=['razorpay_payment_id', 'razorpay_signature', 'status', 'updated_at'])
+            metrics.PAYMENT_VERIFICATIONS.inc(outcome='verified')
             
             logger.info(f"Payment verified and created for order {order.order_number}: ₹{amount_paid}")
             
             # Broadcast to Kitchen WebSocket
             try:
-                channel_layer = get_channel_layer()
-                async_to_sync(channel_layer.group_send)(
-                    "kitchen_orders",
-                    {
-                        "type": "order.update",
-                        "message": {
-                            "action": "create",
-                            "order": OrderSerializer(order).data
-                        }
-                    }
-                )
+                broadcast_order(order, {
+                    "action": "create",
+                    "order": OrderSerializer(order).data
+                })
                 logger.info(f"Order {order.order_number} sent to kitchen")
             except Exception as ws_error:
                 logger.error(f"Failed to send WebSocket notification: {str(ws_error)}")
@@ -437,6 +346,7 @@ class VerifyPaymentView(APIView):
             
         except Order.DoesNotExist:
             logger.error(f"Payment verification: Order not found for razorpay_order_id={razorpay_order_id}")
+            metrics.PAYMENT_VERIFICATIONS.inc(outcome='order_not_found')
             return APIResponse.error(
                 message="Order not found",
                 error_code="ORDER_NOT_FOUND",
@@ -444,6 +354,7 @@ class VerifyPaymentView(APIView):
             )
         except Exception as e:
             logger.error(f"Payment verification: Unexpected error - {str(e)}", exc_info=True)
+            metrics.PAYMENT_VERIFICATIONS.inc(outcome='error')
             return Response({
                 "error": "Server error",
                 "details": str(e)
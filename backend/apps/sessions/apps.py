@@ -6,3 +6,6 @@ class POSSessionsConfig(AppConfig):
     name = 'apps.sessions'
     label = 'pos_sessions'  # Unique label to avoid conflict with django.contrib.sessions
     verbose_name = 'POS Sessions'
+
+    def ready(self):
+        from . import signals
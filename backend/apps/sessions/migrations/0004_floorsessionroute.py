@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_routes(apps, schema_editor):
+    """Route each floor to its most recently opened session."""
+    POSSession = apps.get_model('pos_sessions', 'POSSession')
+    FloorSessionRoute = apps.get_model('pos_sessions', 'FloorSessionRoute')
+
+    routes = {}
+    open_sessions = POSSession.objects.filter(
+        status='open', floor__isnull=False
+    ).order_by('start_time')
+    for session in open_sessions:
+        routes[session.floor_id] = session.id
+
+    FloorSessionRoute.objects.bulk_create([
+        FloorSessionRoute(floor_id=floor_id, session_id=session_id)
+        for floor_id, session_id in routes.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos_sessions', '0003_possession_floor'),
+        ('tables', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FloorSessionRoute',
+            fields=[
+                ('floor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='session_route', serialize=False, to='tables.floor')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='floor_route', to='pos_sessions.possession')),
+            ],
+            options={
+                'verbose_name': 'Floor Session Route',
+                'verbose_name_plural': 'Floor Session Routes',
+            },
+        ),
+        migrations.RunPython(populate_routes, migrations.RunPython.noop),
+    ]
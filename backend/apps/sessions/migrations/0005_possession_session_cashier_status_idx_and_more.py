@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos_sessions', '0004_floorsessionroute'),
+        ('tables', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='possession',
+            index=models.Index(fields=['cashier', 'status'], name='session_cashier_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='possession',
+            index=models.Index(fields=['floor', 'status'], name='session_floor_status_idx'),
+        ),
+    ]
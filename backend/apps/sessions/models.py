@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 
@@ -47,6 +47,11 @@ class POSSession(models.Model):
         verbose_name = 'POS Session'
         verbose_name_plural = 'POS Sessions'
         ordering = ['-start_time']
+        indexes = [
+            # Current session lookups for a cashier / a floor
+            models.Index(fields=['cashier', 'status'], name='session_cashier_status_idx'),
+            models.Index(fields=['floor', 'status'], name='session_floor_status_idx'),
+        ]
 
     def __str__(self):
         return f"Session {self.session_number} - {self.cashier.email} ({self.status})"
@@ -56,7 +61,7 @@ class POSSession(models.Model):
         completed_orders = self.orders.filter(status='completed')
         self.total_orders = completed_orders.count()
         self.total_sales = sum(o.total_amount for o in completed_orders)
-        self.save()
+        self.save(update_fields=['total_orders', 'total_sales'])
 
     def save(self, *args, **kwargs):
         if not self.session_number:
@@ -64,3 +69,82 @@ class POSSession(models.Model):
             timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
             self.session_number = f"SESS-{timestamp}-{self.cashier.id}"
         super().save(*args, **kwargs)
+
+        # Keep the floor routing table in step with open/close
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'status', 'floor'} & set(update_fields):
+            self.sync_floor_route()
+
+    def sync_floor_route(self):
+        """
+        Route this session's floor to it while open. On close (or a floor
+        change) the floor it leaves goes to another open session there, or
+        loses its route when none is left.
+        """
+        is_open = self.status == self.Status.OPEN and self.floor_id
+        with transaction.atomic():
+            routed = set(FloorSessionRoute.objects.filter(session=self).values_list('floor_id', flat=True))
+            kept = {self.floor_id} if is_open else set()
+            lock_floors(routed | kept)
+            for floor_id in sorted(routed - kept):
+                hand_over_floor(floor_id, exclude=self)
+
+            if is_open:
+                FloorSessionRoute.objects.update_or_create(
+                    floor_id=self.floor_id,
+                    defaults={'session': self}
+                )
+
+
+def lock_floors(floor_ids):
+    """
+    Serialize route changes per floor: sessions opening or closing on the
+    same floor at once take turns (row locks on the floors, in id order).
+    """
+    from apps.tables.models import Floor
+    list(Floor.objects.select_for_update().filter(pk__in=floor_ids).order_by('pk').values_list('pk', flat=True))
+
+
+def hand_over_floor(floor_id, exclude=None):
+    """
+    Route `floor_id` to its most recently started open session other than
+    `exclude` (as before routing existed), or leave it without a route.
+    Call inside a transaction holding lock_floors().
+    """
+    FloorSessionRoute.objects.filter(floor_id=floor_id).delete()
+    successor = POSSession.objects.filter(floor_id=floor_id, status=POSSession.Status.OPEN)
+    if exclude is not None:
+        successor = successor.exclude(pk=exclude.pk)
+    successor = successor.first()
+    if successor:
+        FloorSessionRoute.objects.create(floor_id=floor_id, session=successor)
+
+
+class FloorSessionRoute(models.Model):
+    """
+    Routing table: the open session that serves each floor.
+
+    Keyed by floor so QR orders find their cashier's session with a single
+    primary-key lookup instead of scanning open sessions. Maintained by
+    POSSession.save() on open and close, and on session delete
+    (apps.sessions.signals).
+    """
+    floor = models.OneToOneField(
+        'tables.Floor',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='session_route'
+    )
+    session = models.OneToOneField(
+        POSSession,
+        on_delete=models.CASCADE,
+        related_name='floor_route'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Floor Session Route'
+        verbose_name_plural = 'Floor Session Routes'
+
+    def __str__(self):
+        return f"Floor {self.floor_id} -> Session {self.session_id}"
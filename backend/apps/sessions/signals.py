@@ -0,0 +1,19 @@
+"""
+Signal handlers that keep the floor routing table (FloorSessionRoute) whole.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import FloorSessionRoute, POSSession, hand_over_floor, lock_floors
+
+
+@receiver(post_delete, sender=POSSession)
+def session_deleted(sender, instance, **kwargs):
+    """A deleted session's route is cascaded away; give its floor to another open session."""
+    if not instance.floor_id:
+        return
+    with transaction.atomic():
+        lock_floors({instance.floor_id})
+        if not FloorSessionRoute.objects.filter(floor_id=instance.floor_id).exists():
+            hand_over_floor(instance.floor_id)
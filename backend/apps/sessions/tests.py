@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.tables.models import Floor
+
+from .models import FloorSessionRoute, POSSession
+
+
+class FloorRouteTests(TestCase):
+    """FloorSessionRoute follows sessions opening, closing, moving and being deleted."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ground = Floor.objects.create(name='Ground', number=0)
+        cls.terrace = Floor.objects.create(name='Terrace', number=1)
+        cls.first = User.objects.create_user('first@test.local', 'pw123456', role='cashier')
+        cls.second = User.objects.create_user('second@test.local', 'pw123456', role='cashier')
+
+    def route(self, floor):
+        return FloorSessionRoute.objects.filter(floor=floor).values_list('session_id', flat=True).first()
+
+    def test_latest_open_session_serves_the_floor(self):
+        POSSession.objects.create(cashier=self.first, floor=self.ground)
+        latest = POSSession.objects.create(cashier=self.second, floor=self.ground)
+
+        self.assertEqual(self.route(self.ground), latest.pk)
+
+    def test_close_hands_the_floor_over(self):
+        earlier = POSSession.objects.create(cashier=self.first, floor=self.ground)
+        latest = POSSession.objects.create(cashier=self.second, floor=self.ground)
+
+        latest.status = POSSession.Status.CLOSED
+        latest.save()
+        self.assertEqual(self.route(self.ground), earlier.pk)
+
+        earlier.status = POSSession.Status.CLOSED
+        earlier.save()
+        self.assertIsNone(self.route(self.ground))
+
+    def test_floor_change_moves_the_route(self):
+        session = POSSession.objects.create(cashier=self.first, floor=self.ground)
+
+        session.floor = self.terrace
+        session.save()
+
+        self.assertIsNone(self.route(self.ground))
+        self.assertEqual(self.route(self.terrace), session.pk)
+
+    def test_delete_hands_the_floor_over(self):
+        earlier = POSSession.objects.create(cashier=self.first, floor=self.ground)
+        latest = POSSession.objects.create(cashier=self.second, floor=self.ground)
+
+        latest.delete()
+
+        self.assertEqual(self.route(self.ground), earlier.pk)
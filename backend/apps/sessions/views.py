@@ -2,6 +2,7 @@ from rest_framework import status, views, permissions
 from rest_framework.response import Response
 from django.utils import timezone
 from apps.core.responses import APIResponse
+from apps.core.pagination import KeysetPagination
 from .models import POSSession
 from .serializers import POSSessionSerializer, POSSessionOpenSerializer, POSSessionCloseSerializer
 
@@ -145,13 +146,19 @@ class LastSessionView(views.APIView):
 
 class SessionHistoryView(views.APIView):
     """
-    GET /api/sessions/history
-    Get session history for the logged-in user.
+    GET /api/sessions/history?cursor=...&page_size=...
+    Get session history for the logged-in user, newest first.
     """
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ['-start_time']
 
     def get(self, request):
-        sessions = POSSession.objects.filter(cashier=request.user).order_by('-start_time')
-        serializer = POSSessionSerializer(sessions, many=True)
-        return APIResponse.success(data=serializer.data)
+        sessions = POSSession.objects.filter(cashier=request.user).select_related('cashier')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(sessions, request, view=self)
+        serializer = POSSessionSerializer(page, many=True)
+        return APIResponse.success(data={
+            'sessions': serializer.data,
+            **paginator.get_page_metadata()
+        })
 
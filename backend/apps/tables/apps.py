@@ -4,3 +4,6 @@ class TablesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tables'
     verbose_name = 'Table Management'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,116 @@
+"""
+Cached table resolver for the QR entry points.
+
+The whole table directory (token / table_number / pk -> table, floor and the
+floor's active session) is stored under a single key in the 'tables' cache
+namespace, so validating a QR scan is usually an in-process (L1) hit.
+Table, floor and session changes invalidate the namespace (see signals.py)
+and the next scan rebuilds it with two queries. The a* variants serve async
+views through the async cache and ORM APIs.
+"""
+from apps.core.cache import namespace
+
+from .models import Table
+
+DIRECTORY_KEY = 'qr_directory'
+DIRECTORY_CACHE_TIMEOUT = 60 * 60  # Safety net; invalidation is event driven
+
+directory_cache = namespace('tables', timeout=DIRECTORY_CACHE_TIMEOUT)
+
+
+def _directory_from_rows(tables, active_sessions):
+    by_token, by_number, by_id = {}, {}, {}
+    for row in tables:
+        token = str(row['token'])
+        by_token[token] = {
+            'table_id': row['id'],
+            'table_number': row['table_number'],
+            'floor_id': row['floor_id'],
+            'floor_name': row['floor__name'],
+            'session_id': active_sessions.get(row['floor_id']),
+        }
+        by_number[row['table_number']] = token
+        by_id[row['id']] = token
+
+    return {'by_token': by_token, 'by_number': by_number, 'by_id': by_id}
+
+
+def _directory_querysets():
+    from apps.sessions.models import FloorSessionRoute
+
+    routes = FloorSessionRoute.objects.values_list('floor_id', 'session_id')
+    tables = Table.objects.values('id', 'token', 'table_number', 'floor_id', 'floor__name')
+    return routes, tables
+
+
+def _build_directory():
+    """Load every table with its floor and the floor's routed session."""
+    routes, tables = _directory_querysets()
+    return _directory_from_rows(tables, dict(routes))
+
+
+async def _abuild_directory():
+    routes, tables = _directory_querysets()
+    active_sessions = {floor_id: session_id async for floor_id, session_id in routes}
+    return _directory_from_rows([row async for row in tables], active_sessions)
+
+
+def get_table_directory():
+    """Return the cached directory, rebuilding it on a miss."""
+    return directory_cache.get_or_set(DIRECTORY_KEY, _build_directory)
+
+
+async def aget_table_directory():
+    """Async get_table_directory() for ASGI views."""
+    return await directory_cache.aget_or_set(DIRECTORY_KEY, _abuild_directory)
+
+
+def _lookup(directory, identifier, allow_fallback):
+    identifier = str(identifier).strip()
+    entry = directory['by_token'].get(identifier)
+    if entry or not allow_fallback:
+        return entry
+
+    token = directory['by_number'].get(identifier)
+    if token is None:
+        try:
+            token = directory['by_id'].get(int(identifier))
+        except ValueError:
+            token = None
+
+    return directory['by_token'].get(token) if token else None
+
+
+def resolve_table(identifier, allow_fallback=False):
+    """
+    Resolve a QR table identifier.
+
+    Returns a dict with table_id, table_number, floor_id, floor_name and
+    session_id (None when the floor has no open session), or None when the
+    identifier does not match a table. With allow_fallback, the identifier is
+    also tried as a table_number and then as a primary key.
+    """
+    if identifier is None:
+        return None
+    return _lookup(get_table_directory(), identifier, allow_fallback)
+
+
+async def aresolve_table(identifier, allow_fallback=False):
+    """Async resolve_table(), reading the directory with the async cache API."""
+    if identifier is None:
+        return None
+    return _lookup(await aget_table_directory(), identifier, allow_fallback)
+
+
+def table_floor_id(table_id):
+    """Floor id of a table, from the cached directory (None if unknown)."""
+    if table_id is None:
+        return None
+    directory = get_table_directory()
+    token = directory['by_id'].get(table_id)
+    return directory['by_token'][token]['floor_id'] if token else None
+
+
+def invalidate_table_directory():
+    """Drop the cached directory; the next lookup rebuilds it."""
+    directory_cache.invalidate()
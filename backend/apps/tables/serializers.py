@@ -17,6 +17,10 @@ class TableSerializer(serializers.ModelSerializer):
             'qr_code_url', 'token', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'qr_code_url', 'token', 'created_at', 'updated_at']
+        # ?expand= targets (apps.core.fieldsets)
+        expandable_fields = {
+            'floor': 'apps.tables.serializers.FloorSerializer',
+        }
 
 
 class FloorSerializer(serializers.ModelSerializer):
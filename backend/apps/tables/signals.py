@@ -0,0 +1,25 @@
+"""
+Signal handlers that keep the QR table directory cache in sync.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.sessions.models import FloorSessionRoute
+from .models import Floor, Table
+from .resolver import invalidate_table_directory
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+@receiver(post_save, sender=Floor)
+@receiver(post_delete, sender=Floor)
+def table_layout_changed(sender, **kwargs):
+    """Table edits, bulk_tables changes and floor renames."""
+    invalidate_table_directory()
+
+
+@receiver(post_save, sender=FloorSessionRoute)
+@receiver(post_delete, sender=FloorSessionRoute)
+def session_route_changed(sender, **kwargs):
+    """Session open/close changes which session a floor routes to."""
+    invalidate_table_directory()
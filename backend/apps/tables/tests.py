@@ -0,0 +1,22 @@
+from django.test import TestCase
+
+from apps.core.tests import CompiledParityMixin
+
+from .models import Floor, Table
+from .serializers import TableSerializer
+
+
+class CompiledParityTests(CompiledParityMixin, TestCase):
+    """Compiled list rows (apps.core.compiled) match TableSerializer(table).data."""
+    serializer_class = TableSerializer
+    path = '/api/tables/tables/'
+    sparse_fields = 'id,table_number,floor_name,token'
+    expanded_fields = 'id,floor.name,floor.number'
+    expand = 'floor'
+
+    @classmethod
+    def setUpTestData(cls):
+        ground = Floor.objects.create(name='Ground', number=0)
+        terrace = Floor.objects.create(name='Terrace', number=1)
+        Table.objects.create(floor=ground, table_number='T-1', name='Window', capacity=2)
+        Table.objects.create(floor=terrace, table_number='T-2', qr_code_url='https://example.com/qr/t-2.png')
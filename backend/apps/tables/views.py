@@ -7,14 +7,22 @@ from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.core.responses import APIResponse
+from apps.core.pagination import KeysetPagination
+from apps.core.compiled import CompiledReadMixin
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.fieldsets import SparseFieldsetMixin
 from apps.accounts.permissions import IsAdmin, IsStaff, IsAdminOrCashier
 from .models import Floor, Table
 from .serializers import FloorSerializer, TableSerializer
 from apps.cafe_settings.models import CafeSettings
 from apps.core.pdf_utils import generate_table_qr_pdf
+from apps.core.cache import namespace
 from django.http import HttpResponse, FileResponse
 
-class FloorViewSet(viewsets.ModelViewSet):
+# Rendered QR PNG/PDF bytes, keyed by everything printed on them
+qr_cache = namespace('qr', timeout=24 * 60 * 60)
+
+class FloorViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     CRUD for Floors.
     """
@@ -22,6 +30,8 @@ class FloorViewSet(viewsets.ModelViewSet):
     serializer_class = FloorSerializer
     permission_classes = [IsAdminOrCashier]  # Admin and Cashier can manage floors
     search_fields = ['name']
+    conditional_timestamps = ('updated_at', 'tables__updated_at')
+    conditional_counts = ('tables',)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
@@ -37,17 +47,14 @@ class FloorViewSet(viewsets.ModelViewSet):
         GET /api/tables/floors/availability/
         List all floors with their occupancy status (is a cashier currently assigned?).
         """
-        from apps.sessions.models import POSSession
+        from apps.sessions.models import FloorSessionRoute
         floors = self.get_queryset()
         data = []
         
         # Get active sessions mapped by floor_id
-        active_sessions = POSSession.objects.filter(
-            status=POSSession.Status.OPEN,
-            floor__isnull=False
-        ).select_related('cashier')
+        routes = FloorSessionRoute.objects.select_related('session__cashier')
         
-        floor_occupancy = {s.floor_id: s.cashier for s in active_sessions}
+        floor_occupancy = {r.floor_id: r.session.cashier for r in routes}
         
         for floor in floors:
             occupant = floor_occupancy.get(floor.id)
@@ -133,7 +140,7 @@ class FloorViewSet(viewsets.ModelViewSet):
         return super().update(request, *args, **kwargs)
 
 
-class TableViewSet(viewsets.ModelViewSet):
+class TableViewSet(ConditionalGetMixin, CompiledReadMixin, viewsets.ModelViewSet):
     """
     CRUD for Tables.
     """
@@ -143,6 +150,9 @@ class TableViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['floor', 'status', 'is_active']
     search_fields = ['table_number', 'name']
+    ordering = ['table_number']
+    pagination_class = KeysetPagination
+    conditional_timestamps = ('updated_at', 'floor__updated_at')
 
     def get_permissions(self):
         """Allow any staff to view, but only admin/cashier to edit structure."""
@@ -150,30 +160,34 @@ class TableViewSet(viewsets.ModelViewSet):
             return [IsStaff()]
         return [IsAdminOrCashier()]
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        # Filter tables by cashier's assigned floor (if they are a cashier)
-        user = request.user
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+
+        # Filter tables by cashier's assigned floor (if they are a cashier).
+        # Applied here so the conditional GET fingerprint sees it too.
+        user = self.request.user
         if user.is_authenticated and user.role == 'cashier':
             from apps.sessions.models import POSSession
             # Get current active session
             session = user.pos_sessions.filter(status=POSSession.Status.OPEN).first()
-            if session and session.floor:
+            if session and session.floor_id:
                 # Restrict to this floor only
-                queryset = queryset.filter(floor=session.floor)
+                queryset = queryset.filter(floor_id=session.floor_id)
             # If no session or no floor assigned (old logic), maybe show all or none?
             # Sticking to "show all" if no session restriction found for backward compatibility or error
-        
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return APIResponse.success(
                 data={
                     'tables': serializer.data,
-                    'count': self.paginator.page.paginator.count,
-                    'next': self.paginator.get_next_link(),
-                    'previous': self.paginator.get_previous_link()
+                    **self.paginator.get_page_metadata()
                 },
                 message="Tables retrieved successfully"
             )
@@ -252,23 +266,26 @@ class TableViewSet(viewsets.ModelViewSet):
         # Frontend URL for ordering + table token
         order_url = f"{base_url}/order/{table.token}"
         
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(order_url)
-        qr.make(fit=True)
+        def render_png():
+            qr = qrcode.QRCode(
+                version=1,
+                error_correction=qrcode.constants.ERROR_CORRECT_L,
+                box_size=10,
+                border=4,
+            )
+            qr.add_data(order_url)
+            qr.make(fit=True)
 
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Save image to buffer
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
-        
-        return HttpResponse(buffer.read(), content_type="image/png")
+            img = qr.make_image(fill_color="black", back_color="white")
+
+            # Save image to buffer
+            buffer = BytesIO()
+            img.save(buffer, format="PNG")
+            return buffer.getvalue()
+
+        # Renders are keyed by their content, so they never need invalidating
+        png = qr_cache.get_or_set(f'png:{order_url}', render_png)
+        return HttpResponse(png, content_type="image/png")
 
     @action(detail=True, methods=['get'], permission_classes=[IsStaff], url_path='qr/pdf')
     def download_qr_pdf(self, request, pk=None):
@@ -287,13 +304,16 @@ class TableViewSet(viewsets.ModelViewSet):
         order_url = f"{base_url}/order/{table.token}"
         cafe_name = settings_obj.name if settings_obj else "Our Cafe"
         
-        pdf_buffer = generate_table_qr_pdf(
-            table_number=table.table_number,
-            qr_url=order_url,
-            cafe_name=cafe_name
+        pdf = qr_cache.get_or_set(
+            f'pdf:{table.table_number}:{cafe_name}:{order_url}',
+            lambda: generate_table_qr_pdf(
+                table_number=table.table_number,
+                qr_url=order_url,
+                cafe_name=cafe_name
+            ).getvalue()
         )
         
-        response = HttpResponse(pdf_buffer, content_type='application/pdf')
+        response = HttpResponse(pdf, content_type='application/pdf')
         filename = f"QR_{table.table_number}.pdf"
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         
@@ -14,14 +14,18 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django_asgi_app = get_asgi_application()
 
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
+from apps.accounts.websocket_auth import JWTAuthMiddleware
 import apps.kitchen.routing
+import apps.orders.routing
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
-    "websocket": AuthMiddlewareStack(
+    # SimpleJWT access token in ?token=, verified once at connect (customer
+    # order tracking sockets are anonymous)
+    "websocket": JWTAuthMiddleware(
         URLRouter(
             apps.kitchen.routing.websocket_urlpatterns
+            + apps.orders.routing.websocket_urlpatterns
         )
     ),
 })
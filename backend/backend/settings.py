@@ -55,6 +55,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.profiling.ProfilingMiddleware',  # No-op unless PROFILING['ENABLED']
+    'apps.core.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -190,10 +192,10 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',  # Allow by default, restrict per-view
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'apps.core.renderers.ORJSONRenderer',  # Same output as JSONRenderer, via orjson
     ),
     'DEFAULT_PARSER_CLASSES': (
-        'rest_framework.parsers.JSONParser',
+        'apps.core.parsers.ORJSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ),
@@ -239,15 +241,94 @@ SIMPLE_JWT = {
 # CHANNELS CONFIGURATION
 # =============================================================================
 
+# Two layers so capacity and expiry can be tuned per group type (see
+# apps.core.broadcast.CHANNEL_LAYER_FOR_GROUP):
+# - default: staff groups (kitchen_orders, floor_<id>). Few sockets and
+#   every event matters, so deeper per-channel queues.
+# - customers: order_<uuid> groups. Many short-lived phone sockets, so small
+#   queues, short message expiry and groups that expire after a few hours.
+REDIS_HOSTS = [(os.environ.get('REDIS_HOST', '127.0.0.1'), int(os.environ.get('REDIS_PORT', 6379)))]
+
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
-            "hosts": [(os.environ.get('REDIS_HOST', '127.0.0.1'), int(os.environ.get('REDIS_PORT', 6379)))],
+            "hosts": REDIS_HOSTS,
+            "capacity": config('CHANNEL_STAFF_CAPACITY', default=200, cast=int),
+            "expiry": config('CHANNEL_STAFF_EXPIRY', default=60, cast=int),
+            "group_expiry": 24 * 60 * 60,
+        },
+    },
+    'customers': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            "hosts": REDIS_HOSTS,
+            "prefix": "asgi_customers",
+            "capacity": config('CHANNEL_CUSTOMER_CAPACITY', default=20, cast=int),
+            "expiry": config('CHANNEL_CUSTOMER_EXPIRY', default=15, cast=int),
+            "group_expiry": 4 * 60 * 60,
         },
     },
 }
 
+# Per-socket limits for apps.core.websocket.ManagedWebsocketConsumer.
+# The server sends {"type": "ping"} every HEARTBEAT_INTERVAL seconds and
+# evicts sockets that send nothing for HEARTBEAT_TIMEOUT. At most
+# SEND_BUFFER messages wait per socket; on overflow they are dropped for a
+# single {"type": "resync"}, and a socket that needs more than MAX_RESYNCS
+# resyncs within a minute is evicted.
+WEBSOCKETS = {
+    'HEARTBEAT_INTERVAL': config('WS_HEARTBEAT_INTERVAL', default=25, cast=int),
+    'HEARTBEAT_TIMEOUT': config('WS_HEARTBEAT_TIMEOUT', default=75, cast=int),
+    'SEND_BUFFER': config('WS_SEND_BUFFER', default=100, cast=int),
+    'MAX_RESYNCS': config('WS_MAX_RESYNCS', default=3, cast=int),
+    # Live dashboard sockets re-read their totals this often (seconds)
+    'KPI_RESEED_INTERVAL': config('WS_KPI_RESEED_INTERVAL', default=300, cast=int),
+}
+
+
+# =============================================================================
+# CACHES (apps.core.cache)
+# =============================================================================
+# CACHES['default'] is the shared tier (L2) of the two-tier cache. Set
+# REDIS_CACHE_URL so all workers share it; without it each process falls
+# back to local memory, which is fine for development and tests. The
+# in-process LRU (L1) sits in front of it with a short TTL; namespace
+# versions are re-read every VERSION_CHECK_INTERVAL seconds, which bounds
+# how stale another worker's L1 can be after an invalidation.
+
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'KEY_PREFIX': 'pos',
+            'TIMEOUT': 300,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'pos-local',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+
+TWO_TIER_CACHE = {
+    'L1_MAX_ENTRIES': config('CACHE_L1_MAX_ENTRIES', default=1024, cast=int),
+    'L1_TIMEOUT': config('CACHE_L1_TIMEOUT', default=30, cast=int),
+    'VERSION_CHECK_INTERVAL': config('CACHE_VERSION_CHECK_INTERVAL', default=1.0, cast=float),
+    'LOCK_TIMEOUT': 30,
+    'LOCK_WAIT': 2.0,
+}
+
+# Dashboard payloads; completions, cancellations and payments invalidate sooner
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=30, cast=int)
+
 
 # =============================================================================
 # CORS SETTINGS
@@ -358,6 +439,12 @@ RAZORPAY_WEBHOOK_SECRET = config('RAZORPAY_WEBHOOK_SECRET', default='')
 
 LOGS_DIR = BASE_DIR / 'logs'
 
+# Handlers are asynchronous (apps.core.log_handlers.AsyncHandler): request
+# threads enqueue records and a listener thread does the console/file I/O.
+# DEBUG records are sampled (1 in LOG_DEBUG_SAMPLE_EVERY per logger).
+APPS_LOG_LEVEL = config('APPS_LOG_LEVEL', default='DEBUG' if DEBUG else 'INFO')
+LOG_DEBUG_SAMPLE_EVERY = config('LOG_DEBUG_SAMPLE_EVERY', default=1 if DEBUG else 10, cast=int)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -371,16 +458,29 @@ LOGGING = {
             'style': '{',
         },
     },
+    'filters': {
+        'sample_debug': {
+            '()': 'apps.core.log_handlers.SamplingFilter',
+            'sample_every': LOG_DEBUG_SAMPLE_EVERY,
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            '()': 'apps.core.log_handlers.AsyncHandler',
+            'target': 'logging.StreamHandler',
             'formatter': 'simple',
+            'filters': ['sample_debug'],
         },
         'file': {
-            'level': 'DEBUG',
-            'class': 'logging.FileHandler',
+            '()': 'apps.core.log_handlers.AsyncHandler',
+            'target': 'apps.core.log_handlers.BatchingRotatingFileHandler',
             'filename': LOGS_DIR / 'debug.log',
+            'maxBytes': config('LOG_FILE_MAX_BYTES', default=10 * 1024 * 1024, cast=int),
+            'backupCount': config('LOG_FILE_BACKUP_COUNT', default=5, cast=int),
+            'batch_size': 200,
+            'level': 'DEBUG',
             'formatter': 'verbose',
+            'filters': ['sample_debug'],
         },
     },
     'root': {
@@ -395,7 +495,7 @@ LOGGING = {
         },
         'apps': {
             'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'level': APPS_LOG_LEVEL,
             'propagate': False,
         },
         'django.core.mail': {
@@ -405,3 +505,53 @@ LOGGING = {
         },
     },
 }
+
+
+# =============================================================================
+# TRACING (apps.core.tracing)
+# =============================================================================
+# Per-subsystem trace levels for hot paths ('orders', 'qr', 'payments').
+# Below the configured level trace calls are no-ops.
+# e.g. TRACE_LEVELS=orders=DEBUG,qr=INFO
+
+TRACING = {
+    'DEFAULT_LEVEL': config('TRACE_LEVEL', default='WARNING'),
+    'LEVELS': dict(
+        item.split('=', 1) for item in config('TRACE_LEVELS', default='', cast=Csv()) if '=' in item
+    ),
+}
+
+
+# =============================================================================
+# PROFILING (apps.core.profiling)
+# =============================================================================
+# Per-request SQL / view / render / channel-send profiling with Server-Timing
+# headers and GET /api/debug/profile/. Query budgets are keyed by view name;
+# STRICT raises instead of logging, so tests fail on regressions.
+
+PROFILING = {
+    'ENABLED': config('PROFILING_ENABLED', default=False, cast=bool),
+    'STRICT': config('PROFILING_STRICT', default=False, cast=bool),
+    'DUPLICATE_THRESHOLD': 3,
+    # Measured per request, independent of page size; enforced by apps/core/tests.py
+    'QUERY_BUDGETS': {
+        # Conditional GET reads the page's ids, then aggregates over them
+        'orders:order-list': 5,
+        'orders:order-detail': 4,
+        'kitchen:kitchen-orders-list': 4,
+        'kitchen:kitchen-orders-detail': 3,
+        'orders:dashboard_stats': 6,
+        'menu:product-list': 4,
+        'menu:category-list': 3,
+    },
+}
+
+
+# =============================================================================
+# METRICS (apps.core.metrics)
+# =============================================================================
+# GET /metrics serves Prometheus text format. Set METRICS_TOKEN to require
+# `Authorization: Bearer <token>` from the scraper. Without a token the
+# endpoint answers 403 unless DEBUG is on.
+
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
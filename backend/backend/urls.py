@@ -6,6 +6,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from apps.core.metrics import metrics_view
+from apps.core.views import ProfileReportView
 
 urlpatterns = [
     # Django Admin
@@ -21,6 +23,12 @@ urlpatterns = [
     path('api/kitchen/', include('apps.kitchen.urls', namespace='kitchen')),
     path('api/payments/', include('apps.payments.urls', namespace='payments')),
     path('api/settings/', include('apps.cafe_settings.urls', namespace='cafe_settings')),
+
+    # Profiling report (admin only, populated when PROFILING_ENABLED)
+    path('api/debug/profile/', ProfileReportView.as_view(), name='debug_profile'),
+
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files in development
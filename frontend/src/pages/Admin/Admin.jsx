@@ -10,6 +10,7 @@ import {
   orderService,
   settingsService,
 } from "../../services/apiService";
+import { KPI_WS_URL } from "../../services/EndPoint";
 import { useState, useEffect } from "react";
 import {
   DollarSign,
@@ -70,6 +71,40 @@ const Overview = () => {
     fetchData();
   }, [period]);
 
+  // Live headline figures: the server pushes a snapshot, then a fresh
+  // summary with every order/payment change, so there is no polling.
+  useEffect(() => {
+    let ws;
+    let closed = false;
+    const connect = () => {
+      const token = localStorage.getItem("accessToken");
+      ws = new WebSocket(`${KPI_WS_URL}?token=${encodeURIComponent(token || "")}`);
+      ws.onmessage = (event) => {
+        try {
+          const data = JSON.parse(event.data);
+          if (data.type === "ping") {
+            ws.send(JSON.stringify({ type: "pong" }));
+          } else if (data.type === "resync") {
+            ws.send(JSON.stringify({ type: "snapshot" }));
+          } else if (data.type === "kpi_snapshot" || data.type === "kpi_delta") {
+            setStats((prev) => ({ ...prev, ...data.message.summary }));
+          }
+        } catch (err) {
+          // Ignore malformed messages
+        }
+      };
+      ws.onclose = () => {
+        if (!closed) setTimeout(connect, 3000);
+      };
+      ws.onerror = () => ws.close();
+    };
+    connect();
+    return () => {
+      closed = true;
+      if (ws) ws.close();
+    };
+  }, []);
+
   // Default data for when there is no history
   const defaultData = Array.from({ length: 7 }, (_, i) => {
     const d = new Date();
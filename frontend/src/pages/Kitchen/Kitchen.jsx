@@ -68,7 +68,10 @@ const Kitchen = () => {
 
     let ws;
     const connectWebSocket = () => {
-      ws = new WebSocket(WS_URL);
+      // The socket authenticates with the JWT access token (browsers cannot
+      // send an Authorization header on the handshake)
+      const token = localStorage.getItem("accessToken");
+      ws = new WebSocket(`${WS_URL}?token=${encodeURIComponent(token || "")}`);
 
       ws.onopen = () => setError(null);
 
@@ -77,6 +80,15 @@ const Kitchen = () => {
           const wsData = JSON.parse(event.data);
           let incomingOrders = null;
 
+          // Server heartbeat: answer so the socket is not evicted as stuck.
+          // A 'resync' (messages dropped while we were slow) falls through
+          // to the full reload below.
+          if (wsData.type === 'ping') {
+            ws.send(JSON.stringify({ type: 'pong' }));
+            return;
+          }
+          if (wsData.type === 'pong') return;
+
           // Robust parsing of WS message data (handles nested message.order or direct message)
           const msg = wsData.message || wsData;
           const payload = msg.data || msg;
@@ -1,2 +1,4 @@
 export const BASE_URL = import.meta.env.VITE_API_BASE_URL || "http://localhost:8000";
-export const WS_URL = BASE_URL.replace(/^https/, 'wss').replace(/^http/, 'ws') + "/ws/kitchen/orders/";
+export const WS_BASE_URL = BASE_URL.replace(/^https/, 'wss').replace(/^http/, 'ws');
+export const WS_URL = WS_BASE_URL + "/ws/kitchen/orders/";
+export const KPI_WS_URL = WS_BASE_URL + "/ws/dashboard/kpis/";